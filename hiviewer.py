@@ -24,6 +24,7 @@ import json
 import stat
 import shutil
 import subprocess
+import multiprocessing
 from pathlib import Path
 from itertools import zip_longest
 from collections import Counter
@@ -35,10 +36,10 @@ from PyQt5.QtGui import (
 from PyQt5.QtWidgets import (
     QFileSystemModel, QAbstractItemView, QMenu, 
     QHeaderView, QShortcut, QMainWindow, QDialog,
-    QSplashScreen, QSizePolicy, QTableWidgetItem,
+    QSplashScreen, QSizePolicy,
     QApplication, QTreeView, QProgressDialog, QLabel)
 from PyQt5.QtCore import (
-    Qt, QDir, QSize, QTimer, QThreadPool, QUrl, QSize, 
+    Qt, QDir, QTimer, QThreadPool, QUrl, 
     QMimeData, QPropertyAnimation, QItemSelection, QItemSelectionModel)
 
 
@@ -46,8 +47,9 @@ from PyQt5.QtCore import (
 from src.components.ui_main import Ui_MainWindow                                     # 假设你的主窗口类名为Ui_MainWindow
 from src.components.custom_qMbox_showinfo import show_message_box                    # 导入消息框类
 from src.components.custom_qCombox_spinner import CheckBoxListModel,CheckBoxDelegate # 导入自定义下拉框类中的数据模型和委托代理类
-from src.utils.xml import save_excel_data                                            # 导入xml文件解析工具类
+from src.components.custom_qTableView_model import format_file_info_text             # 导入表格单元格文本生成函数
 from src.utils.Icon import IconCache                                                 # 导入文件Icon图标加载类
+from src.utils.folder_watcher import FolderWatcher                                   # 导入表格文件夹实时监视类
 from src.common.decorator import log_performance_decorator, log_error_decorator      # 导入自定义装饰器函数 
 from src.common.manager_version import version_init, fastapi_init                    # 版本号&IP地址初始化
 from src.common.manager_color_exif import load_color_settings                        # 导入自定义json配置文件
@@ -150,13 +152,17 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         # 设置图片&视频文件格式
         self.IMAGE_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.webp', '.ico', '.heic') 
         self.VIDEO_FORMATS = ('.mp4', '.avi', '.mov', '.wmv', '.mpeg', '.mpg', '.mkv')
+        # 依赖exif信息的排序选项, 这些选项下需要在排序前解析完exif
+        self.EXIF_SORT_OPTIONS = ("按曝光时间排序", "按曝光时间逆序排序", "按ISO排序", "按ISO逆序排序")
 
         # 初始化属性
         self.files_list = []                    # 文件名及基本信息列表
         self.paths_list = []                    # 文件路径列表
         self.paths_index = {}                   # 文件路径索引字典
         self.dirnames_list = []                 # 选中的同级文件夹列表
+        self.pending_exif_items = []            # 未命中元数据索引、等待后台解析exif的图片列表
         self.image_index_max = []               # 存储当前选中及复选框选中的，所有图片列有效行最大值
+        self.table_folders = []                 # 表格每一列对应的文件夹路径
         self.additional_folders_for_table = []  # 存储通过右键菜单添加到表格的文件夹的完整路径
         self.compare_window = None              # 添加子窗口引用
         self.last_key_press = False             # 记录第一次按下键盘空格键或B键
@@ -169,11 +175,15 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         # 添加预加载相关的属性初始化
         self.current_preloader = None 
         self.preloading = False        
+        self.exif_probe_worker = None
 
         # 初始化线程池
         self.threadpool = QThreadPool()
         self.threadpool.setMaxThreadCount(max(4, os.cpu_count()))  
 
+        # 初始化表格文件夹实时监视, 拍摄时新增的文件只更新表格中对应的列
+        self.folder_watcher = FolderWatcher(parent=self)
+
         # 初始化压缩工作线程,压缩包路径  
         self.compress_worker = None
 
@@ -741,6 +751,12 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
 
         # 表格选择变化时，更新状态栏和预览区域显示
         self.RB_QTableWidget0.itemSelectionChanged.connect(self.handle_table_selection)
+
+        # 表格模型绘制可见单元格时按需请求缺失的图标(滚动时可见区域优先加载)
+        self.RB_QTableWidget0.model().icons_requested.connect(self.request_table_icons)
+
+        # 表格中的文件夹内容变化(文件写入完成)后, 局部更新对应的列
+        self.folder_watcher.folders_changed.connect(self.on_watched_folders_changed)
         
         # 底部状态栏按钮连接函数
         self.statusbar_button1.clicked.connect(self.setting)   # 🔆设置按钮槽函数
@@ -1448,7 +1464,7 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             try:
                 single_file_full_path = "" # 初始化单个文件完整路径为空字符串
                 file_name = self.RB_QTableWidget0.item(row, col).text().split('\n')[0]      # 获取文件名
-                column_name = self.RB_QTableWidget0.horizontalHeaderItem(col).text()        # 获取列名
+                column_name = self.RB_QTableWidget0.model().headerData(col, Qt.Horizontal)  # 获取列名
                 current_directory = self.RT_QComboBox.currentText()                         # 获取当前选中的目录
                 # 构建文件完整路径并判断文件是否存在，存在则返回对应文件路径str
                 if (full_path := Path(current_directory).parent / column_name / file_name) and full_path.exists():        
@@ -1590,7 +1606,7 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                 file_name = self.RB_QTableWidget0.item(row, col).text().split('\n')[0].strip()
                 
                 # 获取对应列的文件夹名称
-                column_name = self.RB_QTableWidget0.horizontalHeaderItem(col).text()
+                column_name = self.RB_QTableWidget0.model().headerData(col, Qt.Horizontal)
                 
                 # 在paths_list中查找对应的索引
                 col_idx = self.dirnames_list.index(column_name) if column_name in self.dirnames_list else -1
@@ -1816,12 +1832,12 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.logger.error(f"【reveal_in_explorer】-->在资源管理器中高亮定位选中的文件时 | 报错: {e}")
             
 
-    def on_compress_progress(self, current, total):
-        """处理压缩进度"""
+    def on_compress_progress(self, current, total, message):
+        """处理压缩进度, current/total为已处理/总的KB数"""
         try:
-            progress_value = int((current / total) * 100)  # 计算进度百分比
+            progress_value = int((current / total) * 100) if total > 0 else 0  # 计算进度百分比
             self.progress_dialog.update_progress(progress_value)
-            self.progress_dialog.set_message(f"显示详情：正在压缩文件... {current}/{total}")
+            self.progress_dialog.set_message(f"显示详情：{message}")
         except Exception as e:
             print(f"[on_compress_progress]-->error--压缩进度信号 | 报错：{e}")
             self.logger.error(f"【on_compress_progress】-->压缩进度信号 | 报错：{e}")
@@ -2010,8 +2026,9 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
            
             # 清空表格和缓存
             self.RB_QTableWidget0.clear()
-            self.RB_QTableWidget0.setRowCount(0)
-            self.RB_QTableWidget0.setColumnCount(0)
+
+            # 表格内容已与文件夹不一致(从列表中移除了文件), 停止监视, 避免文件夹变化时重新显示移除的文件
+            self.folder_watcher.clear()
 
             # 先初始化表格结构和内容，不加载图标,并获取图片列有效行最大值；重绘表格,更新显示
             self.image_index_max = self.init_table_structure(file_infos_list, dir_name_list)
@@ -2037,8 +2054,6 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
 
             # 清空表格和缓存
             self.RB_QTableWidget0.clear()
-            self.RB_QTableWidget0.setRowCount(0)
-            self.RB_QTableWidget0.setColumnCount(0)
             
             # 收集文件名基本信息以及文件路径，文件索引字典，同级文件夹列表，并将相关信息初始化为类中全局变量
             file_infos_list, file_paths, path_indexs, dir_name_list = self.collect_file_paths()
@@ -2047,10 +2062,16 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.paths_index = path_indexs         # 初始化文件路径索引字典
             self.dirnames_list = dir_name_list     # 初始化选中的同级文件夹列表
 
+            # 监视表格中的文件夹以及选中的空文件夹, 新增文件后自动局部更新表格
+            self.folder_watcher.set_folders(self.watch_folders)
+
             # 先初始化表格结构和内容，不加载图标, 并获取图片列有效行最大值；重绘表格,更新显示    
             self.image_index_max = self.init_table_structure(file_infos_list, dir_name_list)    
             self.RB_QTableWidget0.repaint()
 
+            # 表格先显示文件名，未命中索引的图片exif信息由后台线程池解析后流式刷新
+            self.start_exif_probing()
+
             # 对file_paths进行转置,实现加载图标按行加载，并初始化预加载图标线程前的问价排列列表
             file_name_paths = [path for column in zip_longest(*file_paths, fillvalue=None) for path in column if path is not None]
             if file_name_paths:  # 确保有文件路径, 开始预加载图标  
@@ -2070,52 +2091,15 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                 self.logger.warning(f"[init_table_structure]-->传入的文件名列表为空，无法初始化表格结构和内容")
                 return []  
 
-            # 设置表格的列数;设置列标题名称为当前选中的文件夹名
-            self.RB_QTableWidget0.setColumnCount(len(file_name_list))
-            self.RB_QTableWidget0.setHorizontalHeaderLabels(dir_name_list)  
-            
-            # 设置表格的行数
-            max_cols = max(len(row) for row in file_name_list) 
-            self.RB_QTableWidget0.setRowCount(max_cols)  
-            self.RB_QTableWidget0.setIconSize(QSize(48, 48))  
-
-            pic_num_list = [] # 用于记录每列的图片数量
-            flag_ = 0 # 用于记录是否需要设置固定行高
-            # 填充 QTableWidget,先填充文件名称，后填充图标(用多线程的方式后加载图标)
-            for col_index, row in enumerate(file_name_list):
-                pic_num_list.append(len(row))
-                for row_index, value in enumerate(row):
-                    if value[4][0] is None and value[4][1] is None:
-                        resolution = " "
-                    else:
-                        resolution = f"{value[4][0]}x{value[4][1]}"
-                    if value[5] is None:
-                        exposure_time = " "
-                    else:
-                        exposure_time = value[5]
-                    if value[6] is None:
-                        iso = " "
-                    else: 
-                        iso = value[6]
-                    # 文件名称、分辨率、曝光时间、ISO
-                    if resolution == " " and exposure_time == " " and iso == " ": 
-                        item_text = value[0]
-                        flag_ = 0 
-                    else:
-                        item_text = value[0] + "\n" + f"{resolution} {exposure_time} {iso}"
-                        flag_ = 1 # 设置flag_为1，设置行高
-                    item = QTableWidgetItem(item_text)
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # 禁止编辑
-                    self.RB_QTableWidget0.setItem(row_index, col_index, item)  # 设置单元格项
-                ###############################    列  ,     行   ，内容    ######################
-
-            # 设置单元格行高固定为60,如果flag_为0，则不设置行高
-            if flag_:
-                for row in range(self.RB_QTableWidget0.rowCount()):
-                    self.RB_QTableWidget0.setRowHeight(row, 60)
-            else:
-                for row in range(self.RB_QTableWidget0.rowCount()):
-                    self.RB_QTableWidget0.setRowHeight(row, 52)
+            # 记录每列的图片数量
+            pic_num_list = [len(row) for row in file_name_list]
+
+            # 单元格行高固定为60(包含exif信息行)或52; 有待后台解析的exif信息时预留两行高度
+            flag_ = format_file_info_text(file_name_list[-1][-1])[1]
+            row_height = 60 if flag_ or self.pending_exif_items else 52
+
+            # 设置表格数据模型, 列标题为当前选中的文件夹名; 单元格文本由模型按需生成，图标由预加载线程后加载
+            self.RB_QTableWidget0.set_file_infos(file_name_list, dir_name_list, row_height)
 
             # # 更新标签显示  
             self.statusbar_label0.setText(f"🎃已选文件夹数{pic_num_list}个 ")  
@@ -2130,6 +2114,8 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         """收集需要显示的文件路径"""
         # 初始化文件名列表,文件路径列表，文件夹名列表
         file_infos, file_paths, paths_index, dir_name_list = [], [], [], []     
+        self.pending_exif_items = []
+        self.table_folders, self.watch_folders = [], []
         try:
             # 获取同级文件夹复选框中选择的文件夹路径列表
             selected_folders = self.model.getCheckedItems()
@@ -2153,6 +2139,9 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                 "---右键多选添加到table模式,同级下拉框不可用,单击左侧文件夹可恢复---")
                 self.RT_QComboBox.setCurrentText(display_str)
 
+            # 需要监视的文件夹, 包括暂时没有文件的文件夹(拍摄开始后才写入文件)
+            self.watch_folders = [folder for folder in selected_folders_path if os.path.isdir(folder)]
+
             # 检测当前文件夹路径是否包含文件，没有则剔除该文件夹，修复多级空文件夹显示错乱的bug
             selected_option = self.RT_QComboBox0.currentText()
             if selected_option == "显示图片文件":
@@ -2184,6 +2173,8 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                     file_infos.append(file_info_list) 
                     # 文件路径列表，获取文件信息列表file_name_list的最后一列
                     file_paths.append([item[-1] for item in file_info_list])
+                    # 该列对应的文件夹路径
+                    self.table_folders.append(folder)
             
             # 根据文件路径列表获取文件路径索引映射字典
             paths_index = {value: (i, j) for i, row in enumerate(file_paths) for j, value in enumerate(row)}
@@ -2201,14 +2192,20 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         
     def filter_files(self, folder):
         """根据选项过滤文件"""
-        # 导入图片处理工具类
-        from src.utils.image import ImageProcessor 
+        # 导入图片头信息并行解析函数
+        from src.utils.image import probe_images_parallel
         # 导入文件排序工具类
         from src.utils.sort import sort_by_custom 
+        # 导入图片元数据索引类
+        from src.utils.meta_index import ImageMetaIndex
 
         files_and_dirs_with_mtime = [] 
         opt = self.RT_QComboBox0.currentText()
         sort_option = self.RT_QComboBox2.currentText()
+        # 需要解析exif时, 先读取该文件夹的元数据索引, 只对新增/变更的文件重新解析
+        probe_exif = opt == "显示图片文件" and not self.simple_mode
+        cached_meta = ImageMetaIndex.lookup_folder(folder) if probe_exif else {}
+        cold_items = []
         try:
             with os.scandir(folder) as entries:
                 for entry in entries:
@@ -2225,23 +2222,35 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                     if opt not in ("显示图片文件", "显示视频文件", "显示所有文件"):
                         continue
                     
-                    # 收集(宽、高、曝光时间、ISO)等信息
-                    width = height = exposure_time = iso = None
-                    if opt == "显示图片文件" and not self.simple_mode:
-                        try:
-                            with ImageProcessor(entry.path) as img:
-                                width, height = img.width, img.height
-                                exposure_time, iso = img.exposure_time, img.iso
-                        except Exception as e:
-                            self.logger.error(f"类【ImageProcessor】-->获取图片exif信息 | 报错：{e}")
-                            print(f"类[ImageProcessor]-->获取图片exif信息 | 报错：{e}")
-
-                    # 使用pathlib确保文件路径都用正斜杠 / 表示；拼接根据opt筛选后的文件信息列表
+                    # 使用pathlib确保文件路径都用正斜杠 / 表示
                     norm_path = Path(entry.path).as_posix()
                     st = entry.stat()
+
+                    # 收集(宽、高、曝光时间、ISO)等信息, 优先从元数据索引中读取(size, mtime一致才命中), 未命中的记录下来后续解析
+                    width = height = exposure_time = iso = None
+                    if probe_exif:
+                        if (meta := cached_meta.get(norm_path)) and meta[0] == st.st_size and meta[1] == st.st_mtime:
+                            width, height, exposure_time, iso = meta[2:]
+                        else:
+                            cold_items.append((norm_path, st.st_size, st.st_mtime, st.st_ctime))
+
+                    # 拼接根据opt筛选后的文件信息列表
                     files_and_dirs_with_mtime.append((
                     entry.name, st.st_ctime, st.st_mtime, st.st_size,
                     (width, height), exposure_time, iso, norm_path))
+
+            # 处理未命中索引的图片
+            if cold_items:
+                if sort_option in self.EXIF_SORT_OPTIONS:
+                    # 排序依赖exif信息, 需要在排序前使用线程池并行解析文件头，并批量写回索引
+                    probed = probe_images_parallel([item[0] for item in cold_items])
+                    ImageMetaIndex.update([(*item, *probed[item[0]]) for item in cold_items if probed.get(item[0])])
+                    files_and_dirs_with_mtime = [
+                        (*info[:4], (p[0], p[1]), p[2], p[3], info[7]) if (p := probed.get(info[7])) else info
+                        for info in files_and_dirs_with_mtime]
+                else:
+                    # 先显示文件名，exif信息在表格初始化后由后台线程池解析并流式刷新
+                    self.pending_exif_items.extend(cold_items)
                         
             # 使用sort_by_custom函数进行排序
             files_and_dirs_with_mtime = sort_by_custom(sort_option, files_and_dirs_with_mtime, self.simple_mode, opt)
@@ -2253,7 +2262,94 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.logger.error(f"【filter_files】-->根据选项过滤文件 | 报错：{e}")
             return []
 
-        
+    def start_exif_probing(self, keep_running=False):
+        """启动后台线程池, 并行解析未命中元数据索引的图片exif信息
+
+        Args:
+            keep_running: 为True时不取消上一次未完成的解析任务(表格局部更新时, 其他列的exif信息仍在解析)
+        """
+        from src.utils.image import ExifProbeWorker
+
+        # 取消上一次未完成的解析任务; 保留时旧任务继续执行, 其结果按文件路径写回表格
+        if not keep_running:
+            self.cancel_exif_probing()
+        if not self.pending_exif_items:
+            return
+        print(f"[start_exif_probing]-->开始后台解析{len(self.pending_exif_items)}张图片的exif信息")
+        self.logger.info(f"[start_exif_probing]-->开始后台解析{len(self.pending_exif_items)}张图片的exif信息")
+        self.exif_probe_worker = ExifProbeWorker(self.pending_exif_items)
+        self.exif_probe_worker.signals.batch_probed.connect(self.on_exif_batch_probed)
+        self.exif_probe_worker.signals.error.connect(self.on_preload_error)
+        self.pending_exif_items = []
+        self.threadpool.start(self.exif_probe_worker)
+
+    def cancel_exif_probing(self):
+        """取消后台exif解析任务"""
+        if self.exif_probe_worker:
+            self.exif_probe_worker.cancel()
+            self.exif_probe_worker = None
+
+    def on_exif_batch_probed(self, batch):
+        """后台解析的exif信息到达后，更新文件信息列表以及表格中对应的单元格"""
+        try:
+            for path, width, height, exposure_time, iso in batch:
+                if (pos := self.paths_index.get(path)) is None:
+                    continue
+                col, row = pos
+                info = self.files_list[col][row]
+                self.files_list[col][row] = (*info[:4], (width, height), exposure_time, iso, info[7])
+                self.RB_QTableWidget0.model().refresh_cell(row, col)
+        except Exception as e:
+            print(f"[on_exif_batch_probed]-->error--更新表格exif信息失败 | 报错：{e}")
+            self.logger.error(f"【on_exif_batch_probed】-->更新表格exif信息失败 | 报错：{e}")
+
+    def on_watched_folders_changed(self, folders):
+        """监视的文件夹内容变化(文件已写入完成)后更新表格, 保持选中状态和滚动位置
+        函数功能说明: 已显示的文件夹只更新对应的列; 需要新增或移除列时(空文件夹出现文件、文件夹被清空)重建表格
+        """
+        try:
+            self.logger.info(f"[on_watched_folders_changed]-->文件夹内容发生变化, 更新表格: {folders}")
+            state = self.RB_QTableWidget0.save_view_state()
+            rebuild = any(folder not in self.table_folders for folder in folders)
+            if not rebuild:
+                for folder in folders:
+                    if not self.update_table_column(self.table_folders.index(folder)):
+                        rebuild = True
+                        break
+            if rebuild:
+                self.update_RB_QTableWidget0()
+            else:
+                self.start_exif_probing(keep_running=True)
+                self.statusbar_label0.setText(f"🎃已选文件夹数{self.image_index_max}个 ")
+            self.RB_QTableWidget0.restore_view_state(state, self.paths_index)
+        except Exception as e:
+            print(f"[on_watched_folders_changed]-->error--文件夹变化后更新表格失败 | 报错：{e}")
+            self.logger.error(f"【on_watched_folders_changed】-->文件夹变化后更新表格失败 | 报错：{e}")
+
+    def update_table_column(self, col):
+        """重新读取一列对应的文件夹, 只更新该列中新增、删除或内容变化的单元格
+
+        Returns:
+            bool: 文件夹中已没有可显示的文件(需要移除该列)时返回False
+        """
+        if not (infos := self.filter_files(self.table_folders[col])):
+            return False
+        old_stat = {info[-1]: info[2:4] for info in self.files_list[col]}
+        modified = [info[-1] for info in infos if info[-1] in old_stat and old_stat[info[-1]] != info[2:4]]
+        if modified:
+            # 进程内的图标缓存按文件路径缓存, 内容变化的文件需要重新生成图标
+            IconCache.get_icon.cache_clear()
+
+        # 更新该列的文件路径以及路径索引, 表格模型与self.files_list引用同一个列表, 由模型替换该列
+        for path in self.paths_list[col]:
+            self.paths_index.pop(path, None)
+        self.paths_list[col] = [info[-1] for info in infos]
+        self.paths_index.update({path: (col, row) for row, path in enumerate(self.paths_list[col])})
+        self.RB_QTableWidget0.model().update_column(col, infos, modified)
+        self.image_index_max = [len(column) for column in self.files_list]
+        return True
+
+
     def start_image_preloading(self, file_paths):
         """开始预加载图片"""
         # 导入文件Icon图标加载类
@@ -2267,7 +2363,7 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             if self.current_preloader and self.preloading:
                 print("-->检测到预加载已启动, 取消预加载任务...")
                 self.logger.info(f"[start_image_preloading]-->检测到预加载已启动, 取消预加载任务...")
-                self.current_preloader._stop = True
+                self.current_preloader.cancel()
                 self.current_preloader = None  
 
             # 设置预加载状态以及时间
@@ -2282,8 +2378,8 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.current_preloader.signals.finished.connect(self.on_preload_finished)
             self.current_preloader.signals.error.connect(self.on_preload_error)
             
-            # 启动预加载
-            self.threadpool.start(self.current_preloader)
+            # 启动预加载(多个工作线程共享优先级队列), 可见区域的图标由表格模型请求后提升到队首
+            self.current_preloader.start(self.threadpool)
             print("-->开始后台预加载图标...")
             self.logger.info(f"[start_image_preloading]-->开始后台预加载图标...")
         except Exception as e:
@@ -2295,10 +2391,23 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         """取消当前预加载任务"""
         # 执行取消预加载任务
         if self.current_preloader and self.preloading:
-            self.current_preloader._stop = True  
+            self.current_preloader.cancel()  
             self.preloading = False
             self.current_preloader = None     
 
+    def request_table_icons(self, paths):
+        """处理表格模型对可见区域缺失图标的请求
+        函数功能说明: 预加载队列中未处理的文件提升到队首; 已处理过但图标已被模型缓存淘汰的文件, 启动按需加载
+        """
+        from src.utils.Icon import ImagePreloader
+
+        if self.current_preloader and self.preloading:
+            paths = self.current_preloader.prioritize(paths)
+        if paths:
+            icon_loader = ImagePreloader(paths, len(paths))
+            icon_loader.signals.batch_loaded.connect(self.on_batch_loaded)
+            icon_loader.start(self.threadpool)
+
     
     def on_batch_loaded(self, batch):
         """处理批量加载完成的图标"""
@@ -2311,25 +2420,14 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.logger.error(f"【on_batch_loaded】-->处理批量加载完成的图标任务 | 报错：{e}")
 
     def update_table_icon(self, file_path, icon):
-        """更新表格中的指定图标"""
+        """更新表格中的指定图标, 生成失败的图标记录到模型中, 避免重绘时重复请求"""
         # 使用字典self.paths_index快速查找索引
         if file_path and file_path in self.paths_index:
             col, row = self.paths_index[file_path]
-            if (item := self.RB_QTableWidget0.item(row, col)) and icon:
-                item.setIcon(icon)
-        if False: # 原来双循环方案，效率较低，移除
-            filename = os.path.basename(file_path)
-            folder = os.path.basename(os.path.dirname(file_path))
-            # 先在每一行中查找文件名
-            for row in range(self.RB_QTableWidget0.rowCount()):
-                # 遍历每一列查找匹配的文件夹
-                for col in range(self.RB_QTableWidget0.columnCount()):
-                    header = self.RB_QTableWidget0.horizontalHeaderItem(col)
-                    item = self.RB_QTableWidget0.item(row, col)
-                    if (header and header.text().split('/')[-1] == folder and item and item.text().split('\n')[0] == filename):
-                        if bool(icon):
-                            item.setIcon(icon)
-                        return  # 找到并更新后直接返回
+            if icon and not icon.isNull():
+                self.RB_QTableWidget0.model().set_icon(row, col, icon)
+            else:
+                self.RB_QTableWidget0.model().set_icon_failed(row, col)
 
     def update_preload_progress(self, current, total):
         """处理预加载进度"""
@@ -2464,16 +2562,17 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             # 导入视频预览工具类
             from src.utils.video import extract_video_first_frame   
             # 导入heic文件解析工具类
-            from src.utils.heic import extract_jpg_from_heic
+            from src.utils.heic import decode_heic
 
             # 图片文件处理,更具文件类型创建图片预览
             if (file_extension := os.path.splitext(preview_file_path)[1].lower()).endswith(self.IMAGE_FORMATS):
-                # 处理HEIC格式图片，成功提取则创建并显示图片预览，反之则显示提取失败
+                # 处理HEIC格式图片，在内存中解码成功(写入解码帧缓存)则创建并显示图片预览，反之则显示提取失败
                 if file_extension.endswith(".heic"):
-                    if new_path := extract_jpg_from_heic(preview_file_path):
-                        self.create_image_preview(new_path)
+                    if decode_heic(preview_file_path) is not None:
+                        self.create_image_preview(preview_file_path)
                         return
                     self.show_preview_error("提取HEIC图片失败")
+                    return
                 # 非".heic"文件直接使用图片文件生成预览
                 self.create_image_preview(preview_file_path)
                 return
@@ -2605,17 +2704,17 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         WHITE = "rgb(238,238,238)"                 # 白色
         QCOMBox_BACKCOLOR = "rgb(255,242,223)"     # 下拉框背景色
         table_style = f"""
-            QTableWidget#RB_QTableWidget0 {{
+            QTableView#RB_QTableWidget0 {{
                 /* 表格整体样式 */
                 background-color: {GRAY};
                 color: {FONTCOLOR};
             }}
-            QTableWidget#RB_QTableWidget0::item {{
+            QTableView#RB_QTableWidget0::item {{
                 /* 单元格样式 */
                 background-color: {GRAY};
                 color: {FONTCOLOR};
             }}
-            QTableWidget#RB_QTableWidget0::item:selected {{
+            QTableView#RB_QTableWidget0::item:selected {{
                 /* 选中单元格样式 */
                 background-color: {BACKCOLOR};
                 color: {FONTCOLOR};
@@ -2631,7 +2730,7 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
                 font-size: {self.font_jetbrains.pointSize()}pt;
             }}
             /* 修改左上角区域样式 */
-            QTableWidget#RB_QTableWidget0::corner {{
+            QTableView#RB_QTableWidget0::corner {{
                 background-color: {BACKCOLOR};  /* 设置左上角背景色 */
                 color: {FONTCOLOR};
             }}
@@ -2844,17 +2943,17 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             WHITE = "rgb(238,238,238)"       # 白色
             BLACK = "rgb( 34, 40, 49)"       # 黑色
             table_style = f"""
-                QTableWidget#RB_QTableWidget0 {{
+                QTableView#RB_QTableWidget0 {{
                     /* 表格整体样式 */
                     background-color: {BLACK};
                     color: {WHITE};
                 }}
-                QTableWidget#RB_QTableWidget0::item {{
+                QTableView#RB_QTableWidget0::item {{
                     /* 单元格样式 */
                     background-color: {GRAY};
                     color: {BLACK};
                 }}
-                QTableWidget#RB_QTableWidget0::item:selected {{
+                QTableView#RB_QTableWidget0::item:selected {{
                     /* 选中单元格样式 */
                     background-color: {BLACK};
                     color: {WHITE};
@@ -3162,8 +3261,10 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
     def cleanup(self):
         """清理资源 - 优化版本"""
         try:
-            # 1. 取消预加载任务
+            # 1. 取消预加载任务以及后台exif解析任务, 停止文件夹监视
             self.cancel_preloading()
+            self.cancel_exif_probing()
+            self.folder_watcher.clear()
             # 2. 清理所有子窗口
             self._cleanup_sub_windows()
             # 3. 清理所有工具窗口
@@ -3181,8 +3282,6 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             # 10. 清理表格数据
             if hasattr(self, 'RB_QTableWidget0'):
                 self.RB_QTableWidget0.clear()
-                self.RB_QTableWidget0.setRowCount(0)
-                self.RB_QTableWidget0.setColumnCount(0)
             # 11. 清理列表数据
             self.files_list = []
             self.paths_list = []
@@ -3521,6 +3620,39 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
             self.logger.error(f"【press_space_or_b_get_selected_file_list】-->处理键盘按下事件时 | 报错: {e}")
             return [], []
     
+    def peek_space_or_b_file_list(self, key_type):
+        """预测按下快捷键【space/B】后将要选中的文件路径列表和索引列表
+        函数功能说明: 移动规则与press_space_or_b_get_selected_file_list一致, 但不修改表格选中状态, 供看图子界面后台预取使用
+        输入:
+        key_type: 按键类型【space/B】
+        返回:
+        file_path_list, file_index_list: 首次按键前、超出表格范围或无法确定时返回空列表
+        """
+        try:
+            selected_items = self.RB_QTableWidget0.selectedItems()
+            # 与press_space_or_b_get_selected_file_list相同, 最多支持同时比较8个文件; 首次按键不移动, 无需预测
+            if not selected_items or len(selected_items) > 8 or not self.last_key_press:
+                return [], []
+            step_row = [sum(1 for item in selected_items if item.column() == i) 
+                        for i in range(max(item.column() for item in selected_items) + 1)]
+            direction = -1 if key_type == 'b' else 1
+            row_max = self.RB_QTableWidget0.rowCount() - 1
+            image_index_max = self.image_index_max or [self.RB_QTableWidget0.rowCount()] * self.RB_QTableWidget0.columnCount()
+
+            file_path_list, file_index_list = [], []
+            for item in selected_items:
+                col_index, row_index = item.column(), item.row() + direction * step_row[item.column()]
+                if not 0 <= row_index <= row_max or not self.RB_QTableWidget0.item(row_index, col_index):
+                    return [], []
+                if not (full_path := self.paths_list[col_index][row_index]):
+                    return [], []
+                file_path_list.append(full_path)
+                file_index_list.append(f"{row_index+1}/{image_index_max[col_index]}" if row_index + 1 <= image_index_max[col_index] else "None")
+            return file_path_list, file_index_list
+        except Exception as e:
+            print(f"[peek_space_or_b_file_list]-->error--预测下一组文件失败: {e}")
+            return [], []
+
     @log_error_decorator(tips="处理F1键按下事件")
     def on_f1_pressed(self):                        
         """处理F1键按下事件
@@ -3600,8 +3732,14 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
     def clear_log_and_cache_files(self):
         """清除日志文件以及zip缓存文件"""
         from src.utils.delete import clear_log_files, clear_cache_files, force_delete_directory
+        from src.utils.meta_index import ImageMetaIndex
+        from src.utils.heic import HeicFrameCache
+        from src.utils.video_align import VideoSignatureCache
         # 使用工具函数清除日志文件以及zip等相关缓存
         clear_log_files()
+        ImageMetaIndex.invalidate()
+        HeicFrameCache.clear()
+        VideoSignatureCache.clear()
         clear_cache_files(base_path=None, file_types=[".zip",".json",".ini"])
         force_delete_directory((self.root_path/"cache"/"temp").as_posix())
         force_delete_directory((self.root_path/"cache"/"photos").as_posix())
@@ -3710,10 +3848,7 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         """
         try:
             if success and images_path:
-                # 解析xml文件将其保存到excel中去
-                xml_exists = any(f for f in os.listdir(images_path) if f.endswith('_new.xml'))
-                if xml_exists:
-                    save_excel_data(images_path)
+                # xml文件中的数据已在qualcom_thread线程中导出到excel
                 use_time = time.time() - self.time_start
                 show_message_box(f"高通工具后台解析图片成功！用时: {use_time:.2f}秒", "提示", 1000)
                 self.logger.info(f"on_qualcom_finished()-->高通工具后台解析图片成功！| 耗时: {use_time:.2f}秒")
@@ -3837,12 +3972,8 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         函数功能说明: 展锐IQT工具后台解析图片线程完成后的链接事件
         """
         try:
-            # 导入展锐平台txt文件解析函数
-            from src.utils.xml import save_excel_data_by_unisoc                                            
             if success and images_path:
-                # 解析txt文件将其保存到excel中去
-                if any(f for f in os.listdir(images_path) if f.endswith('.txt')):
-                    save_excel_data_by_unisoc(images_path)
+                # txt文件中的数据已在unisoc_thread线程中导出到excel
                 use_time = time.time() - self.time_start
                 show_message_box(f"展锐IQT工具后台解析图片成功! 用时: {use_time:.2f}秒", "提示", 1500)
                 self.logger.info(f"on_unisoc_finished()-->展锐IQT工具后台解析图片成功! | 耗时: {use_time:.2f}秒")
@@ -3951,8 +4082,8 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
         
         # 构建图片名称列表，保持多维列表的结构, 保持图片名称的完整路径
         image_names = [[os.path.basename(path) for path in folder_paths] for folder_paths in self.paths_list]
-        # 创建搜索窗口并显示；设置链接信号；打印输出日志文件
-        self.search_window = SearchOverlay(self, image_names)
+        # 创建搜索窗口并显示(传入文件信息列表, 已解析的exif信息也参与搜索)；设置链接信号；打印输出日志文件
+        self.search_window = SearchOverlay(self, image_names, self.files_list)
         self.search_window.show_search_overlay()
         self.search_window.item_selected_from_search.connect(self.on_item_selected_from_search)
         self.logger.info("on_ctrl_f_pressed()-->打开图片模糊搜索工具成功")
@@ -4327,6 +4458,11 @@ class HiviewerMainwindow(QMainWindow, Ui_MainWindow):
     @log_error_decorator(tips="最终清理，确保所有资源都被释放")
     def _final_cleanup(self):
         """最终清理，确保所有资源都被释放"""
+        # 关闭图片元数据索引以及缩略图存储的数据库连接
+        from src.utils.meta_index import ImageMetaIndex
+        from src.utils.thumb_store import ThumbnailStore
+        ImageMetaIndex.close()
+        ThumbnailStore.close()
         # 再次强制垃圾回收
         gc.collect()
         # 清理任何剩余的定时器
@@ -4352,6 +4488,8 @@ python对象命名规范
 """
 
 if __name__ == '__main__':
+    # 打包后的程序使用进程池(图片批量压缩/转换等)时, 子进程需要从这里进入
+    multiprocessing.freeze_support()
     print("[hiviewer主程序启动]:")
     # 设置主程序app，启动主界面
     app = QApplication(sys.argv)
@@ -16,6 +16,7 @@ from PyQt5.QtCore import Qt
 # 导入自定义库
 from PIL import Image 
 from src.view.sub_compare_image_view import pil_to_pixmap
+from src.utils.heic import decode_heic
 
 # 设置基础路径
 BASEICONPATH = Path(__file__).parent.parent.parent
@@ -44,7 +45,10 @@ class ImageViewer(QGraphicsView):
                 if bool(img := reader.read()):
                     pixmap = QPixmap.fromImage(img)
             
-            if True:
+            if Path(path).suffix.lower() == ".heic":
+                # HEIC图片直接使用内存解码帧(带缓存)生成pixmap
+                pixmap = pil_to_pixmap(decode_heic(path))
+            else:
                 # 使用PIL库处理图像，生成pixmap
                 with Image.open(path) as img:
                     # 对png格式图片直接用QPixmap读取
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from PyQt5.QtWidgets import QTableView, QAbstractItemView
+from PyQt5.QtCore import (Qt, QSize, QTimer, QAbstractTableModel, QModelIndex,
+                          QVariant, QItemSelection, QItemSelectionModel, pyqtSignal)
+
+
+def format_file_info_text(value):
+    """根据文件信息生成表格单元格文本(文件名称、分辨率、曝光时间、ISO), 返回(文本, 是否包含exif信息)"""
+    resolution = " " if value[4][0] is None and value[4][1] is None else f"{value[4][0]}x{value[4][1]}"
+    exposure_time = " " if value[5] is None else value[5]
+    iso = " " if value[6] is None else value[6]
+    if resolution == " " and exposure_time == " " and iso == " ":
+        return value[0], 0
+    return value[0] + "\n" + f"{resolution} {exposure_time} {iso}", 1
+
+
+class FileGridModel(QAbstractTableModel):
+    """主界面右侧文件表格的数据模型
+
+    直接引用主界面的file_infos_list(每列一个文件夹)和paths_index, 不为每个单元格创建QTableWidgetItem;
+    单元格文本在data()中按需生成, 图标保存在有上限的LRU缓存中, 缺失时通过icons_requested信号按需请求;
+    生成失败的图标记录在失败集合中, 不再重复请求, 文件内容变化(update_column)或重置表格后才会重新请求
+    """
+    icons_requested = pyqtSignal(list)   # 可见区域缺失图标的文件路径列表
+
+    def __init__(self, max_icons=4096, parent=None):
+        super(FileGridModel, self).__init__(parent)
+        self.file_infos = []           # 文件信息列表, file_infos[col][row]
+        self.headers = []              # 列标题(文件夹名)
+        self.row_count = 0
+        self.max_icons = max_icons
+        self._icons = OrderedDict()    # 图标LRU缓存 {path: QIcon}
+        self._texts = {}               # 手动修改过的单元格文本 {(row, col): text}
+        self._requested = set()        # 待请求图标的文件路径
+        self._failed = set()           # 图标生成失败的文件路径
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.timeout.connect(self._emit_icon_requests)
+
+    def set_file_infos(self, file_infos, headers):
+        """重置表格数据"""
+        self.beginResetModel()
+        self.file_infos = file_infos
+        self.headers = list(headers)
+        self.row_count = max((len(column) for column in file_infos), default=0)
+        self._icons.clear()
+        self._texts.clear()
+        self._requested.clear()
+        self._failed.clear()
+        self.endResetModel()
+
+    def clear(self):
+        """清空表格数据"""
+        self.set_file_infos([], [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.file_infos)
+
+    def file_info(self, row, col):
+        """获取单元格对应的文件信息, 超出该列范围返回None"""
+        if 0 <= col < len(self.file_infos) and 0 <= row < len(self.file_infos[col]):
+            return self.file_infos[col][row]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or (info := self.file_info(index.row(), index.column())) is None:
+            return QVariant()
+        if role == Qt.DisplayRole:
+            if (text := self._texts.get((index.row(), index.column()))) is not None:
+                return text
+            return format_file_info_text(info)[0]
+        if role == Qt.DecorationRole:
+            path = info[-1]
+            if (icon := self._icons.get(path)) is not None:
+                self._icons.move_to_end(path)
+                return icon
+            if path in self._failed:
+                return QVariant()
+            # 只有被绘制(可见)的单元格才会请求图标, 合并后批量发送
+            self._requested.add(path)
+            if not self._request_timer.isActive():
+                self._request_timer.start(30)
+        return QVariant()
+
+    def flags(self, index):
+        if not index.isValid() or self.file_info(index.row(), index.column()) is None:
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled  # 禁止编辑
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if 0 <= section < len(self.headers) else QVariant()
+        return section + 1
+
+    def update_column(self, col, infos, modified_paths=()):
+        """替换一列(一个文件夹)的文件信息, 只刷新该列从第一个变化的单元格开始的部分, 总行数变化时插入/删除末尾的行
+
+        Args:
+            col: 列索引
+            infos: 该列新的文件信息列表
+            modified_paths: 内容发生变化的文件路径, 丢弃其缓存的图标以便重新请求
+        """
+        old = self.file_infos[col]
+        first = next((row for row, (a, b) in enumerate(zip(old, infos)) if a != b), min(len(old), len(infos)))
+        last = max(len(old), len(infos))
+        new_count = max([len(infos)] + [len(column) for i, column in enumerate(self.file_infos) if i != col])
+
+        if new_count > self.row_count:
+            self.beginInsertRows(QModelIndex(), self.row_count, new_count - 1)
+            self.file_infos[col], self.row_count = infos, new_count
+            self.endInsertRows()
+        elif new_count < self.row_count:
+            self.beginRemoveRows(QModelIndex(), new_count, self.row_count - 1)
+            self.file_infos[col], self.row_count = infos, new_count
+            self.endRemoveRows()
+        else:
+            self.file_infos[col] = infos
+
+        for path in modified_paths:
+            self._icons.pop(path, None)
+            self._failed.discard(path)
+        # 手动修改过的文本跟随原来的行, 该列变化部分的记录不再有效
+        for key in [key for key in self._texts if key[1] == col and key[0] >= first]:
+            del self._texts[key]
+        if first < min(last, new_count):
+            self.dataChanged.emit(self.index(first, col), self.index(min(last, new_count) - 1, col))
+
+    def set_text(self, row, col, text):
+        """手动修改单元格文本(如重命名后)"""
+        self._texts[(row, col)] = text
+        self.refresh_cell(row, col)
+
+    def refresh_cell(self, row, col):
+        """文件信息更新后刷新单元格显示"""
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def set_icon(self, row, col, icon):
+        """设置单元格图标, 超出缓存上限时淘汰最久未使用的图标"""
+        if (info := self.file_info(row, col)) is None:
+            return
+        path = info[-1]
+        self._icons[path] = icon
+        self._icons.move_to_end(path)
+        self._requested.discard(path)
+        while len(self._icons) > self.max_icons:
+            self._icons.popitem(last=False)
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_icon_failed(self, row, col):
+        """记录单元格图标生成失败, 之后重绘时不再请求"""
+        if (info := self.file_info(row, col)) is None:
+            return
+        self._failed.add(info[-1])
+        self._requested.discard(info[-1])
+
+    def _emit_icon_requests(self):
+        """发送可见区域缺失图标的请求"""
+        if self._requested:
+            paths, self._requested = list(self._requested), set()
+            self.icons_requested.emit(paths)
+
+
+class FileGridItem(object):
+    """表格单元格句柄, 提供与QTableWidgetItem一致的常用接口, 数据保存在FileGridModel中"""
+
+    def __init__(self, view, row, col):
+        self._view = view
+        self._row = row
+        self._col = col
+
+    def row(self):
+        return self._row
+
+    def column(self):
+        return self._col
+
+    def text(self):
+        return self._view.model().data(self._view.model().index(self._row, self._col)) or ""
+
+    def setText(self, text):
+        self._view.model().set_text(self._row, self._col, text)
+
+    def setIcon(self, icon):
+        self._view.model().set_icon(self._row, self._col, icon)
+
+    def setSelected(self, selected):
+        flag = QItemSelectionModel.Select if selected else QItemSelectionModel.Deselect
+        self._view.selectionModel().select(self._view.model().index(self._row, self._col), flag)
+
+
+class FileTableView(QTableView):
+    """主界面右侧文件表格, 基于FileGridModel的虚拟化表格, 兼容QTableWidget中常用的item接口"""
+    itemSelectionChanged = pyqtSignal()   # 选择变化信号, 同QTableWidget.itemSelectionChanged
+
+    def __init__(self, parent=None):
+        super(FileTableView, self).__init__(parent)
+        self.setModel(FileGridModel(parent=self))
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setIconSize(QSize(48, 48))
+        self.selectionModel().selectionChanged.connect(lambda *_: self.itemSelectionChanged.emit())
+
+    def set_file_infos(self, file_infos, headers, row_height):
+        """设置表格数据, 统一设置默认行高, 不逐行设置"""
+        self.verticalHeader().setDefaultSectionSize(row_height)
+        self.model().set_file_infos(file_infos, headers)
+
+    def clear(self):
+        self.model().clear()
+
+    def rowCount(self):
+        return self.model().rowCount()
+
+    def columnCount(self):
+        return self.model().columnCount()
+
+    def item(self, row, col):
+        """获取单元格句柄, 空单元格返回None"""
+        if self.model().file_info(row, col) is None:
+            return None
+        return FileGridItem(self, row, col)
+
+    def itemAt(self, pos):
+        """获取指定位置的单元格句柄"""
+        index = self.indexAt(pos)
+        return self.item(index.row(), index.column()) if index.isValid() else None
+
+    def selectedItems(self):
+        """获取选中的单元格句柄列表"""
+        return [FileGridItem(self, index.row(), index.column()) for index in self.selectionModel().selectedIndexes()]
+
+    def save_view_state(self):
+        """记录选中的文件路径、当前文件路径以及滚动条位置, 表格局部更新后用于恢复"""
+        model = self.model()
+        selected = [info[-1] for index in self.selectionModel().selectedIndexes()
+                    if (info := model.file_info(index.row(), index.column())) is not None]
+        current = self.currentIndex()
+        current_info = model.file_info(current.row(), current.column()) if current.isValid() else None
+        return {
+            "selected": selected,
+            "current": current_info[-1] if current_info else None,
+            "scroll": (self.horizontalScrollBar().value(), self.verticalScrollBar().value()),
+        }
+
+    def restore_view_state(self, state, paths_index):
+        """按文件路径恢复选中状态和当前单元格(文件所在行可能已经变化), 并恢复滚动条位置
+
+        Args:
+            state: save_view_state的返回值
+            paths_index: {文件路径: (列, 行)}
+        """
+        model, selection_model = self.model(), self.selectionModel()
+        wanted = {paths_index[path] for path in state["selected"] if path in paths_index}
+        current = {(index.column(), index.row()) for index in selection_model.selectedIndexes()}
+        if wanted != current:
+            selection = QItemSelection()
+            for col, row in wanted:
+                index = model.index(row, col)
+                selection.select(index, index)
+            selection_model.select(selection, QItemSelectionModel.ClearAndSelect)
+        if (pos := paths_index.get(state["current"])) is not None and pos != (self.currentIndex().column(), self.currentIndex().row()):
+            selection_model.setCurrentIndex(model.index(pos[1], pos[0]), QItemSelectionModel.NoUpdate)
+        self.horizontalScrollBar().setValue(state["scroll"][0])
+        self.verticalScrollBar().setValue(state["scroll"][1])
+
+    def scrollToItem(self, item, hint=QAbstractItemView.EnsureVisible):
+        """滚动到指定单元格"""
+        self.scrollTo(self.model().index(item.row(), item.column()), hint)
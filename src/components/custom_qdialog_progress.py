@@ -1,18 +1,49 @@
 # -*- coding: utf-8 -*-
 import os
 import shutil
-import zipfile
 from pathlib import Path
 from PyQt5.QtGui import QCursor
 from PyQt5.QtWidgets import QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar, QLineEdit
 from PyQt5.QtCore import QRunnable, Qt, QObject, pyqtSignal
 
+from src.utils.zip_stream import StreamingZipWriter
+
+
+class ZipProgress:
+    """压缩进度换算: 以KB为单位汇报已处理的原始字节数(避免int信号溢出), 进度千分比变化时才发送信号"""
+
+    def __init__(self, signal, items):
+        self.signal = signal
+        self.total_files = len(items)
+        self.total_kb = max(1, sum(os.path.getsize(path) for path, _ in items if os.path.isfile(path)) // 1024)
+        self.file_index = 0
+        self._last_permille = -1
+
+    def update(self, bytes_done):
+        done_kb = min(bytes_done // 1024, self.total_kb)
+        permille = done_kb * 1000 // self.total_kb
+        if permille == self._last_permille:
+            return
+        self._last_permille = permille
+        self.signal.emit(done_kb, self.total_kb,
+                         f"正在压缩文件... {self.file_index}/{self.total_files} "
+                         f"({done_kb / 1024:.1f}/{self.total_kb / 1024:.1f} MB)")
+
+
+def remove_partial_zip(zip_path):
+    """删除取消压缩后留下的压缩包"""
+    try:
+        if os.path.isfile(zip_path):
+            os.remove(zip_path)
+    except OSError as e:
+        print(f"[remove_partial_zip]-->删除未完成的压缩包失败: {zip_path}, 错误: {e}")
+
 
 class CompressWorker(QRunnable):
     """压缩工作线程类"""
     class Signals(QObject):
         """压缩工作线程信号"""
-        progress = pyqtSignal(int, int)  # 当前进度,总数
+        progress = pyqtSignal(int, int, str)  # 已处理KB数,总KB数,进度描述
         finished = pyqtSignal(str)  # 完成信号,返回压缩包路径
         error = pyqtSignal(str)  # 错误信号
         cancel = pyqtSignal()  # 取消信号
@@ -23,30 +54,37 @@ class CompressWorker(QRunnable):
         self.zip_path = zip_path
         self.signals = self.Signals()
         self._stop = False
+        self._writer = None
         
     def run(self):
         try:
-            with zipfile.ZipFile(self.zip_path, 'w') as zip_file:
-                for i, file_item in enumerate(self.files):
+            # 兼容两种输入格式：
+            # 1) (file_path, arcname) 元组
+            # 2) 仅 file_path 字符串
+            items = []
+            for file_item in self.files:
+                if isinstance(file_item, tuple) and len(file_item) == 2:
+                    items.append(file_item)
+                else:
+                    items.append((file_item, os.path.basename(file_item)))
+
+            progress = ZipProgress(self.signals.progress, items)
+            with StreamingZipWriter(self.zip_path, progress_callback=progress.update) as self._writer:
+                for i, (file_path, arcname) in enumerate(items):
                     if self._stop:
-                        return
-                    
+                        break
+                    progress.file_index = i + 1
                     try:
-                        # 兼容两种输入格式：
-                        # 1) (file_path, arcname) 元组
-                        # 2) 仅 file_path 字符串
-                        if isinstance(file_item, tuple) and len(file_item) == 2:
-                            file_path, arcname = file_item
-                        else:
-                            file_path = file_item
-                            arcname = os.path.basename(file_path)
-
-                        zip_file.write(file_path, arcname)
-                        self.signals.progress.emit(i + 1, len(self.files))
+                        if not self._writer.write(file_path, arcname):
+                            break
                     except Exception as e:
                         self.signals.error.emit(f"压缩文件失败: {file_path}, 错误: {e}")
                         continue
-                    
+
+            if self._stop:
+                # 取消后删除只包含部分文件的压缩包
+                remove_partial_zip(self.zip_path)
+                return
             self.signals.finished.emit(self.zip_path)
             
         except Exception as e:
@@ -55,6 +93,8 @@ class CompressWorker(QRunnable):
     def cancel(self):
         """取消压缩任务"""
         self._stop = True  # 设置停止标志
+        if self._writer is not None:
+            self._writer.cancel()  # 中断正在写入的大文件
 
 
 class BatchCopyCompressWorker(QRunnable):
@@ -73,6 +113,7 @@ class BatchCopyCompressWorker(QRunnable):
         self.zip_name = zip_name  # 自定义zip文件名，如果为None则自动计算
         self.signals = self.Signals()
         self._stop = False
+        self._writer = None
         
     def run(self):
         try:
@@ -116,27 +157,31 @@ class BatchCopyCompressWorker(QRunnable):
             if zip_path.exists():
                 zip_path.unlink()
             
-            # 直接压缩原始文件，保持相对目录结构
-            total_files = len(file_paths)
-            self.signals.progress.emit(0, total_files, f"正在压缩文件... 0/{total_files}")
+            # 直接压缩原始文件，保持相对目录结构; 按字节数汇报进度
+            items = [(src_path, src_path.relative_to(common_parent)) for src_path in file_paths]
+            progress = ZipProgress(self.signals.progress, items)
+            progress.update(0)
             
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for i, src_path in enumerate(file_paths):
+            with StreamingZipWriter(zip_path, progress_callback=progress.update) as self._writer:
+                for i, (src_path, arcname) in enumerate(items):
                     if self._stop:
-                        return
+                        break
+                    progress.file_index = i + 1
                     try:
-                        # 计算文件在zip中的相对路径（保持目录结构）
-                        arcname = src_path.relative_to(common_parent)
-                        zipf.write(src_path, arcname)
-                        self.signals.progress.emit(i + 1, total_files, f"正在压缩文件... {i + 1}/{total_files}")
+                        if not self._writer.write(src_path, arcname):
+                            break
                     except Exception as e:
                         self.signals.error.emit(f"压缩文件失败: {src_path.name}, 错误: {e}")
                         continue
             
+            if self._stop:
+                # 取消后删除只包含部分文件的压缩包
+                remove_partial_zip(zip_path)
+                return
+
             # 压缩完成
-            if not self._stop:
-                self.signals.progress.emit(total_files, total_files, "处理完成")
-                self.signals.finished.emit(str(zip_path))
+            self.signals.progress.emit(progress.total_kb, progress.total_kb, "处理完成")
+            self.signals.finished.emit(str(zip_path))
             
         except Exception as e:
             self.signals.error.emit(f"操作失败: {str(e)}")
@@ -144,6 +189,8 @@ class BatchCopyCompressWorker(QRunnable):
     def cancel(self):
         """取消任务"""
         self._stop = True
+        if self._writer is not None:
+            self._writer.cancel()
 
 
 # 更新 ProgressDialog 类以添加取消按钮
@@ -11,6 +11,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 # 导入自定义的QComboBox类 & QDragTableWidget类
 from .custom_qCombox_spinner import CustomComboBox
 from .custom_qTableWidget_drag import DragTableWidget
+from .custom_qTableView_model import FileTableView
 # 导入自定义装饰器
 from src.common.decorator import CC_TimeDec, log_performance_decorator
 
@@ -319,7 +320,7 @@ class Ui_MainWindow(object):
             self.RB_QTableWidget0.set_main_window(self)
         else:
             # 设置默认模式（无拖拽）
-            self.RB_QTableWidget0 = QtWidgets.QTableWidget(self.Right_Bottom_QGroupBox)
+            self.RB_QTableWidget0 = FileTableView(self.Right_Bottom_QGroupBox)
 
         self.RB_QTableWidget0.setObjectName("RB_QTableWidget0")
         self.verticalLayout_3.addWidget(self.RB_QTableWidget0)
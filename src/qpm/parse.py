@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import os
-import gc
 import copy
 import time
 import argparse
 import configparser
-import concurrent.futures
+import multiprocessing
 import xml.sax.saxutils as saxutils
 from io import BytesIO
 from pathlib import Path
@@ -178,6 +177,132 @@ def parse_xml(file_path):
         raise
 
 
+STREAM_CHUNK_SIZE = 1024 * 1024   # 流式解析每次读取的字节数
+
+# 流式解析时需要保留的标量节点: {标签: 由近到远的祖先标签}, 与XPATHS中对应的路径保持一致
+STREAM_LEAVES = {
+    "Lux_Index": ("Current_Frame",),
+    "Average_Luma": ("Current_Frame",),
+    "FPS": ("Current_Frame",),
+    "CCT": ("AWB_CurFrameDecision",),
+    "Gain": ("Exposure_Information",),
+    "AEC_Settled": (),
+}
+
+# full_parse 时额外保留的节点
+FULL_PARSE_STREAM_LEAVES = {
+    "Sat_Ratio": ("AECX_Metering",),
+    "Dark_Ratio": ("AECX_Metering",),
+    "R_G_Ratio": ("Point", "AWB_Decision_Data"),
+    "B_G_Ratio": ("Point", "AWB_Decision_Data"),
+    "AWB_Gains": ("Tuning_AWB_Data",),
+    "Triangle_Index": ("AWB_TriangleGainAdjust",),
+    "SA_Description": ("AWB_SAGen1Data",),
+    "Face_Assist_Confidence": ("AWB_SA_Face_Assist",),
+    "Channel_Data": ("Channels_List", "AECX_CoreStats"),
+}
+
+# 按属性进一步筛选的节点, 与XPATHS中的谓词以及save_results_to_xml中的channel_configs保持一致, 减少复制的网格数据
+STREAM_LEAF_FILTERS = {
+    "CCT": lambda leaf: leaf.getparent().get("Index") == "1",
+    "R_G_Ratio": lambda leaf: leaf.getparent().get("ID") == "1" and leaf.getparent().getparent().get("ID") == "4",
+    "B_G_Ratio": lambda leaf: leaf.getparent().get("ID") == "1" and leaf.getparent().getparent().get("ID") == "4",
+    "Channel_Data": lambda leaf: leaf.get("ID") == "6" and leaf.getparent().get("Index") in ("0", "1"),
+}
+
+
+def parse_xml_stream(file_path, sa_names, full_parse=False):
+    """
+    使用iterparse(XMLPullParser增量接口)流式解析XML文件, 只保留配置的SA节点和需要的标量节点, 其余节点边解析边释放。
+
+    返回的根节点是一棵精简树: 保留的节点连同其祖先(只复制标签和属性)按文档顺序挂在根节点下,
+    因此XPATHS中的表达式在精简树上的查询结果与完整树一致, 后续计算和保存逻辑无需修改。
+
+    Args:
+        file_path: XML文件路径
+        sa_names: 需要保留的SA名称集合, 以"FrameSA"开头的SA始终保留
+        full_parse: 是否保留完整解析需要的节点
+
+    Returns:
+        lxml.etree._Element: 精简树的根节点
+    """
+    leaves = dict(STREAM_LEAVES, **FULL_PARSE_STREAM_LEAVES) if full_parse else STREAM_LEAVES
+    deep_tags = ("General_SAs", *leaves)
+    skeleton = ET.Element("Stream_Root")
+    grafted = []    # 最近一次嫁接的祖先链 [(原祖先节点, 精简树中的副本)], 同一父节点下的多个叶子共用副本
+
+    def matches(leaf):
+        parent = leaf.getparent()
+        for tag in leaves[leaf.tag]:
+            if parent is None or parent.tag != tag:
+                return False
+            parent = parent.getparent()
+        return (leaf_filter := STREAM_LEAF_FILTERS.get(leaf.tag)) is None or leaf_filter(leaf)
+
+    def graft(leaf):
+        ancestors, parent = [], leaf.getparent()
+        for _ in leaves[leaf.tag]:
+            ancestors.insert(0, parent)
+            parent = parent.getparent()
+        parent_copy = skeleton
+        for level, original in enumerate(ancestors):
+            if level < len(grafted) and grafted[level][0] is original:
+                parent_copy = grafted[level][1]
+                continue
+            del grafted[level:]
+            parent_copy = ET.SubElement(parent_copy, original.tag, original.attrib)
+            grafted.append((original, parent_copy))
+        parent_copy.append(copy.deepcopy(leaf))
+
+    def release(elem):
+        elem.clear(keep_tail=True)
+        node = elem
+        while (parent := node.getparent()) is not None:
+            while node.getprevious() is not None:
+                del parent[0]
+            node = parent
+
+    def handle(elem):
+        # 位于SA或其它保留节点内部的节点, 随外层节点一起处理
+        if next(elem.iterancestors(*deep_tags), None) is not None:
+            return
+        if elem.tag == "General_SAs":
+            name = elem.findtext("Analyzer_Name")
+            if name and (name in sa_names or name.startswith("FrameSA")):
+                del grafted[:]
+                skeleton.append(copy.deepcopy(elem))
+            else:
+                for leaf in elem.iter(*leaves):
+                    if matches(leaf):
+                        graft(leaf)
+        elif matches(elem):
+            graft(elem)
+        release(elem)
+
+    try:
+        # iterparse的增量接口, 按块读取文件并只接收关注标签的end事件
+        parser = ET.XMLPullParser(
+            events=("end",),
+            tag=deep_tags,
+            recover=True,
+            remove_blank_text=True,
+            remove_comments=True,
+            no_network=True,
+        )
+        with open(file_path, "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+                for _, elem in parser.read_events():
+                    handle(elem)
+        parser.close()
+        for _, elem in parser.read_events():
+            handle(elem)
+        return skeleton
+    except Exception as e:
+        print(f"Error parsing XML file {file_path}: {str(e)}")
+        raise
+
+
 def extract_values(root, path):
     element = root.find(path)
     return [child.text for child in element]
@@ -644,16 +769,17 @@ def get_process_counts():
     return parse_processes, batch_size, full_parse
 
 
-def parse_main(folder_path, log_callback=None):
-    start_time = time.time()
-    processed_files = 0
-
-    parse_processes, batch_size, full_parse = get_process_counts()
-    print(f"初始配置 - parse_processes: {parse_processes}, batch_size: {batch_size}, full_parse: {full_parse}")
+def find_unparsed_xml_files(folder_path, exclude=()):
+    """
+    找出文件夹中还没有对应_new.xml结果文件的XML文件
 
-    # 从配置文件加载SA配置
-    required_sas, optional_sas, sa_order, agg_sas = load_sa_config()
+    Args:
+        folder_path: 文件夹路径
+        exclude: 需要跳过的文件名集合(如已提交解析的文件)
 
+    Returns:
+        list: 文件名列表
+    """
     # 获取需要处理的文件列表 (使用集合操作优化)
     all_files = set(os.listdir(folder_path))
     
@@ -668,56 +794,140 @@ def parse_main(folder_path, log_callback=None):
     
     # 找出需要处理的文件
     to_process_basenames = xml_basenames - processed_basenames
-    file_list = [f for f in xml_files if os.path.splitext(f)[0] in to_process_basenames]
-    
-    total_files = len(file_list)
-    
-    # 如果图片数量小于配置的进程数，则使用图片数量作为进程数
-    if total_files > 0 and total_files < parse_processes:
-        parse_processes = total_files
-        print(f"调整进程数：图片数量({total_files}) < 配置进程数，使用图片数量作为进程数")
-    
-    # 打印调试信息
-    print(f"找到 {total_files} 个需要处理的XML文件，将使用 {parse_processes} 个进程处理")
-    if total_files == 0:
-        print("警告: 没有找到需要处理的XML文件，请检查文件夹路径和文件名格式")
+    return sorted(f for f in xml_files if os.path.splitext(f)[0] in to_process_basenames and f not in exclude)
 
 
-    for batch_start in range(0, len(file_list), batch_size):
-        batch_end = min(batch_start + batch_size, len(file_list))
-        batch = file_list[batch_start:batch_end]
-
-        # 使用进程池替代线程池来绕过GIL，并设置8个工作进程
-        with concurrent.futures.ProcessPoolExecutor(
-            max_workers=parse_processes
-        ) as executor:
-            futures = {
-                executor.submit(
-                    process_file,
-                    os.path.join(folder_path, filename),
-                    folder_path,
-                    full_parse,  # 传递 full_parse 参数
-                ): filename
-                for filename in batch
-            }
+# 工作进程内的解析设置, 由进程池初始化函数设置
+_WORKER_FULL_PARSE = False
 
-            for future in concurrent.futures.as_completed(futures):
-                filename = futures[future]
-                try:
-                    result, messages = future.result()
+
+def _init_parse_worker(full_parse):
+    """进程池初始化: 每个工作进程只导入一次lxml并读取一次SA.ini"""
+    global _WORKER_FULL_PARSE
+    _WORKER_FULL_PARSE = full_parse
+    load_sa_config()
+
+
+def _parse_chunk(file_paths):
+    """工作进程: 顺序解析一个任务块中的文件, 返回[(文件路径, 是否成功, 日志信息列表)]"""
+    results = []
+    for file_path in file_paths:
+        try:
+            result, messages = process_file(file_path, os.path.dirname(file_path), _WORKER_FULL_PARSE)
+        except Exception as e:
+            result, messages = False, [f"Error processing file {file_path}: {str(e)}"]
+        results.append((file_path, result, messages))
+    return results
+
+
+def _iter_xml_chunks(folder_path, chunk_size, submitted, failed, watch, stop_event, poll_interval, idle_timeout):
+    """
+    生成待解析的任务块, 在进程池的任务分发线程中迭代
+
+    非监听模式下只扫描一次文件夹; 监听模式下持续扫描新落地的XML文件, 文件大小和修改时间在相邻两次扫描间
+    保持不变才提交(避免解析写入中的文件), 解析失败的文件在内容变化后重新提交; stop_event置位后最后扫描一次
+    并提交所有剩余文件, 超过idle_timeout秒没有新文件时也会结束
+
+    Args:
+        submitted: 已提交的文件 {文件名: 提交时的(大小, 修改时间)}
+        failed: 解析失败的文件 {文件名: 提交时的(大小, 修改时间)}, 由结果处理方写入
+    """
+    def chunks(file_names):
+        paths = [os.path.join(folder_path, f) for f in file_names]
+        for i in range(0, len(paths), chunk_size):
+            yield paths[i:i + chunk_size]
+
+    def signature(file_name):
+        try:
+            st = os.stat(os.path.join(folder_path, file_name))
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    if not watch:
+        file_names = find_unparsed_xml_files(folder_path, submitted)
+        submitted.update((f, None) for f in file_names)
+        yield from chunks(file_names)
+        return
+
+    pending = {}     # 上一次扫描时尚未提交的 {文件名: (大小, 修改时间)}
+    last_arrival = time.time()
+    while True:
+        stopped = stop_event is not None and stop_event.is_set()
+        ready = []
+        for file_name in find_unparsed_xml_files(folder_path, submitted):
+            if (current := signature(file_name)) is None or failed.get(file_name) == current:
+                continue
+            if stopped or pending.get(file_name) == current:
+                ready.append(file_name)
+                pending.pop(file_name, None)
+                failed.pop(file_name, None)
+                submitted[file_name] = current
+            else:
+                pending[file_name] = current
+
+        if ready:
+            last_arrival = time.time()
+            yield from chunks(ready)
+        if stopped or (idle_timeout and not pending and time.time() - last_arrival > idle_timeout):
+            return
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+
+def parse_main(folder_path, log_callback=None, watch=False, stop_event=None, poll_interval=1.0, idle_timeout=None):
+    """
+    使用一个长期存在的进程池解析文件夹中的XML文件
+
+    Args:
+        folder_path: 文件夹路径
+        log_callback: 日志回调函数
+        watch: 是否持续监听文件夹, 新落地的XML文件会在解析过程中陆续提交给进程池
+        stop_event: 监听模式下的停止事件(threading.Event), 置位后解析完剩余文件再返回
+        poll_interval: 监听模式下扫描文件夹的间隔(秒)
+        idle_timeout: 监听模式下超过该时间(秒)没有新文件时自动结束, None表示只由stop_event结束
+    """
+    start_time = time.time()
+    processed_files = 0
+
+    parse_processes, batch_size, full_parse = get_process_counts()
+    print(f"初始配置 - parse_processes: {parse_processes}, batch_size: {batch_size}, full_parse: {full_parse}")
+
+    # 任务块大小: 积压文件较多时每块多个文件以减少进程间通信, 上限为batch_size; 监听模式下逐个提交保证及时性
+    backlog = len(find_unparsed_xml_files(folder_path))
+    chunk_size = 1 if watch else max(1, min(batch_size, backlog // (parse_processes * 4)))
+
+    # 如果文件数量小于配置的进程数，则使用文件数量作为进程数
+    if not watch and 0 < backlog < parse_processes:
+        parse_processes = backlog
+        print(f"调整进程数：文件数量({backlog}) < 配置进程数，使用文件数量作为进程数")
+    
+    total_files = backlog
+
+    # 打印调试信息
+    print(f"找到 {backlog} 个需要处理的XML文件，将使用 {parse_processes} 个进程处理" + (", 并监听新文件" if watch else ""))
+    if backlog == 0 and not watch:
+        print("警告: 没有找到需要处理的XML文件，请检查文件夹路径和文件名格式")
+    else:
+        submitted, failed = {}, {}
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(parse_processes, initializer=_init_parse_worker, initargs=(full_parse,)) as pool:
+            tasks = _iter_xml_chunks(
+                folder_path, chunk_size, submitted, failed, watch, stop_event, poll_interval, idle_timeout)
+            for results in pool.imap_unordered(_parse_chunk, tasks):
+                for file_path, result, messages in results:
                     if log_callback:
                         for msg in messages:
                             log_callback(msg)
                     if result:
                         processed_files += 1
-                except Exception as e:
-                    message = f"Error processing file {filename}: {str(e)}"
-                    print(message)
-                    if log_callback:
-                        log_callback(message)
-
-        # 在批次之间强制垃圾回收
-        gc.collect()
+                    elif watch:
+                        # 监听模式下, 解析失败的文件(可能是写入中途)在内容变化后重新提交
+                        file_name = os.path.basename(file_path)
+                        failed[file_name] = submitted.pop(file_name, None)
+        total_files = len(submitted) + len(failed)
     end_time = time.time()
     total_time = end_time - start_time
     speed = processed_files / total_time if total_time > 0 else 0
@@ -792,7 +1002,19 @@ def parse_single_main(image_path, log_callback=None):
         log_callback(f"总耗时: {total_time:.2f}秒 | 平均速度: {speed:.2f} 文件/秒")
 
 
-def process_file(filename, folder_path, full_parse=False):
+def process_file(filename, folder_path, full_parse=False, streaming=True):
+    """
+    解析单个XML文件并保存同名的_new.xml结果文件
+
+    Args:
+        filename: XML文件路径
+        folder_path: XML文件所在文件夹
+        full_parse: 是否进行完整解析
+        streaming: 是否使用iterparse流式解析(只保留需要的节点), False时构建完整的XML树
+
+    Returns:
+        tuple: (是否处理成功, 日志信息列表)
+    """
     messages = []
     if os.path.isdir(filename):
         return False, messages
@@ -810,7 +1032,10 @@ def process_file(filename, folder_path, full_parse=False):
         # 减少在内存中保存的完整XML树
         root = None
         try:
-            root = parse_xml(filename)
+            if streaming:
+                root = parse_xml_stream(filename, set(required_sas + optional_sas), full_parse)
+            else:
+                root = parse_xml(filename)
 
         except Exception as e:
             message = f"Error: Could not parse XML file {filename}: {str(e)}"
@@ -868,7 +1093,6 @@ def process_file(filename, folder_path, full_parse=False):
 
         if missing_required_sa:
             root = None
-            gc.collect()
             return False, messages
         # --- 结束 FrameSA 或 EVFrameSA 的备选逻辑 ---
 
@@ -888,7 +1112,6 @@ def process_file(filename, folder_path, full_parse=False):
         if missing_required_sa:
             # Clear root reference to potentially free memory sooner
             root = None
-            gc.collect()
             return False, messages
 
         # 检查可选的SAs - 如果不存在则使用None值
@@ -920,7 +1143,6 @@ def process_file(filename, folder_path, full_parse=False):
                 print(message)
                 # Clear root reference on error
                 root = None
-                gc.collect()
                 return False, messages
         else:
              # This case should ideally be caught by missing_required_sa check,
@@ -929,13 +1151,11 @@ def process_file(filename, folder_path, full_parse=False):
              print(message)
              # Clear root reference on error
              root = None
-             gc.collect()
              return False, messages
 
 
         # Clear root reference after successful processing
         root = None
-        gc.collect()
 
         return True, messages  # 处理成功
     except Exception as e:
@@ -944,13 +1164,12 @@ def process_file(filename, folder_path, full_parse=False):
         messages.append(message)
         # Ensure root is cleared even for unexpected errors
         root = None
-        gc.collect()
         return False, messages
 
 
 def load_sa_config(config_file='SA.ini'):
     """
-    从配置文件中读取SA相关的配置
+    从配置文件中读取SA相关的配置, 按(路径, 修改时间)缓存, 同一进程内只在SA.ini变化后重新读取
     
     Args:
         config_file: 配置文件路径，默认为'SA.ini'
@@ -958,10 +1177,19 @@ def load_sa_config(config_file='SA.ini'):
     Returns:
         tuple: (required_sas, optional_sas, sa_order, agg_sas)
     """
+    if config_file == 'SA.ini':
+        config_file = (Path(__file__).parent.parent.parent / "config" / "SA.ini").as_posix()
     try:
-        if config_file == 'SA.ini':
-            config_file = (Path(__file__).parent.parent.parent / "config" / "SA.ini").as_posix()
+        mtime = os.stat(config_file).st_mtime_ns
+    except OSError:
+        mtime = None
+    return _read_sa_config(config_file, mtime)
 
+
+@lru_cache(maxsize=8)
+def _read_sa_config(config_file, mtime):
+    """读取SA配置文件, mtime仅作为缓存键"""
+    try:
         # 显式指定使用UTF-8编码读取配置文件
         config = configparser.ConfigParser()
         with open(config_file, 'r', encoding='utf-8') as f:
@@ -991,12 +1219,14 @@ def load_sa_config(config_file='SA.ini'):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="处理指定文件夹或单个文件对应的XML数据。")
     parser.add_argument("path", help="要处理的文件夹路径或单个文件的路径。")
+    parser.add_argument("--watch", action="store_true", help="持续监听文件夹, 解析陆续落地的新XML文件。")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="监听模式下没有新文件多少秒后退出。")
     args = parser.parse_args()
 
     input_path = args.path
 
     if os.path.isdir(input_path):
-        parse_main(input_path)
+        parse_main(input_path, watch=args.watch, idle_timeout=args.idle_timeout)
     elif os.path.isfile(input_path):
         parse_single_main(input_path)
     else:
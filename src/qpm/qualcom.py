@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import os
+import threading
+
 from PyQt5.QtCore import pyqtSignal, QThread
 
 class QualcomThread(QThread):
@@ -12,13 +15,35 @@ class QualcomThread(QThread):
 
     def run(self):
         try:
-            # 使用高通工具解析图片
-            from src.qpm.dump import process_images_in_folder
-            process_images_in_folder(self.qualcom_path, self.images_path)
-            
-            # 解析xml文件
+            # 解析xml文件: 进程池在高通工具运行期间就开始监听文件夹, xml文件一落地即开始解析
             from src.qpm.parse import parse_main
-            parse_main(self.images_path)
+            stop_event = threading.Event()
+            parse_errors = []
+
+            def parse_worker():
+                try:
+                    parse_main(self.images_path, watch=True, stop_event=stop_event)
+                except Exception as e:
+                    parse_errors.append(e)
+
+            parse_thread = threading.Thread(target=parse_worker, daemon=True)
+            parse_thread.start()
+
+            # 使用高通工具解析图片
+            try:
+                from src.qpm.dump import process_images_in_folder
+                process_images_in_folder(self.qualcom_path, self.images_path)
+            finally:
+                # 高通工具结束后, 解析完剩余的xml文件再返回
+                stop_event.set()
+                parse_thread.join()
+            if parse_errors:
+                raise parse_errors[0]
+
+            # 将xml文件中提取的数据导出到表格, 在本线程中执行避免阻塞界面
+            if any(f.endswith('_new.xml') for f in os.listdir(self.images_path)):
+                from src.utils.xml import save_excel_data
+                save_excel_data(self.images_path)
 
             # 发射信号，传递结果
             self.finished.emit(True, "", self.images_path)
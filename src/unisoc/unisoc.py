@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import os
+
 from PyQt5.QtCore import pyqtSignal, QThread
 
 class UnisocThread(QThread):
@@ -20,6 +22,11 @@ class UnisocThread(QThread):
             # from src.unisoc.parse import parse_main
             # parse_main(self.images_path)
 
+            # 将txt文件中提取的数据导出到表格, 在本线程中执行避免阻塞界面
+            if any(f.endswith('.txt') for f in os.listdir(self.images_path)):
+                from src.utils.xml import save_excel_data_by_unisoc
+                save_excel_data_by_unisoc(self.images_path)
+
             # 发射信号，传递结果
             self.finished.emit(True, "", self.images_path)
             
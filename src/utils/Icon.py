@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
-import re
 import time
-import json
+import heapq
 import shutil
 import hashlib
 import threading
@@ -15,11 +14,13 @@ from typing import Optional, Tuple
 from PIL import Image
 from PyQt5 import QtGui, QtCore
 from PyQt5.QtGui import (QIcon, QPixmap,QImageReader,QImage)
-from PyQt5.QtCore import (QRunnable, QObject, pyqtSignal)
+from PyQt5.QtCore import (QRunnable, QObject, pyqtSignal, QBuffer, QByteArray, QIODevice)
 
 # 自定义模块
 from src.utils.delete import force_delete_file
-from src.utils.heic import extract_jpg_from_heic
+from src.utils.thumb_store import ThumbnailStore
+from src.utils.heic import decode_heic, extract_thumbnail_from_heic
+from src.utils.image import load_exif_thumbnail, load_jpeg_draft
 from src.utils.video import extract_first_frame_from_video
 from src.view.sub_compare_image_view import pil_to_pixmap
 
@@ -39,17 +40,30 @@ class WorkerSignals(QObject):
     batch_loaded = pyqtSignal(list)   # 批量加载完成信号
 
 
-class ImagePreloader(QRunnable):
-    """改进的图片预加载工作线程"""
-    def __init__(self, file_paths, batch):
-        super().__init__()
+class ImagePreloader:
+    """改进的图片预加载调度器
+    
+    多个工作线程从共享的优先级队列中取任务, 表格可见区域的行通过prioritize()提升到队首,
+    调用cancel()或设置_stop后所有未开始的任务立即丢弃
+    """
+    def __init__(self, file_paths, batch, workers=None):
         self.file_paths = file_paths
         self.batch = batch
+        self.workers = workers or max(2, min(8, (os.cpu_count() or 4) // 2))
         self.signals = WorkerSignals()
         self._pause = False
         self._stop = False
         self._pause_condition = threading.Event()
         self._pause_condition.set()  # 初始状态为未暂停
+        # 共享优先级队列: (优先级, 序号, 文件路径), 默认按传入顺序, 可见区域的任务优先级为负数
+        self._queue = [(1, i, path) for i, path in enumerate(file_paths) if path]
+        self._queued = set(path for _, _, path in self._queue)
+        self._taken = set()       # 已被工作线程取出(正在生成或已完成)的文件
+        self._done = set()        # 图标已通过batch_loaded发送的文件
+        self._bump = 0
+        self._loaded = 0
+        self._active = 0
+        self._lock = threading.Lock()
         
     def pause(self):
         """暂停预加载"""
@@ -60,40 +74,111 @@ class ImagePreloader(QRunnable):
         """恢复预加载"""
         self._pause = False
         self._pause_condition.set()
+
+    def cancel(self):
+        """取消预加载, 丢弃所有未开始的任务"""
+        self._stop = True
+        with self._lock:
+            self._queue = []
+        self._pause_condition.set()
+
+    def prioritize(self, paths):
+        """将指定文件(通常为表格可见区域)提升到队首, 后提升的任务先执行
         
+        Returns:
+            list: 需要另行加载的文件路径(图标已发送过或不属于本次预加载); 正在生成的文件稍后会发送, 不返回
+        """
+        skipped = []
+        with self._lock:
+            self._bump -= 1
+            for i, path in enumerate(paths):
+                if self._stop or path not in self._queued or path in self._done:
+                    skipped.append(path)
+                elif path not in self._taken:
+                    heapq.heappush(self._queue, (self._bump, i, path))
+        return skipped
+
+    def start(self, threadpool):
+        """在线程池中启动多个工作线程"""
+        self._active = self.workers
+        heapq.heapify(self._queue)
+        for _ in range(self.workers):
+            threadpool.start(_PreloadWorker(self))
+
+    def _next_path(self):
+        """从优先级队列中取出下一个未处理的文件路径, 队列为空返回None"""
+        with self._lock:
+            while self._queue:
+                _, _, path = heapq.heappop(self._queue)
+                if path not in self._taken:
+                    self._taken.add(path)
+                    return path
+            return None
+
+    def _on_loaded(self):
+        """更新加载进度"""
+        with self._lock:
+            self._loaded += 1
+            loaded = self._loaded
+        self.signals.progress.emit(loaded, len(self._queued))
+
+    def _emit_batch(self, batch):
+        """发送一批图标, 并记录为已完成"""
+        self.signals.batch_loaded.emit(batch)
+        with self._lock:
+            self._done.update(path for path, _ in batch)
+
+    def _on_worker_finished(self):
+        """最后一个工作线程结束时提交缩略图存储并发送完成信号"""
+        with self._lock:
+            self._active -= 1
+            last = self._active == 0
+        if last:
+            ThumbnailStore.flush()
+            self.signals.finished.emit()
+
+
+class _PreloadWorker(QRunnable):
+    """预加载工作线程, 从调度器的共享队列中取任务生成图标"""
+    def __init__(self, preloader):
+        super().__init__()
+        self.preloader = preloader
+
     def run(self):
+        preloader = self.preloader
         try:
             batch = []
-            batch_size = self.batch
-            total = len(self.file_paths)
-            for i, file_path in enumerate(self.file_paths):
-                if self._stop:
-                    break
+            last_emit = time.time()
+            while not preloader._stop:
                 # 使用 Event 来实现暂停
-                self._pause_condition.wait()
-                if file_path:
-                    # 使用缓存系统获取图标
-                    icon = IconCache.get_icon(file_path)  
-                    batch.append((file_path, icon))
-                    # 按照batch_size按批次发送
-                    if len(batch) >= batch_size:
-                        self.signals.batch_loaded.emit(batch)
-                        batch = []
-                    self.signals.progress.emit(i + 1, total)
+                preloader._pause_condition.wait()
+                if preloader._stop or (file_path := preloader._next_path()) is None:
+                    break
+                # 使用缓存系统获取图标
+                icon = IconCache.get_icon(file_path)
+                batch.append((file_path, icon))
+                preloader._on_loaded()
+                # 按照batch_size或时间间隔按批次发送, 保证可见区域的图标及时显示
+                if len(batch) >= preloader.batch or time.time() - last_emit >= 0.1:
+                    preloader._emit_batch(batch)
+                    batch = []
+                    last_emit = time.time()
             # 发送最后的批次
-            if batch:  
-                self.signals.batch_loaded.emit(batch)
-            self.signals.finished.emit()
+            if batch and not preloader._stop:
+                preloader._emit_batch(batch)
         except Exception as e:
-            self.signals.error.emit(str(e))
+            preloader.signals.error.emit(str(e))
+        finally:
+            preloader._on_worker_finished()
 
 
 class IconCache:
     """图标缓存类"""
-    _max_cache_size = 200  # 最大缓存数量，超过会删除最旧的缓存
+    _max_cache_size = 200  # 进程内lru_cache的最大缓存数量; 磁盘缓存容量由ThumbnailStore按字节数限制
     _cache_base_dir = BASEPATH / "cache"
-    _cache_dir = BASEPATH / "cache" / "icons"
-    _cache_index_file = BASEPATH / "cache" / "icons.json"
+    # 旧版本的单文件图标缓存目录以及json索引，仅用于清理
+    _legacy_cache_dir = BASEPATH / "cache" / "icons"
+    _legacy_cache_index_file = BASEPATH / "cache" / "icons.json"
     
     # 视频文件格式
     VIDEO_FORMATS = ('.mp4', '.avi', '.mov', '.wmv', '.mpeg', '.mpg', '.mkv') 
@@ -110,12 +195,11 @@ class IconCache:
     def get_icon(cls, file_path):
         """获取图标，优先从缓存获取"""
         try:
-            # 检查文件缓存
-            cache_path = cls._get_cache_path(file_path)
-            if Path(cache_path).exists():
-                # print("获取图标, 进入文件缓存")
-                icon = QIcon(cache_path)
-                return icon
+            # 检查缩略图存储
+            if (data := ThumbnailStore.get(cls._get_cache_key(file_path))) is not None:
+                pixmap = QPixmap()
+                if pixmap.loadFromData(data, "PNG"):
+                    return QIcon(pixmap)
 
             # 生成新图标 
             if icon := cls._generate_icon(file_path):
@@ -126,12 +210,11 @@ class IconCache:
             print(f"获取图标失败: {e}")
             return QIcon()
 
-    # 在_get_cache_path方法中添加文件修改时间校验
+    # 在_get_cache_key方法中添加文件修改时间校验
     @classmethod
-    def _get_cache_path(cls, file_path):
+    def _get_cache_key(cls, file_path):
         file_stat = os.stat(file_path)
-        file_hash = hashlib.md5(f"{file_path}-{file_stat.st_mtime}".encode()).hexdigest()
-        return str(cls._cache_dir / f"{file_hash}.png")
+        return hashlib.md5(f"{file_path}-{file_stat.st_mtime}".encode()).hexdigest()
 
     @classmethod
     def _generate_icon(cls, file_path):
@@ -153,10 +236,17 @@ class IconCache:
             
             # 图片文件处理
             elif file_ext in cls.IMAGE_FORMATS:
-                # HEIC文件处理,自动转换为jpg格式
+                # HEIC文件处理,优先使用内嵌缩略图, 不存在时在内存中解码主图后缩小, 不再转存jpg
                 if file_ext == ".heic":
-                    if new_path:= extract_jpg_from_heic(file_path):
-                        file_path = new_path
+                    if (thumbnail := extract_thumbnail_from_heic(file_path)) and bool(pixmap := pil_to_pixmap(thumbnail)):
+                        return QIcon(pixmap.scaled(48, 48, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
+                    # 生成图标的解码帧不写入缓存, 避免批量加载图标时挤掉对比看图使用的大图
+                    if (img := decode_heic(file_path, use_cache=False)) is not None:
+                        scale = 48 / max(img.size)
+                        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+                        if bool(pixmap := pil_to_pixmap(img.resize(size, Image.BILINEAR, reducing_gap=2.0))):
+                            return QIcon(pixmap)
+                    return cls.get_default_icon("image_icon.png", (48, 48))
                 return cls._generate_image_icon(file_path)
             
             # 其它文件类型
@@ -179,6 +269,15 @@ class IconCache:
             QIcon: 处理后的图标对象
         """
         try:
+            # 快速方案：JPEG优先使用EXIF IFD1内嵌缩略图, 其次使用draft模式在DCT域缩小解码, 都不可用时再完整解码
+            if Path(file_path).suffix.lower() in (".jpg", ".jpeg"):
+                for loader in (load_exif_thumbnail, load_jpeg_draft):
+                    try:
+                        if (img := loader(file_path)) is not None and bool(pixmap := pil_to_pixmap(img)):
+                            return QIcon(pixmap)
+                    except Exception as e:
+                        print(f"[_generate_image_icon]-->{loader.__name__}加载失败, 尝试下一方案: {e}")
+
             # 方案一：使用QImageReader高效加载；设置自动转换（处理EXIF方向信息），设置高质量缩放
             reader = QImageReader(file_path)
             reader.setAutoTransform(True)
@@ -316,62 +415,21 @@ class IconCache:
 
     @classmethod
     def _save_to_cache(cls, file_path, icon):
-        """保存图标到缓存"""
+        """保存图标到缩略图存储"""
         try:
-            # 确保缓存目录存在
-            cls._cache_dir.mkdir(parents=True, exist_ok=True)
+            # 将图标编码为PNG字节流
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            icon.pixmap(48, 48).save(buffer, "PNG")
+            buffer.close()
 
-            # 保存图标
-            cache_path = cls._get_cache_path(file_path)
-            icon.pixmap(48, 48).save(cache_path, "PNG")
-
-            # 更新索引文件
-            cls._update_cache_index(file_path)
+            # 写入缩略图存储(批量提交)
+            ThumbnailStore.put(cls._get_cache_key(file_path), bytes(data))
 
         except Exception as e:
             print(f"保存图标缓存失败: {e}")
 
-    @classmethod
-    def _update_cache_index(cls, file_path):
-        """更新缓存索引"""
-        try:
-            # 使用临时文件保证写入原子性
-            temp_index_file = cls._cache_index_file.with_suffix('.tmp')
-            
-            # 读取现有索引（增加容错机制）
-            index = {}
-            if cls._cache_index_file.exists():
-                try:
-                    with open(cls._cache_index_file, 'r', encoding='utf-8') as f:
-                        raw_data = f.read()
-                        # 自动修复常见JSON格式错误
-                        raw_data = raw_data.replace("'", "\"")  # 替换单引号
-                        raw_data = re.sub(r',(\s*[}\]])', r'\1', raw_data)  # 修复多余逗号
-                        index = json.loads(raw_data)
-                except json.JSONDecodeError as e:
-                    print(f"检测到损坏的索引文件，正在重建... 错误详情：{e}")
-                    cls._cache_index_file.unlink()  # 删除损坏文件
-
-            # 更新索引
-            cache_path = cls._get_cache_path(file_path)
-            index[cache_path] = {
-                "original_path": file_path,  # 确保键名使用双引号
-                "timestamp": time.time()
-            }
-
-            # 写入临时文件
-            with open(temp_index_file, 'w', encoding='utf-8') as f:
-                json.dump(index, f, ensure_ascii=True, indent=4)  # 强制ASCII编码
-                
-            # 原子替换文件
-            temp_index_file.replace(cls._cache_index_file)
-
-        except Exception as e:
-            print(f"更新缓存索引失败: {e}")
-            # 清理临时文件
-            if temp_index_file.exists():
-                temp_index_file.unlink()
-
     @classmethod
     def clear_cache(cls):
         """清理本地中的缓存"""
@@ -379,16 +437,17 @@ class IconCache:
             # 清除lru_cache的缓存
             cls.get_icon.cache_clear()  
 
-            # 清除图标文件缓存
-            if cls._cache_dir.exists():
-                shutil.rmtree(cls._cache_dir)
+            # 清除缩略图存储
+            ThumbnailStore.clear()
 
-            # 清除记录图标缓存json文件
-            if cls._cache_index_file.exists():
-                force_delete_file(cls._cache_index_file)
+            # 清除旧版本遗留的图标文件缓存以及json索引文件
+            if cls._legacy_cache_dir.exists():
+                shutil.rmtree(cls._legacy_cache_dir)
+            if cls._legacy_cache_index_file.exists():
+                force_delete_file(cls._legacy_cache_index_file)
 
             # 打印提示信息
-            print(f"[Icon.py-->clear_cache]-->成功清理lru缓存、图标文件缓存以及记录图标缓存的json文件")
+            print(f"[Icon.py-->clear_cache]-->成功清理lru缓存以及缩略图存储")
         except Exception as e:
             print(f"[Icon.py-->clear_cache]-->清理缓存失败: {e}")
             
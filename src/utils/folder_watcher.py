@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import os
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+
+"""
+[提示] 表格文件夹实时监视模块
+1. 使用QFileSystemWatcher监视表格中显示的文件夹(Linux下为inotify, Windows下为ReadDirectoryChangesW),
+   无法添加监视的路径(如部分网络路径、超出系统监视数量上限)改为定时轮询文件夹快照
+2. 拍摄时文件连续写入, 变化事件先合并(防抖), 再对比相隔一个防抖间隔的两次文件夹快照(文件名, 大小, 修改时间),
+   两次一致才认为文件已经写入完成; 仍在写入的文件夹继续等待下一次检查
+3. 写入完成且与上一次同步时的快照不同的文件夹, 通过folders_changed信号一次性发送给主界面, 由主界面只更新对应的列
+"""
+
+
+def snapshot_folder(folder):
+    """文件夹快照 {文件名: (大小, 修改时间ns)}, 只统计文件; 文件夹不存在时返回None"""
+    try:
+        with os.scandir(folder) as entries:
+            snapshot = {}
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    # 扫描期间被删除的文件
+                    continue
+            return snapshot
+    except OSError:
+        return None
+
+
+class FolderWatcher(QObject):
+    """监视一组文件夹, 文件写入完成后发送发生变化的文件夹列表"""
+    folders_changed = pyqtSignal(list)    # 内容已稳定且发生变化的文件夹路径列表
+
+    def __init__(self, debounce_ms=500, poll_ms=2000, parent=None):
+        """
+        Args:
+            debounce_ms: 合并变化事件以及判断文件写入完成的时间间隔(毫秒)
+            poll_ms: 无法使用系统监视的文件夹的轮询间隔(毫秒)
+        """
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._baseline = {}      # {文件夹: 上一次同步到表格时的快照}
+        self._last_seen = {}     # {文件夹: 上一次检查时的快照}, 用于判断写入完成
+        self._dirty = set()      # 待检查的文件夹
+        self._polled = []        # 轮询的文件夹
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._check)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def set_folders(self, folders):
+        """设置监视的文件夹列表, 以当前内容作为同步基准"""
+        self.clear()
+        folders = [folder for folder in dict.fromkeys(folders) if folder and os.path.isdir(folder)]
+        if not folders:
+            return
+        self._baseline = {folder: snapshot_folder(folder) for folder in folders}
+        failed = self._watcher.addPaths(folders)
+        self._polled = [folder for folder in folders if folder in failed]
+        if self._polled:
+            print(f"[FolderWatcher]-->以下文件夹无法使用系统监视, 改为每{self._poll_timer.interval()}ms轮询: {self._polled}")
+            self._poll_timer.start()
+
+    def folders(self):
+        return list(self._baseline)
+
+    def clear(self):
+        """停止监视所有文件夹"""
+        if watched := self._watcher.directories():
+            self._watcher.removePaths(watched)
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        self._baseline.clear()
+        self._last_seen.clear()
+        self._dirty.clear()
+        self._polled = []
+
+    def _on_directory_changed(self, folder):
+        # 连续的变化事件只会推迟检查
+        if folder in self._baseline:
+            self._dirty.add(folder)
+            self._debounce_timer.start()
+
+    def _poll(self):
+        for folder in self._polled:
+            if folder not in self._dirty and snapshot_folder(folder) != self._baseline.get(folder):
+                self._dirty.add(folder)
+        if self._dirty and not self._debounce_timer.isActive():
+            self._debounce_timer.start()
+
+    def _check(self):
+        """对比两次快照, 文件写入完成的文件夹与同步基准比较后发送"""
+        changed = []
+        for folder in list(self._dirty):
+            snapshot = snapshot_folder(folder)
+            if folder not in self._last_seen or snapshot != self._last_seen[folder]:
+                # 仍有文件在写入(或刚收到变化事件), 等待下一次检查
+                self._last_seen[folder] = snapshot
+                continue
+            self._dirty.discard(folder)
+            self._last_seen.pop(folder)
+            if snapshot != self._baseline.get(folder):
+                self._baseline[folder] = snapshot
+                changed.append(folder)
+            # 文件夹被删除后重新创建时, QFileSystemWatcher会移除该路径, 需要重新添加
+            if snapshot is not None and folder not in self._polled and folder not in self._watcher.directories():
+                if not self._watcher.addPath(folder):
+                    self._polled.append(folder)
+                    self._poll_timer.start()
+        if self._dirty:
+            self._debounce_timer.start()
+        if changed:
+            self.folders_changed.emit(changed)
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import os
+import hashlib
+import threading
+from collections import OrderedDict
 from PIL import Image
 from pathlib import Path 
-from pillow_heif import read_heif
+from pillow_heif import read_heif, open_heif
 
 
 # 方法一：手动找寻上级目录，获取项目入口路径，支持单独运行该模块
@@ -14,6 +18,8 @@ if True:
 2. 苹果手机heic格式实况图可以转换成jpg
     - 暂时无法转换为mov视频,打包后非常大
     - 使用pillow_heif提取 HEIC格式图片
+3. HEIC图片优先使用decode_heic在内存中解码为PIL.Image, 直接交给缩略图/对比看图流程使用,
+   不再先转存为jpg再二次解码; 解码结果按(完整路径, 修改时间)缓存在有字节上限的HeicFrameCache中
 """
 
 def locate_video_google(data):
@@ -78,16 +84,100 @@ def extract_heic(srcfile, photo_dir, video_dir):
 
 
 
+class HeicFrameCache:
+    """HEIC解码帧缓存类, 以(完整路径, 修改时间)为键, 按解码后的字节数限制容量, 超过上限按LRU淘汰"""
+    _max_bytes = 384 * 1024 * 1024   # 最大缓存字节数, 设置为0时关闭缓存
+    _lock = threading.Lock()
+    _frames = OrderedDict()          # {(path, mtime): PIL.Image}
+    _total_bytes = 0
+
+    @staticmethod
+    def _key(srcfile):
+        """缓存键: 完整路径+修改时间, 避免不同文件夹下同名文件冲突, 文件修改后自动失效"""
+        return Path(srcfile).resolve().as_posix(), os.stat(srcfile).st_mtime_ns
+
+    @staticmethod
+    def _nbytes(image):
+        return image.width * image.height * len(image.getbands())
+
+    @classmethod
+    def get(cls, srcfile):
+        """读取缓存的解码帧, 不存在返回None"""
+        key = cls._key(srcfile)
+        with cls._lock:
+            if (image := cls._frames.get(key)) is not None:
+                cls._frames.move_to_end(key)
+            return image
+
+    @classmethod
+    def put(cls, srcfile, image):
+        """写入解码帧, 超过容量上限时淘汰最久未使用的帧"""
+        if (nbytes := cls._nbytes(image)) > cls._max_bytes:
+            return
+        key = cls._key(srcfile)
+        with cls._lock:
+            if (old := cls._frames.pop(key, None)) is not None:
+                cls._total_bytes -= cls._nbytes(old)
+            cls._frames[key] = image
+            cls._total_bytes += nbytes
+            while cls._total_bytes > cls._max_bytes:
+                _, evicted = cls._frames.popitem(last=False)
+                cls._total_bytes -= cls._nbytes(evicted)
+
+    @classmethod
+    def set_max_bytes(cls, max_bytes):
+        """设置缓存容量上限(字节), 0表示关闭缓存"""
+        with cls._lock:
+            cls._max_bytes = max(0, int(max_bytes))
+            while cls._frames and cls._total_bytes > cls._max_bytes:
+                _, evicted = cls._frames.popitem(last=False)
+                cls._total_bytes -= cls._nbytes(evicted)
+
+    @classmethod
+    def clear(cls):
+        """清空缓存"""
+        with cls._lock:
+            cls._frames.clear()
+            cls._total_bytes = 0
+
+
+# 在内存中解码HEIC图片为PIL.Image.Image对象
+def decode_heic(srcfile, use_cache=True):
+    """在内存中解码HEIC主图, 返回PIL.Image.Image对象(保留exif/icc_profile信息), 失败返回None
+
+    Args:
+        srcfile: HEIC图片路径
+        use_cache: 是否将解码结果写入HeicFrameCache; 无论是否写入都会优先读取缓存
+
+    Note:
+        返回的图像可能是缓存中的共享对象, 调用方不要原地修改或关闭, 需要修改时先copy()
+    """
+    try:
+        if (image := HeicFrameCache.get(srcfile)) is not None:
+            return image
+
+        # 使用pillow_heif解码主图, to_pillow会保留exif以及icc_profile, 方向信息已在解码时校正
+        heif_file = open_heif(srcfile)
+        image = heif_file[heif_file.primary_index].to_pillow()
+        if use_cache:
+            HeicFrameCache.put(srcfile, image)
+        return image
+    except Exception as e:
+        print(f"解码HEIC图片失败: {e}")
+        return None
+
+
 # 提取HEIC图片为jpg，并保存到缓存目录中，返回缓存路径
 def extract_jpg_from_heic(srcfile):
-    """提取HEIC图片,返回缓存路径"""
+    """提取HEIC图片,返回缓存路径; 看图流程已改用decode_heic内存解码, 该函数仅用于需要jpg文件的场景"""
     try:
         # 如果文件不存在，则返回None
         if not Path(srcfile).exists():
             raise FileNotFoundError(f"文件不存在: {srcfile}")
         
-        # 构建提取的jpg图片路径,使用pathlib处理路径，更现代和高效
-        tarfile = BASEICONPATH / "cache" / "photos" / Path(srcfile).name.replace(".heic", ".jpg")
+        # 构建提取的jpg图片路径, 文件名中加入完整路径+修改时间的哈希, 避免不同文件夹下同名文件冲突
+        digest = hashlib.md5("|".join(map(str, HeicFrameCache._key(srcfile))).encode("utf-8")).hexdigest()[:12]
+        tarfile = BASEICONPATH / "cache" / "photos" / f"{Path(srcfile).stem}_{digest}.jpg"
         tarfile.parent.mkdir(parents=True, exist_ok=True)
 
         # 如果文件存在，则直接返回
@@ -95,8 +185,8 @@ def extract_jpg_from_heic(srcfile):
             return tarfile._str
 
         # 使用pillow_heif提取 HEIC格式图片
-        heif_file = read_heif(srcfile)
-        image = Image.frombytes(mode=heif_file.mode, size=heif_file.size, data=heif_file.data)
+        if (image := decode_heic(srcfile, use_cache=False)) is None:
+            return None
                 
         # 保存图片
         image.save(tarfile, "JPEG", quality=100)
@@ -115,16 +205,32 @@ def extract_pil_image_from_heic(srcfile):
             print(f"文件不存在: {srcfile}")
             return False
 
-        # 使用pillow_heif提取 HEIC格式图片
-        heif_file = read_heif(srcfile)
-        image = Image.frombytes(mode=heif_file.mode, size=heif_file.size, data=heif_file.data)
-        
-        return image
+        # 使用pillow_heif提取 HEIC格式图片, 复用内存解码及缓存, 返回副本以便调用方修改
+        image = decode_heic(srcfile)
+        return image.copy() if image is not None else None
     except Exception as e:
         print(f"提取HEIC图片失败: {e}")
         return None
 
 
+# 提取HEIC图片内嵌的缩略图为PIL.Image.Image对象
+def extract_thumbnail_from_heic(srcfile, min_size=48):
+    """提取HEIC主图内嵌的缩略图(不解码主图),返回PIL.Image.Image对象, 不存在或尺寸不足时返回None"""
+    try:
+        heif_file = open_heif(srcfile)
+        primary = heif_file[heif_file.primary_index]
+        # 选择短边不小于min_size的最小缩略图
+        candidates = []
+        for index in range(len(primary.info.get("thumbnails", []))):
+            thumbnail = primary.get_thumbnail(index).to_pillow()
+            if min(thumbnail.size) >= min_size:
+                candidates.append(thumbnail)
+        return min(candidates, key=lambda im: im.size[0] * im.size[1]) if candidates else None
+    except Exception as e:
+        print(f"提取HEIC内嵌缩略图失败: {e}")
+        return None
+
+
 def extract_mov_from_heic(srcfile, video_dir):
     """提取HEIC图片中的MOV视频"""
     pass
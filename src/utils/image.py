@@ -7,10 +7,16 @@
 @Description  :处理图片, 获取基础的exif信息
 '''
 
+import io
+import os
+import time
+import struct
 from PIL import Image
 from pathlib import Path
 from fractions import Fraction
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import QRunnable, QObject, pyqtSignal
 
 # 设置视频首帧图缓存路径
 BASEICONPATH = Path(__file__).parent.parent.parent
@@ -167,4 +173,310 @@ class ImageProcessor:
         
     def __del__(self):
         """析构函数，确保资源被释放。"""
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+"""
+[提示] 冷文件夹的图片头信息快速解析
+1. probe_image_header() 只读取JPEG的APP1(EXIF/TIFF)和SOF段、TIFF的IFD以及PNG的IHDR, 不做PIL的完整解析
+2. 解析结果与ImageProcessor保持一致: (宽, 高, 曝光时间"1/分母", ISO)
+3. 其它格式(heic/webp/bmp等)回退到ImageProcessor
+4. ExifProbeWorker 在后台线程池中并行解析所有选中文件夹的图片, 按批次回传结果, 用于表格流式刷新
+"""
+# JPEG中携带图像尺寸的SOF标记
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# TIFF标签: 宽、高、Exif子IFD指针、曝光时间、ISO
+_TAG_WIDTH, _TAG_HEIGHT, _TAG_EXIF_IFD = 0x0100, 0x0101, 0x8769
+_TAG_EXPOSURE_TIME, _TAG_ISO = 0x829A, 0x8827
+# TIFF标签: 方向(IFD0)、内嵌缩略图偏移和长度(IFD1)
+_TAG_ORIENTATION, _TAG_THUMB_OFFSET, _TAG_THUMB_LENGTH = 0x0112, 0x0201, 0x0202
+# TIFF数据类型对应的字节数
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+
+
+def _read_tiff_tags(data: bytes, wanted: set, read_ifd1: bool = False) -> Dict[int, Any]:
+    """解析TIFF数据块(IFD0以及Exif子IFD, read_ifd1为True时还解析缩略图所在的IFD1), 返回需要的标签值"""
+    if len(data) < 8 or data[:2] not in (b"II", b"MM"):
+        return {}
+    endian = "<" if data[:2] == b"II" else ">"
+    tags = {}
+
+    def read_ifd(offset, depth=0):
+        """解析单个IFD, 返回下一个IFD的偏移"""
+        if offset <= 0 or offset + 2 > len(data) or depth > 2:
+            return 0
+        count = struct.unpack_from(endian + "H", data, offset)[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            if entry + 12 > len(data):
+                break
+            tag, typ, num = struct.unpack_from(endian + "HHI", data, entry)
+            if tag == _TAG_EXIF_IFD:
+                read_ifd(struct.unpack_from(endian + "I", data, entry + 8)[0], depth + 1)
+                continue
+            if tag not in wanted or tag in tags or typ not in _TIFF_TYPE_SIZES:
+                continue
+            size = _TIFF_TYPE_SIZES[typ] * num
+            value_offset = entry + 8 if size <= 4 else struct.unpack_from(endian + "I", data, entry + 8)[0]
+            if value_offset + size > len(data):
+                continue
+            if typ == 3:
+                values = struct.unpack_from(endian + "H" * num, data, value_offset)
+            elif typ == 4:
+                values = struct.unpack_from(endian + "I" * num, data, value_offset)
+            elif typ == 5:
+                raw = struct.unpack_from(endian + "I" * (2 * num), data, value_offset)
+                values = tuple(zip(raw[0::2], raw[1::2]))
+            else:
+                continue
+            tags[tag] = values[0] if num == 1 else values
+        next_offset = offset + 2 + count * 12
+        return struct.unpack_from(endian + "I", data, next_offset)[0] if next_offset + 4 <= len(data) else 0
+
+    ifd1_offset = read_ifd(struct.unpack_from(endian + "I", data, 4)[0])
+    if read_ifd1:
+        read_ifd(ifd1_offset)
+    return tags
+
+
+def _format_exposure_time(value) -> Optional[str]:
+    """将曝光时间(分子, 分母)格式化为"1/分母", 与ImageProcessor.get_image_exposure_time保持一致"""
+    if not isinstance(value, tuple) or len(value) != 2:
+        return None
+    numerator, denominator = value
+    if numerator == 0:
+        return None
+    return f"1/{denominator // numerator}"
+
+
+def _scan_jpeg(f) -> Tuple:
+    """逐段读取JPEG标记, 只读取APP1(Exif)和SOF段, 返回(宽, 高, Exif中的TIFF数据块)"""
+    width = height = exif = None
+    f.seek(2)
+    while True:
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            break
+        marker, length = header[1], struct.unpack(">H", header[2:])[0]
+        # 跳过填充字节
+        if marker == 0xFF:
+            f.seek(-3, os.SEEK_CUR)
+            continue
+        if marker == 0xDA or marker == 0xD9:  # SOS/EOI之后是图像数据, 停止解析
+            break
+        if marker == 0xE1 and exif is None:
+            segment = f.read(length - 2)
+            if segment[:6] == b"Exif\x00\x00":
+                exif = segment[6:]
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", f.read(5)[1:])
+            break
+        f.seek(length - 2, os.SEEK_CUR)
+    return width, height, exif
+
+
+def _probe_jpeg(f) -> Optional[Tuple]:
+    """解析JPEG的宽、高、曝光时间和ISO"""
+    width, height, exif = _scan_jpeg(f)
+    if width is None:
+        return None
+    tags = _read_tiff_tags(exif, {_TAG_EXPOSURE_TIME, _TAG_ISO}) if exif else {}
+    return width, height, _format_exposure_time(tags.get(_TAG_EXPOSURE_TIME)), tags.get(_TAG_ISO)
+
+
+def read_exif_thumbnail(image_path: str, min_size: int = 48) -> Optional[Tuple[bytes, int]]:
+    """读取JPEG中EXIF IFD1内嵌的缩略图
+
+    内嵌缩略图与主图宽高比不一致(带黑边)或尺寸小于min_size时视为不可用
+
+    Args:
+        image_path (str): 图片文件路径
+        min_size (int): 缩略图短边的最小尺寸
+
+    Returns:
+        Optional[Tuple[bytes, int]]: (缩略图JPEG字节流, EXIF方向), 不存在或不可用时返回None
+    """
+    with open(image_path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        width, height, exif = _scan_jpeg(f)
+    if not exif or not width or not height:
+        return None
+    tags = _read_tiff_tags(exif, {_TAG_ORIENTATION, _TAG_THUMB_OFFSET, _TAG_THUMB_LENGTH}, read_ifd1=True)
+    offset, length = tags.get(_TAG_THUMB_OFFSET), tags.get(_TAG_THUMB_LENGTH)
+    if not offset or not length or offset + length > len(exif):
+        return None
+    data = exif[offset:offset + length]
+    if data[:2] != b"\xff\xd8":
+        return None
+    # 校验缩略图的尺寸以及宽高比
+    thumb_width, thumb_height, _ = _scan_jpeg(io.BytesIO(data))
+    if not thumb_width or not thumb_height or min(thumb_width, thumb_height) < min_size:
+        return None
+    if abs(thumb_width / thumb_height - width / height) > 0.02 * (width / height):
+        return None
+    return data, tags.get(_TAG_ORIENTATION, 1)
+
+
+# EXIF方向对应的PIL转置方式, 与ImageOps.exif_transpose保持一致
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def load_exif_thumbnail(image_path: str, size: Tuple[int, int] = (48, 48)) -> Optional[Image.Image]:
+    """读取EXIF内嵌缩略图并按主图的EXIF方向旋转、等比例缩放到size以内, 不可用时返回None"""
+    if (result := read_exif_thumbnail(image_path, min(size))) is None:
+        return None
+    data, orientation = result
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", size)
+    if method := _EXIF_TRANSPOSE.get(orientation):
+        image = image.transpose(method)
+    image.thumbnail(size)
+    return image
+
+
+def load_jpeg_draft(image_path: str, size: Tuple[int, int] = (48, 48)) -> Optional[Image.Image]:
+    """使用JPEG的draft模式(DCT域1/2~1/8缩小解码)加载图片, 并按EXIF方向旋转、等比例缩放到size以内"""
+    with Image.open(image_path) as image:
+        if image.format != "JPEG":
+            return None
+        image.draft("RGB", (size[0] * 2, size[1] * 2))
+        orientation = image.getexif().get(_TAG_ORIENTATION, 1)
+        image.thumbnail(size)
+    if method := _EXIF_TRANSPOSE.get(orientation):
+        image = image.transpose(method)
+    return image
+
+
+def probe_image_header(image_path: str) -> Optional[Tuple]:
+    """只读取文件头获取图片的宽、高、曝光时间和ISO
+
+    Args:
+        image_path (str): 图片文件路径
+
+    Returns:
+        Optional[Tuple]: (width, height, exposure_time, iso), 不支持的格式返回None
+    """
+    with open(image_path, "rb") as f:
+        head = f.read(32)
+        if head[:2] == b"\xff\xd8":
+            return _probe_jpeg(f)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", head[16:24])
+            return width, height, None, None
+        if head[:4] in (b"II*\x00", b"MM\x00*"):
+            f.seek(0)
+            tags = _read_tiff_tags(f.read(1 << 20), {_TAG_WIDTH, _TAG_HEIGHT, _TAG_EXPOSURE_TIME, _TAG_ISO})
+            if _TAG_WIDTH in tags and _TAG_HEIGHT in tags:
+                return (tags[_TAG_WIDTH], tags[_TAG_HEIGHT],
+                        _format_exposure_time(tags.get(_TAG_EXPOSURE_TIME)), tags.get(_TAG_ISO))
+    return None
+
+
+def probe_image_info(image_path: str) -> Tuple:
+    """获取图片的宽、高、曝光时间和ISO, 优先解析文件头, 失败时回退到ImageProcessor"""
+    try:
+        if (info := probe_image_header(image_path)) is not None:
+            return info
+    except Exception:
+        pass
+    with ImageProcessor(image_path) as img:
+        return img.width, img.height, img.exposure_time, img.iso
+
+
+def probe_images_parallel(image_paths, max_workers=None) -> Dict[str, Optional[Tuple]]:
+    """使用线程池并行解析多张图片的头信息, 解析失败的图片对应值为None"""
+    def _safe_probe(path):
+        try:
+            return probe_image_info(path)
+        except Exception as e:
+            print(f"[probe_images_parallel]-->获取图片exif信息失败 {path}: {e}")
+            return None
+
+    max_workers = max_workers or min(32, (os.cpu_count() or 4) * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(image_paths, executor.map(_safe_probe, image_paths)))
+
+
+class ExifProbeSignals(QObject):
+    """图片头信息解析线程信号类"""
+    batch_probed = pyqtSignal(list)   # 批量解析完成信号, [(path, width, height, exposure_time, iso), ...]
+    finished = pyqtSignal()           # 完成信号
+    error = pyqtSignal(str)           # 错误信号
+
+
+class ExifProbeWorker(QRunnable):
+    """后台并行解析图片头信息, 按批次发送结果并写回元数据索引"""
+    def __init__(self, items, batch_interval=0.1, max_workers=None):
+        """
+        Args:
+            items: [(path, size, mtime, ctime), ...] 待解析的图片以及stat信息
+            batch_interval: 结果批量发送的时间间隔(秒)
+            max_workers: 线程池大小, 默认cpu核数*2
+        """
+        super().__init__()
+        self.items = items
+        self.batch_interval = batch_interval
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 4) * 2)
+        self.signals = ExifProbeSignals()
+        self._stop = False
+
+    def cancel(self):
+        """取消解析任务"""
+        self._stop = True
+
+    def _probe(self, item):
+        """线程池任务, 解析单张图片"""
+        if self._stop:
+            return item, None
+        try:
+            return item, probe_image_info(item[0])
+        except Exception as e:
+            print(f"[ExifProbeWorker]-->获取图片exif信息失败 {item[0]}: {e}")
+            return item, None
+
+    def _flush(self, batch, meta_rows):
+        """发送一批结果并写回元数据索引"""
+        from src.utils.meta_index import ImageMetaIndex
+        if batch:
+            self.signals.batch_probed.emit(batch)
+        if meta_rows:
+            ImageMetaIndex.update(meta_rows)
+
+    def run(self):
+        try:
+            batch, meta_rows = [], []
+            last_emit = time.time()
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            try:
+                futures = [executor.submit(self._probe, item) for item in self.items]
+                for future in as_completed(futures):
+                    if self._stop:
+                        break
+                    (path, size, mtime, ctime), info = future.result()
+                    if info is None:
+                        continue
+                    batch.append((path, *info))
+                    meta_rows.append((path, size, mtime, ctime, *info))
+                    # 按时间间隔批量发送, 避免频繁触发界面刷新
+                    if time.time() - last_emit >= self.batch_interval:
+                        self._flush(batch, meta_rows)
+                        batch, meta_rows = [], []
+                        last_emit = time.time()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if not self._stop:
+                self._flush(batch, meta_rows)
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
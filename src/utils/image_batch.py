@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import queue
+import multiprocessing
+
+from PIL import Image
+
+
+"""
+[提示] 图片批量压缩/格式转换进程池模块
+1. 单个文件的压缩/转换逻辑为模块级纯函数, 子进程可以直接导入, 不依赖Qt
+2. 文件按大小降序切分为小块放入共享任务队列, 空闲的工作进程自行领取下一块(work stealing), 大文件不会拖住某一个固定分片
+3. 每处理完一个文件, 通过结果队列回传一个小元组(行号, 结果字典), 由调用方转换为逐行的进度信号
+4. 使用spawn方式启动子进程, Windows与Linux行为一致; 打包后的程序需要在入口调用multiprocessing.freeze_support()
+5. 工作进程常驻, 由调用方(每个窗口一个进程池)在多次任务之间复用, 关闭时调用shutdown
+"""
+
+# 支持的图片格式 (PIL/Pillow)
+SUPPORTED_FORMATS = {
+    'JPEG': ['.jpg', '.jpeg'],
+    'PNG': ['.png'],
+    'WEBP': ['.webp'],
+    'TIFF': ['.tiff', '.tif'],
+    'BMP': ['.bmp'],
+    'GIF': ['.gif'],
+    'ICO': ['.ico'],
+    'TGA': ['.tga'],
+    'PSD': ['.psd'],
+    'PCX': ['.pcx'],
+    'XBM': ['.xbm'],
+    'XPM': ['.xpm'],
+    'PPM': ['.ppm', '.pgm', '.pbm'],
+    'DDS': ['.dds'],
+    'DIB': ['.dib'],
+    'EPS': ['.eps'],
+    'FLI': ['.fli', '.flc'],
+    'HEIC': ['.heic', '.heif'],  # 需要 pillow-heif
+    'AVIF': ['.avif'],  # 需要 pillow-avif
+    'JP2': ['.jp2', '.j2k', '.jpc'],  # JPEG 2000
+    'SPIDER': ['.spi'],
+    'SUN': ['.ras'],
+    'WAL': ['.wal']
+}
+
+
+def _result(status, message, success=None, size=0, info=None):
+    """单个文件的处理结果; success为None时不计入成功/失败统计"""
+    return {'status': status, 'message': message, 'success': success, 'size': size, 'info': info}
+
+
+def convert_image_file(file_info, settings):
+    """转换单个图片文件的格式
+
+    Args:
+        file_info: 文件信息字典, 至少包含'path'
+        settings: 格式转换设置(target_format, quality, keep_exif, output_dir, naming_mode, prefix)
+
+    Returns:
+        dict: 处理结果, 见_result
+    """
+    input_path = file_info['path']
+    try:
+        # 获取设置
+        target_format = settings.get('target_format', 'JPEG')
+        quality = settings.get('quality', 85)
+        keep_exif = settings.get('keep_exif', True)
+        output_dir = settings.get('output_dir') or os.path.dirname(input_path)
+        naming_mode = settings.get('naming_mode', '保持原名')
+        prefix = settings.get('prefix', '')
+
+        # 生成输出文件名
+        original_name = os.path.basename(input_path)
+        name_without_ext = os.path.splitext(original_name)[0]
+        target_ext = SUPPORTED_FORMATS.get(target_format, ['.jpg'])[0]
+
+        if naming_mode == "保持原名":
+            output_filename = name_without_ext + target_ext
+        elif naming_mode == "添加格式后缀":
+            output_filename = f"{name_without_ext}_{target_format.lower()}{target_ext}"
+        else:  # 自定义前缀
+            output_filename = prefix + name_without_ext + target_ext
+
+        output_path = os.path.join(output_dir, output_filename)
+
+        # 格式相同且路径相同，跳过转换, 跳过的文件计入成功数
+        original_ext = os.path.splitext(original_name)[1].lower()
+        if original_ext == target_ext.lower() and output_path == input_path:
+            return _result("跳过", "格式相同，无需转换", True, 0)
+
+        # 确保输出目录存在
+        os.makedirs(output_dir, exist_ok=True)
+
+        with Image.open(input_path) as image:
+            # 保留原始EXIF信息
+            exif_dict = image.info.get('exif') if keep_exif else None
+
+            if target_format == 'JPEG' and image.mode in ['RGBA', 'P']:
+                # 转换为RGB模式（JPEG需要）, 透明区域使用白色背景
+                if image.mode == 'P':
+                    image = image.convert('RGBA')
+                processed_image = Image.new('RGB', image.size, (255, 255, 255))
+                processed_image.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+            elif target_format == 'GIF' and image.mode != 'P':
+                processed_image = image.convert('P', palette=Image.ADAPTIVE)
+            else:
+                processed_image = image
+
+            save_kwargs = {}
+            if target_format == 'JPEG':
+                save_kwargs['quality'] = quality
+                # 质量100%时跳过压缩优化
+                if quality < 100:
+                    save_kwargs['optimize'] = True
+                if exif_dict:
+                    save_kwargs['exif'] = exif_dict
+            elif target_format == 'PNG':
+                # 使用较快的压缩级别
+                save_kwargs['compress_level'] = min(6, int((100 - quality) / 16))
+                save_kwargs['optimize'] = False
+            elif target_format == 'WEBP':
+                save_kwargs['quality'] = quality
+                save_kwargs['method'] = 4 if quality < 100 else 6
+            elif target_format == 'TIFF':
+                save_kwargs['compression'] = 'tiff_lzw'
+
+            processed_image.save(output_path, format=target_format, **save_kwargs)
+
+        # 计算文件大小变化
+        original_size = os.path.getsize(input_path)
+        converted_size = os.path.getsize(output_path)
+        size_change = converted_size - original_size
+        info = {
+            'converted_size': converted_size,
+            'size_change': size_change,
+            'size_change_percent': (size_change / original_size) * 100 if original_size > 0 else 0,
+            'output_filename': output_filename
+        }
+        return _result("完成", f"转换完成 | 输出: {output_filename}", True, converted_size, info)
+
+    except Exception as e:
+        return _result("错误", f"转换失败: {str(e)}", False, 0)
+
+
+def compress_output_path(input_path, file_name, settings):
+    """生成压缩输出路径, 格式相同且输出目录相同时添加_compressed后缀"""
+    output_dir = settings.get('output_dir') or os.path.dirname(input_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    name, ext = os.path.splitext(file_name)
+    output_ext = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}.get(settings.get('output_format', 'JPEG'), '.jpg')
+    if ext.lower() == output_ext.lower() and output_dir == os.path.dirname(input_path):
+        return os.path.join(output_dir, f"{name}_compressed{output_ext}")
+    return os.path.join(output_dir, f"{name}{output_ext}")
+
+
+def apply_resize(img, settings):
+    """按百分比或像素调整尺寸"""
+    if settings.get('resize_mode', 'percentage') == 'percentage':
+        percentage = settings.get('resize_percentage', 80)
+        new_size = (int(img.width * percentage / 100), int(img.height * percentage / 100))
+    else:
+        new_size = (settings.get('resize_width', 800), settings.get('resize_height', 600))
+    return img.resize(new_size, Image.Resampling.LANCZOS)
+
+
+def compress_image_file(file_info, settings):
+    """压缩单个图片文件
+
+    Args:
+        file_info: 文件信息字典, 至少包含'path'和'name'
+        settings: 压缩设置(quality, output_format, resize_*, output_dir, watermark)
+
+    Returns:
+        dict: 处理结果, 见_result
+    """
+    input_path = file_info['path']
+    try:
+        output_path = compress_output_path(input_path, file_info['name'], settings)
+
+        # 输出文件已存在或输入输出路径相同时跳过, 跳过的文件计入成功数
+        if os.path.exists(output_path) or input_path == output_path:
+            return _result("跳过", "文件已存在或格式相同", True, 0)
+
+        with Image.open(input_path) as img:
+            # 转换为RGB模式（JPEG需要）, 透明区域使用白色背景
+            if img.mode in ('RGBA', 'LA', 'P'):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            if settings.get('resize_enabled', False):
+                img = apply_resize(img, settings)
+
+            # 水印暂未实现, 保持原图
+
+            output_format = settings.get('output_format', 'JPEG')
+            quality = settings.get('quality', 85)
+            save_kwargs = {'format': output_format}
+            if output_format == 'JPEG':
+                save_kwargs['quality'] = quality
+                save_kwargs['optimize'] = True
+            elif output_format == 'WEBP':
+                save_kwargs['quality'] = quality
+                save_kwargs['method'] = 6  # 最佳压缩
+            img.save(output_path, **save_kwargs)
+
+        compressed_size = os.path.getsize(output_path)
+        original_size = os.path.getsize(input_path)
+        info = {
+            'compressed_size': compressed_size,
+            'output_path': output_path,
+            'saved_space': original_size - compressed_size,
+            'compression_ratio': (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
+        }
+        return _result("完成", f"压缩完成: {os.path.basename(output_path)}", True, compressed_size, info)
+
+    except Exception as e:
+        return _result("错误", f"压缩失败: {str(e)}", False, 0)
+
+
+TASK_FUNCTIONS = {'compress': compress_image_file, 'convert': convert_image_file}
+
+
+def make_chunks(files_info, chunk_bytes=32 * 1024 * 1024, max_chunk_files=8):
+    """按文件大小降序切分任务块: 大文件单独成块且最先处理, 小文件合并成块以减少队列通信
+
+    Returns:
+        list: [[(行号, 文件信息), ...], ...]
+    """
+    def file_size(item):
+        try:
+            return os.path.getsize(item[1]['path'])
+        except OSError:
+            return 0
+
+    chunks, current, current_bytes = [], [], 0
+    for item in sorted(enumerate(files_info), key=file_size, reverse=True):
+        current.append(item)
+        current_bytes += file_size(item)
+        if current_bytes >= chunk_bytes or len(current) >= max_chunk_files:
+            chunks.append(current)
+            current, current_bytes = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _worker_main(task_queue, result_queue, cancelled):
+    """常驻工作进程: 循环领取任务块(任务编号, 类型, 设置, [(行号, 文件信息), ...]), 直到收到None
+
+    领取任务块时先回传(任务编号, 进程号, None, 该块的行号列表), 每处理完一个文件回传(任务编号, 进程号, 行号, 结果);
+    任务编号不大于cancelled的任务块直接跳过(已停止或已结束的任务)
+    """
+    pid = os.getpid()
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        job_id, kind, settings, chunk = task
+        if job_id <= cancelled.value:
+            continue
+        result_queue.put((job_id, pid, None, [row for row, _ in chunk]))
+        func = TASK_FUNCTIONS[kind]
+        for row, file_info in chunk:
+            if job_id <= cancelled.value:
+                break
+            result_queue.put((job_id, pid, row, func(file_info, settings)))
+
+
+class ImageTaskPool:
+    """图片批量处理进程池, 共享任务队列 + 结果队列
+
+    工作进程在第一次执行任务时启动并常驻, 同一窗口的多次压缩/转换复用同一组进程;
+    spawn方式启动的子进程会重新导入主模块(hiviewer.py, 约1秒), 常驻后只在第一次任务或进程数增加时付出这部分开销
+    """
+
+    def __init__(self):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._cancelled = self._ctx.Value('i', 0)     # 不大于该编号的任务已停止/结束
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._processes = []
+        self._job_id = 0
+
+    def stop(self):
+        """请求停止当前任务, 工作进程处理完当前文件后跳过该任务剩余的文件"""
+        self._cancelled.value = self._job_id
+
+    def shutdown(self):
+        """停止当前任务并结束所有工作进程(窗口关闭时调用)"""
+        self.stop()
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._task_queue.cancel_join_thread()
+        self._result_queue.cancel_join_thread()
+
+    def _resize(self, workers):
+        """调整常驻工作进程数: 清理已退出的进程, 不足时启动新进程, 多余时发送None使其退出"""
+        self._processes = [process for process in self._processes if process.is_alive()]
+        while len(self._processes) < workers:
+            process = self._ctx.Process(target=_worker_main, daemon=True,
+                                        args=(self._task_queue, self._result_queue, self._cancelled))
+            process.start()
+            self._processes.append(process)
+        extra = len(self._processes) - workers
+        if extra > 0:
+            for _ in range(extra):
+                self._task_queue.put(None)
+            deadline = time.monotonic() + 5
+            while sum(process.is_alive() for process in self._processes) > workers and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self._processes = [process for process in self._processes if process.is_alive()]
+
+    def run(self, kind, files_info, settings, on_result, workers=None):
+        """在调用线程中阻塞执行一个任务, 每个文件处理完成时调用on_result(行号, 结果字典);
+        工作进程异常退出导致无法处理的文件回传"错误"状态
+
+        Args:
+            kind: 'compress' 或 'convert'
+            files_info: 文件信息字典列表, 行号即列表下标
+            settings: 压缩/转换设置字典, 原样传给子进程
+            on_result: 结果回调
+            workers: 工作进程数, 默认为CPU核数
+
+        Returns:
+            int: 已回传处理结果的文件数(不含异常退出导致的错误)
+        """
+        self._job_id += 1
+        job_id = self._job_id
+        workers = max(1, min(workers or os.cpu_count() or 1, len(files_info) or 1))
+        self._resize(workers)
+        for chunk in make_chunks(files_info):
+            self._task_queue.put((job_id, kind, settings, chunk))
+
+        pending = set(range(len(files_info)))
+        held = {}            # {进程号: 已领取但尚未回传结果的行号}
+        received, crashed, idle_checks = 0, False, 0
+        try:
+            while pending and job_id > self._cancelled.value:
+                try:
+                    result_job, pid, row, result = self._result_queue.get(timeout=0.2)
+                except queue.Empty:
+                    alive = {process.pid for process in self._processes if process.is_alive()}
+                    # 异常退出的进程已领取的文件不会再有结果
+                    for dead in [pid for pid in held if pid not in alive]:
+                        crashed = True
+                        self._fail_rows(held.pop(dead) & pending, pending, on_result)
+                    crashed = crashed or len(alive) < len(self._processes)
+                    if not alive:
+                        break
+                    # 有进程异常退出且其余进程连续两次都处于空闲时, 剩余的文件已随退出的进程丢失
+                    idle = crashed and self._task_queue.empty() and not any(held.get(pid) for pid in alive)
+                    idle_checks = idle_checks + 1 if idle else 0
+                    if idle_checks >= 2:
+                        break
+                    continue
+                idle_checks = 0
+                if result_job != job_id:
+                    continue      # 之前已停止的任务残留的结果
+                if row is None:
+                    held.setdefault(pid, set()).update(result)
+                    continue
+                held.get(pid, set()).discard(row)
+                if row in pending:
+                    pending.discard(row)
+                    received += 1
+                    on_result(row, result)
+            if pending and job_id > self._cancelled.value:
+                # 工作进程异常退出, 剩余的文件不会再被处理
+                self._fail_rows(set(pending), pending, on_result)
+        finally:
+            # 结束后残留在队列中的任务块由工作进程直接跳过
+            self._cancelled.value = max(self._cancelled.value, job_id)
+        return received
+
+    @staticmethod
+    def _fail_rows(rows, pending, on_result):
+        for row in sorted(rows):
+            pending.discard(row)
+            on_result(row, _result("错误", "处理失败: 工作进程异常退出", False, 0))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+
+"""设置本项目的入口路径,全局变量BASEPATH"""
+# 手动找寻上级目录，获取项目入口路径
+BASEPATH = Path(__file__).parent.parent.parent
+
+"""
+[提示] 图片元数据持久化索引模块
+1. 以(路径, 文件大小, 修改时间)为键, 缓存宽高、曝光时间、ISO以及os.stat相关字段
+2. 重复访问文件夹时只需要scandir+stat, 命中的文件直接读回索引中的行, 只有新增/变更的文件才重新解析
+3. 索引行数超过上限时按最近访问时间淘汰最旧的记录
+4. 使用sqlite3单连接+锁, 支持多线程访问
+"""
+
+
+class ImageMetaIndex:
+    """图片元数据索引类(基于sqlite3)"""
+    _db_path = BASEPATH / "cache" / "meta_index.db"
+    _max_rows = 200000       # 最大索引行数，超过会按最近访问时间淘汰
+    _evict_ratio = 0.8       # 淘汰后保留的比例
+    _lock = threading.RLock()
+    _conn = None
+
+    @classmethod
+    def _connect(cls):
+        """获取数据库连接，首次调用时建表"""
+        if cls._conn is None:
+            cls._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(cls._db_path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    path TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    ctime REAL,
+                    width INTEGER,
+                    height INTEGER,
+                    exposure_time TEXT,
+                    iso TEXT,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_meta_folder ON meta(folder)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_meta_access ON meta(last_access)")
+            conn.commit()
+            cls._conn = conn
+        return cls._conn
+
+    @classmethod
+    def lookup_folder(cls, folder):
+        """读取指定文件夹下的所有索引行
+
+        Args:
+            folder: 文件夹路径
+
+        Returns:
+            dict: {path: (size, mtime, width, height, exposure_time, iso)}
+        """
+        folder = Path(folder).as_posix()
+        try:
+            with cls._lock:
+                conn = cls._connect()
+                rows = conn.execute(
+                    "SELECT path, size, mtime, width, height, exposure_time, iso FROM meta WHERE folder=?",
+                    (folder,)).fetchall()
+                # 刷新最近访问时间, 用于LRU淘汰
+                if rows:
+                    conn.execute("UPDATE meta SET last_access=? WHERE folder=?", (time.time(), folder))
+                    conn.commit()
+            return {row[0]: (row[1], row[2], row[3], row[4], row[5], cls._loads(row[6])) for row in rows}
+        except Exception as e:
+            print(f"[ImageMetaIndex.lookup_folder]-->读取元数据索引失败: {e}")
+            return {}
+
+    @classmethod
+    def get(cls, path, size, mtime):
+        """读取单个文件的元数据，(size, mtime)不匹配时返回None
+
+        Returns:
+            tuple | None: (width, height, exposure_time, iso)
+        """
+        try:
+            with cls._lock:
+                row = cls._connect().execute(
+                    "SELECT size, mtime, width, height, exposure_time, iso FROM meta WHERE path=?",
+                    (Path(path).as_posix(),)).fetchone()
+            if row and row[0] == size and row[1] == mtime:
+                return row[2], row[3], row[4], cls._loads(row[5])
+        except Exception as e:
+            print(f"[ImageMetaIndex.get]-->读取元数据索引失败: {e}")
+        return None
+
+    @classmethod
+    def update(cls, rows):
+        """批量写入元数据
+
+        Args:
+            rows: 可迭代对象, 每项为(path, size, mtime, ctime, width, height, exposure_time, iso)
+        """
+        now = time.time()
+        records = [(Path(path).as_posix(), Path(path).parent.as_posix(), size, mtime, ctime,
+                    width, height, exposure_time, cls._dumps(iso), now)
+                   for path, size, mtime, ctime, width, height, exposure_time, iso in rows]
+        if not records:
+            return
+        try:
+            with cls._lock:
+                conn = cls._connect()
+                conn.executemany("INSERT OR REPLACE INTO meta VALUES (?,?,?,?,?,?,?,?,?,?)", records)
+                conn.commit()
+                cls._evict(conn)
+        except Exception as e:
+            print(f"[ImageMetaIndex.update]-->写入元数据索引失败: {e}")
+
+    @classmethod
+    def _evict(cls, conn):
+        """索引行数超过上限时, 按最近访问时间淘汰最旧的记录"""
+        count = conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0]
+        if count <= cls._max_rows:
+            return
+        remove = count - int(cls._max_rows * cls._evict_ratio)
+        conn.execute(
+            "DELETE FROM meta WHERE path IN (SELECT path FROM meta ORDER BY last_access ASC LIMIT ?)",
+            (remove,))
+        conn.commit()
+        print(f"[ImageMetaIndex._evict]-->元数据索引超过上限, 淘汰{remove}条记录")
+
+    @classmethod
+    def invalidate(cls, folder=None):
+        """失效索引; 指定folder时只清除该文件夹的记录, 否则删除整个索引文件"""
+        try:
+            with cls._lock:
+                if folder is not None:
+                    conn = cls._connect()
+                    conn.execute("DELETE FROM meta WHERE folder=?", (Path(folder).as_posix(),))
+                    conn.commit()
+                    return
+                cls.close()
+                for suffix in ("", "-wal", "-shm"):
+                    db_file = Path(f"{cls._db_path}{suffix}")
+                    if db_file.exists():
+                        os.remove(db_file)
+            print(f"[ImageMetaIndex.invalidate]-->成功清除图片元数据索引")
+        except Exception as e:
+            print(f"[ImageMetaIndex.invalidate]-->清除图片元数据索引失败: {e}")
+
+    @classmethod
+    def close(cls):
+        """关闭数据库连接"""
+        with cls._lock:
+            if cls._conn is not None:
+                try:
+                    cls._conn.close()
+                finally:
+                    cls._conn = None
+
+    @staticmethod
+    def _dumps(value):
+        """ISO可能为int或tuple, 统一序列化为json字符串"""
+        return None if value is None else json.dumps(value)
+
+    @staticmethod
+    def _loads(value):
+        """反序列化ISO, list还原为tuple保持和PIL读取结果一致"""
+        if value is None:
+            return None
+        value = json.loads(value)
+        return tuple(value) if isinstance(value, list) else value
@@ -6,8 +6,11 @@
 @Version      :1.0
 @Description  :
 '''
+import hashlib
+import threading
 from io import BytesIO
 from pathlib import Path
+from collections import OrderedDict
 from PIL import ImageOps,ImageCms,Image
 
 # 设置项目根路径
@@ -16,6 +19,12 @@ if True:
 
 
 class ColorSpaceConverter:
+    # ICC转换缓存(所有实例、线程共享), 键为(源配置文件哈希, 目标配置文件, 渲染意图, 输入模式, 输出模式)
+    _transform_cache = OrderedDict()
+    _max_transforms = 64
+    _profile_cache = {}              # 目标ICC文件只读取一次 {icc_path: ImageCmsProfile}
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         # 初始化变量
         self.current_profile = "sRGB"
@@ -75,53 +84,72 @@ class ColorSpaceConverter:
             print(f"错误: LittleCMS初始化失败 - {str(e)}")
             print("请确保已正确安装Pillow和littlecms库")
             
-    def convert_color_space(self, pil_image, target_profile, intent="Perceptual"):
+    def get_transform(self, icc_profile, target_profile, intent="Perceptual", mode="RGB"):
+        """
+        获取ICC色彩空间转换, 同一组(源配置文件, 目标配置文件, 渲染意图, 模式)只构建一次, 所有实例和线程共享
+        Args:
+            icc_profile (bytes | None): 图片内嵌的ICC配置文件, None表示按sRGB处理
+            target_profile (str): 目标色域名称, 即self.icc_files中的键; "sRGB-builtin"表示LittleCMS内置的sRGB
+            intent (str): 渲染意图
+            mode (str): 输入输出模式
+        Returns:
+            ImageCms.ImageCmsTransform: 色彩空间转换
+        """
+        src_key = hashlib.md5(icc_profile).hexdigest() if icc_profile else "sRGB-builtin"
+        key = (src_key, target_profile, intent, mode, mode)
+        with self._cache_lock:
+            if (transform := self._transform_cache.get(key)) is not None:
+                self._transform_cache.move_to_end(key)
+                return transform
+
+        # 设置源配置文件（没有内嵌ICC时假设为sRGB）
+        src_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile)) if icc_profile else ImageCms.createProfile("sRGB")
+
+        # 设置目标配置文件（先检查目标配置文件是否可用）, 目标ICC文件只从磁盘读取一次
+        if target_profile == "sRGB-builtin":
+            dst_profile = ImageCms.createProfile("sRGB")
+        else:
+            if target_profile not in self.icc_files or self.icc_files[target_profile] is None:
+                raise FileNotFoundError(f"未找到{target_profile}的ICC配置文件")
+            icc_path = self.icc_files[target_profile].as_posix()
+            with self._cache_lock:
+                dst_profile = self._profile_cache.get(icc_path)
+            if dst_profile is None:
+                dst_profile = ImageCms.getOpenProfile(icc_path)
+                with self._cache_lock:
+                    self._profile_cache[icc_path] = dst_profile
+
+        # 创建转换并写入缓存
+        transform = ImageCms.buildTransform(src_profile, dst_profile, mode, mode, self.intent_map[intent])
+        with self._cache_lock:
+            self._transform_cache[key] = transform
+            while len(self._transform_cache) > self._max_transforms:
+                self._transform_cache.popitem(last=False)
+        return transform
+
+    def convert_color_space(self, pil_image, target_profile, intent="Perceptual", inplace=False):
         """
         转换图像色彩空间
         Args:
             pil_image (PIL_image): PIL打开的图像
             target_profile (str): 目标色域名称
             intent (str): 渲染意图
+            inplace (bool): 是否直接在传入的图像上转换, 省去输出图像的内存分配; 传入的图像会被修改
         Returns:
             QPixmap: 转换后的图像
         """
-        intent_map = {
-            "Perceptual": ImageCms.Intent.PERCEPTUAL, # 感知，最常用的渲染意图，保持图像的视觉平衡
-            "Relative Colorimetric": ImageCms.Intent.RELATIVE_COLORIMETRIC, # 相对色度，保持图像的视觉平衡，但更注重颜色的准确性
-            "Saturation": ImageCms.Intent.SATURATION, # 饱和度，增强图像的饱和度，使颜色更鲜艳
-            "Absolute Colorimetric": ImageCms.Intent.ABSOLUTE_COLORIMETRIC # 绝对色度，保持图像的视觉平衡，但更注重颜色的准确性
-        }
-        
         try:
             # 判断出入的图像文件是否为"L",是则直接返回
             if pil_image.mode == "L":
                 return pil_image
 
-            # 设置源配置文件（先假设为sRGB）
-            src_profile = ImageCms.createProfile("sRGB")
-            # 尝试读取图片的ICC配置文件并转换到sRGB色域
-            if 'icc_profile' in pil_image.info:
-                # 从图片中获取ICC配置文件
-                icc_profile = pil_image.info['icc_profile']
-                # 创建源色彩空间配置文件
-                src_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
-
-            # 设置目标配置文件（先检查目标配置文件是否可用）
-            if target_profile not in self.icc_files or self.icc_files[target_profile] is None:
-                raise FileNotFoundError(f"未找到{target_profile}的ICC配置文件")
-            # 获取目标配置文件
-            icc_path = self.icc_files[target_profile].as_posix()
-            dst_profile = ImageCms.getOpenProfile(icc_path)
-            
-            # 创建转换
-            transform = ImageCms.buildTransform(
-                src_profile, dst_profile,
-                "RGB", "RGB",
-                intent_map[intent]
-            )
+            # 获取缓存的转换（源配置文件为图片内嵌的ICC配置文件, 没有则假设为sRGB）
+            transform = self.get_transform(pil_image.info.get('icc_profile'), target_profile, intent)
             
             # 应用转换
-            converted_image = ImageCms.applyTransform(pil_image, transform)
+            converted_image = ImageCms.applyTransform(pil_image, transform, inPlace=inplace)
+            if inplace:
+                converted_image = pil_image
             
             # 返回pil_image
             return converted_image
@@ -134,6 +162,13 @@ class ColorSpaceConverter:
             return pil_image  # 返回原图
 
 
+    intent_map = {
+        "Perceptual": ImageCms.Intent.PERCEPTUAL, # 感知，最常用的渲染意图，保持图像的视觉平衡
+        "Relative Colorimetric": ImageCms.Intent.RELATIVE_COLORIMETRIC, # 相对色度，保持图像的视觉平衡，但更注重颜色的准确性
+        "Saturation": ImageCms.Intent.SATURATION, # 饱和度，增强图像的饱和度，使颜色更鲜艳
+        "Absolute Colorimetric": ImageCms.Intent.ABSOLUTE_COLORIMETRIC # 绝对色度，保持图像的视觉平衡，但更注重颜色的准确性
+    }
+
     def get_pilimg_sRGB(self, pil_image):
         """
         该函数主要是实现了一个将pil格式图片转换到sRGB色域空间的功能.
@@ -152,22 +187,11 @@ class ColorSpaceConverter:
 
             # 尝试读取图片的ICC配置文件并转换到sRGB色域
             if 'icc_profile' in pil_image.info:
-                # 从图片中获取ICC配置文件
-                icc_profile = pil_image.info['icc_profile']
-                # 创建源色彩空间配置文件
-                src_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
-                # 创建sRGB色彩空间配置文件（作为中间转换空间）
-                srgb_profile = ImageCms.createProfile('sRGB')
-                # 创建从sRGB到源色彩空间的转换器
-                transform = ImageCms.buildTransform(
-                    src_profile,    # 源配置文件（原始ICC）
-                    srgb_profile,   # 目标配置文件（sRGB）
-                    'RGB',          # 输入模式
-                    'RGB'           # 输出模式
-                )
-
-                # 应用转换
-                pil_image = ImageCms.applyTransform(pil_image, transform)
+                # 获取缓存的从源色彩空间到sRGB的转换器（默认渲染意图同ImageCms.buildTransform）
+                transform = self.get_transform(pil_image.info['icc_profile'], "sRGB-builtin")
+
+                # 应用转换, exif_transpose已返回副本, 直接原地转换避免再分配一张整图
+                ImageCms.applyTransform(pil_image, transform, inPlace=True)
 
             return pil_image
         except Exception as e:
@@ -190,26 +214,8 @@ class ColorSpaceConverter:
             # 设置自动校准图片方向信息    
             pil_image = ImageOps.exif_transpose(pil_image)
 
-            # 尝试读取图片的ICC配置文件并转换到sRGB色域
-            if 'icc_profile' in pil_image.info:
-                # 从图片中获取ICC配置文件
-                icc_profile = pil_image.info['icc_profile']
-                # 创建源色彩空间配置文件
-                src_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
-                # 创建sRGB色彩空间配置文件（作为中间转换空间）
-                # srgb_profile = ImageCms.createProfile('sRGB')
-                # 创建从sRGB到源色彩空间的转换器
-                transform = ImageCms.buildTransform(
-                    src_profile,    # 源配置文件（原始ICC）
-                    src_profile,    # 目标配置
-                    # srgb_profile,   # 目标配置文件（sRGB）
-                    'RGB',          # 输入模式
-                    'RGB'           # 输出模式
-                )
-
-                # 应用转换
-                pil_image = ImageCms.applyTransform(pil_image, transform)
-
+            # 源配置文件与目标配置文件相同(保持图片内嵌的ICC配置), 转换为恒等变换, 直接跳过;
+            # 图片内嵌的icc_profile保留在pil_image.info中, 后续色彩空间转换以其为源配置文件
             return pil_image
         except Exception as e:
             print(f"[get_pilimg_sRGB]-->error: {str(e)}")
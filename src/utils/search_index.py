@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from array import array
+
+
+"""
+[提示] 搜索框n-gram索引模块
+1. 打开搜索框时对所有条目的文本(文件名以及已解析的exif信息)转换为小写, 建立 {三元组: 条目编号数组} 的倒排索引
+2. 查询长度不小于3时, 只在查询中各个三元组对应的倒排列表里取最短的一个作为候选, 再做子串校验, 不需要扫描全部条目
+3. 新查询包含上一次查询时(继续输入), 直接在上一次的结果中筛选, 结果随输入逐步收窄
+4. 结果为条目编号列表, 按条目加入顺序排列, 由调用方按需取出显示文本与位置
+"""
+
+
+class SearchIndex:
+    """条目文本的三元组倒排索引, 支持大小写不敏感的子串搜索"""
+    NGRAM = 3
+
+    def __init__(self):
+        self.texts = []          # 条目的小写文本
+        self.displays = []       # 条目的显示文本
+        self.positions = []      # 条目的位置信息, 由调用方定义
+        self._postings = {}      # {三元组: array('i', [条目编号, ...])}
+        self._last_query = None
+        self._last_results = None
+
+    def add(self, display, position, extra=""):
+        """添加一个条目
+
+        Args:
+            display: 显示文本, 同时参与搜索
+            position: 条目的位置信息, 选中时原样返回
+            extra: 额外参与搜索但不单独显示的文本(如exif信息)
+        """
+        entry_id = len(self.texts)
+        text = f"{display}\n{extra}".lower() if extra else str(display).lower()
+        self.texts.append(text)
+        self.displays.append(str(display))
+        self.positions.append(position)
+        n = self.NGRAM
+        for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+            if (posting := self._postings.get(gram)) is None:
+                posting = self._postings[gram] = array('i')
+            posting.append(entry_id)
+        self._last_query = self._last_results = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def search(self, query):
+        """大小写不敏感的子串搜索
+
+        Returns:
+            list: 匹配的条目编号, 按条目加入顺序排列; 空查询返回全部条目
+        """
+        query = query.lower()
+        if not query:
+            results = list(range(len(self.texts)))
+        elif self._last_query and self._last_query in query:
+            # 继续输入时结果只会变少, 在上一次结果中筛选
+            texts = self.texts
+            results = [i for i in self._last_results if query in texts[i]]
+        elif len(query) >= self.NGRAM:
+            n = self.NGRAM
+            postings = [self._postings.get(query[i:i + n]) for i in range(len(query) - n + 1)]
+            if any(posting is None for posting in postings):
+                results = []
+            else:
+                texts = self.texts
+                results = [i for i in min(postings, key=len) if query in texts[i]]
+        else:
+            texts = self.texts
+            results = [i for i, text in enumerate(texts) if query in text]
+        self._last_query, self._last_results = query, results
+        return results
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+import os
+import csv
+from pathlib import Path
+from itertools import zip_longest
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Border, Side
+from openpyxl.utils import get_column_letter
+
+
+"""
+[提示] 3A数据批量导出模块
+1. 按文件后缀列出待提取的文件(如_new.xml/txt), 由单文件提取函数得到一行数据, 结果按文件名顺序汇总为列式表格 {列名: [值, ...]};
+   单个文件的提取只需约0.2ms, 顺序提取即可, 由调用方在后台线程中执行(进程池启动时需重新导入主程序, 反而更慢)
+2. xlsx使用openpyxl只写(流式)模式输出, 列宽在写入前由列数据直接算出, 每个单元格统一设置边框;
+   同时支持输出csv以及parquet(需要安装pyarrow), 便于后续用其他工具分析
+3. 输出文件已存在时为增量追加: 读取已有表格中的文件名列, 只提取新增的文件; 已有行(包括手动填写的问题点列)保持不变,
+   csv表头一致时直接追加行, xlsx/parquet合并后写入临时文件再替换
+"""
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+
+def extract_columns(file_paths, loader, headers):
+    """提取文件数据并汇总为列式表格
+
+    Args:
+        file_paths: 待提取的文件路径列表, 输出行顺序与之一致
+        loader: 单文件提取函数, 返回与headers顺序对应的一行数据, 失败时返回None
+        headers: 列名列表, 提取结果比列名少的部分(如问题点列)补None
+
+    Returns:
+        dict: {列名: [值, ...]}
+    """
+    rows = [loader(str(file_path)) for file_path in file_paths]
+    columns = {header: [] for header in headers}
+    for row in rows:
+        if not row:
+            continue
+        for values, value in zip_longest(columns.values(), row[:len(headers)]):
+            values.append(value)
+    return columns
+
+
+def row_count(columns):
+    return len(next(iter(columns.values()), []))
+
+
+def merge_columns(base, extra):
+    """将extra的行追加到base之后, 两边列名不同时取并集(保持base的列顺序), 缺失的值补None"""
+    base_rows, extra_rows = row_count(base), row_count(extra)
+    merged = {}
+    for header in list(base) + [h for h in extra if h not in base]:
+        merged[header] = list(base.get(header, [None] * base_rows)) + list(extra.get(header, [None] * extra_rows))
+    return merged
+
+
+def select_rows(columns, keep):
+    """按布尔列表筛选行"""
+    return {header: [v for v, k in zip(values, keep) if k] for header, values in columns.items()}
+
+
+def _rows_to_columns(rows):
+    """[表头, 行, ...] 转换为列式表格, 忽略表头末尾的空列"""
+    rows = iter(rows)
+    header = list(next(rows, []))
+    while header and header[-1] is None:
+        header.pop()
+    columns = {str(h): [] for h in header}
+    for row in rows:
+        for values, value in zip(columns.values(), list(row) + [None] * (len(header) - len(row))):
+            values.append(value)
+    return columns
+
+
+def read_xlsx(excel_path):
+    wb = load_workbook(excel_path, read_only=True)
+    try:
+        return _rows_to_columns(wb.active.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def read_csv(csv_path):
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        return _rows_to_columns([value if value != "" else None for value in row] for row in csv.reader(f))
+
+
+def read_parquet(parquet_path):
+    import pyarrow.parquet as pq
+    return pq.read_table(parquet_path).to_pydict()
+
+
+def _replace(write, path):
+    """先写入临时文件再替换, 避免写入中途失败时损坏已有文件"""
+    tmp_path = f"{path}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_xlsx(columns, excel_path):
+    """以只写模式输出xlsx, 列宽按列内最长的值计算, 所有单元格设置细边框"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+
+    # 只写模式下列宽需要在写入行之前设置
+    for index, (header, values) in enumerate(columns.items(), 1):
+        max_length = max((len(str(value)) for value in values if value is not None), default=0)
+        ws.column_dimensions[get_column_letter(index)].width = max(max_length, len(header)) + 2
+
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    def bordered(value):
+        cell = WriteOnlyCell(ws, value)
+        cell.border = border
+        return cell
+
+    ws.append([bordered(header) for header in columns])
+    for row in zip(*columns.values()):
+        ws.append([bordered(value) for value in row])
+    _replace(wb.save, excel_path)
+
+
+def write_csv(columns, csv_path, append=False):
+    """输出csv, 新建时带BOM以便Excel直接打开; append为True时只追加数据行"""
+    mode, encoding = ("a", "utf-8") if append else ("w", "utf-8-sig")
+    with open(csv_path, mode, encoding=encoding, newline="") as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(columns)
+        writer.writerows(zip(*columns.values()))
+
+
+def write_parquet(columns, parquet_path):
+    """输出parquet, 同一列类型不一致(如手动填写的问题点列)时该列按字符串保存"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrays = []
+    for values in columns.values():
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([None if value is None else str(value) for value in values], pa.string()))
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    _replace(lambda path: pq.write_table(table, path), parquet_path)
+
+
+READERS = {"xlsx": read_xlsx, "csv": read_csv, "parquet": read_parquet}
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}
+
+
+def export_table(images_path, file_suffix, loader, headers, row_key, formats=("xlsx",), name="extracted_data"):
+    """提取文件夹中的数据并导出为表格, 已存在的表格增量追加新文件的数据
+
+    Args:
+        images_path: 文件夹路径
+        file_suffix: 待提取文件的后缀, 如'_new.xml'
+        loader: 单文件提取函数, 见extract_columns
+        headers: 列名列表, 第一列为文件名
+        row_key: 由待提取文件名得到表格中文件名列的值, 用于判断是否已经导出
+        formats: 输出格式, 可选xlsx/csv/parquet
+        name: 输出文件名(不含扩展名)
+
+    Returns:
+        dict: {格式: 本次新增的行数}
+    """
+    folder = Path(images_path)
+    formats = [fmt for fmt in dict.fromkeys(formats) if fmt in EXPORT_FORMATS]
+    if "parquet" in formats:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("[export_table]-->未安装pyarrow, 跳过parquet格式的导出")
+            formats.remove("parquet")
+
+    # 读取已有表格中已经导出的文件名
+    existing = {}
+    for fmt in formats:
+        path = folder / f"{name}.{fmt}"
+        try:
+            existing[fmt] = READERS[fmt](path) if path.exists() else None
+        except Exception as e:
+            print(f"[export_table]-->读取已有表格失败, 将重新生成 {path}:\n {e}")
+            existing[fmt] = None
+    exported = {fmt: set(table.get(headers[0], [])) if table else set() for fmt, table in existing.items()}
+
+    # 只提取至少一种格式中还没有的文件
+    source_files = sorted(f for f in os.listdir(folder) if f.endswith(file_suffix))
+    pending = [f for f in source_files if any(row_key(f) not in keys for keys in exported.values())]
+    if not pending:
+        return {fmt: 0 for fmt in formats}
+    new_columns = extract_columns([folder / f for f in pending], loader, headers)
+
+    added = {}
+    for fmt in formats:
+        path = folder / f"{name}.{fmt}"
+        table = select_rows(new_columns, [key not in exported[fmt] for key in new_columns[headers[0]]])
+        added[fmt] = row_count(table)
+        try:
+            if existing[fmt] is not None:
+                if not added[fmt]:
+                    continue
+                if fmt == "csv" and list(existing[fmt]) == list(table):
+                    write_csv(table, path, append=True)
+                    print(f"[export_table]-->追加 {added[fmt]} 行数据到 {path.as_posix()}")
+                    continue
+                table = merge_columns(existing[fmt], table)
+            WRITERS[fmt](table, path)
+            print(f"[export_table]-->新增 {added[fmt]} 行, 数据成功写入到 {path.as_posix()}")
+        except Exception as e:
+            added[fmt] = 0
+            print(f"[export_table]-->写入{fmt}失败 {path.as_posix()}(文件可能被其他程序占用):\n {e}")
+    return added
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+
+"""设置本项目的入口路径,全局变量BASEPATH"""
+# 手动找寻上级目录，获取项目入口路径
+BASEPATH = Path(__file__).parent.parent.parent
+
+"""
+[提示] 缩略图打包存储模块
+1. 所有缩略图以PNG字节流的形式存放在单个sqlite数据库文件中, 替代每个图标一个PNG文件+json索引的方式
+2. 写入先缓存在内存中, 达到数量或时间阈值后批量提交, 首次生成N个图标的磁盘IO为O(N)
+3. 按字节数限制总容量, 超过上限后按最近访问时间(LRU)淘汰
+4. 单连接+可重入锁保证多个预加载线程并发读写安全; WAL模式+超时等待兼容多个进程同时访问
+"""
+
+
+class ThumbnailStore:
+    """缩略图打包存储类(基于sqlite3)"""
+    _db_path = BASEPATH / "cache" / "thumbnails.db"
+    _max_bytes = 256 * 1024 * 1024   # 最大存储字节数，超过会按最近访问时间淘汰
+    _evict_ratio = 0.8               # 淘汰后保留的比例
+    _flush_count = 64                # 待写入数量达到该值时批量提交
+    _flush_interval = 2.0            # 距离上次提交超过该时间(秒)时批量提交
+    _lock = threading.RLock()
+    _conn = None
+    _pending = {}                    # 待写入的缩略图 {key: bytes}
+    _touched = set()                 # 待更新访问时间的key
+    _last_flush = 0.0
+
+    @classmethod
+    def _connect(cls):
+        """获取数据库连接，首次调用时建表"""
+        if cls._conn is None:
+            cls._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(cls._db_path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS thumbs (
+                    key TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbs_access ON thumbs(last_access)")
+            conn.commit()
+            cls._conn = conn
+            cls._last_flush = time.time()
+        return cls._conn
+
+    @classmethod
+    def get(cls, key):
+        """读取缩略图字节流，不存在返回None"""
+        try:
+            with cls._lock:
+                if (data := cls._pending.get(key)) is not None:
+                    return data
+                row = cls._connect().execute("SELECT data FROM thumbs WHERE key=?", (key,)).fetchone()
+                if row is None:
+                    return None
+                cls._touched.add(key)
+                return bytes(row[0])
+        except Exception as e:
+            print(f"[ThumbnailStore.get]-->读取缩略图失败: {e}")
+            return None
+
+    @classmethod
+    def put(cls, key, data):
+        """写入缩略图字节流, 达到阈值时批量提交"""
+        with cls._lock:
+            cls._pending[key] = data
+            if len(cls._pending) >= cls._flush_count or time.time() - cls._last_flush >= cls._flush_interval:
+                cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """批量提交待写入的缩略图以及访问时间, 并按容量上限淘汰"""
+        with cls._lock:
+            if not cls._pending and not cls._touched:
+                return
+            try:
+                conn = cls._connect()
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO thumbs VALUES (?,?,?,?)",
+                    [(key, sqlite3.Binary(data), len(data), now) for key, data in cls._pending.items()])
+                conn.executemany(
+                    "UPDATE thumbs SET last_access=? WHERE key=?",
+                    [(now, key) for key in cls._touched])
+                conn.commit()
+                if cls._pending:
+                    cls._evict(conn)
+            except Exception as e:
+                print(f"[ThumbnailStore.flush]-->批量写入缩略图失败: {e}")
+            finally:
+                cls._pending = {}
+                cls._touched = set()
+                cls._last_flush = time.time()
+
+    @classmethod
+    def _evict(cls, conn):
+        """总字节数超过上限时, 按最近访问时间淘汰最旧的缩略图"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbs").fetchone()[0]
+        if total <= cls._max_bytes:
+            return
+        target = total - int(cls._max_bytes * cls._evict_ratio)
+        removed, keys = 0, []
+        for key, size in conn.execute("SELECT key, size FROM thumbs ORDER BY last_access ASC"):
+            keys.append((key,))
+            removed += size
+            if removed >= target:
+                break
+        conn.executemany("DELETE FROM thumbs WHERE key=?", keys)
+        conn.commit()
+        print(f"[ThumbnailStore._evict]-->缩略图存储超过上限, 淘汰{len(keys)}个缩略图")
+
+    @classmethod
+    def clear(cls):
+        """清空缩略图存储, 删除数据库文件"""
+        with cls._lock:
+            cls._pending = {}
+            cls._touched = set()
+            cls.close()
+            for suffix in ("", "-wal", "-shm"):
+                db_file = Path(f"{cls._db_path}{suffix}")
+                if db_file.exists():
+                    os.remove(db_file)
+
+    @classmethod
+    def close(cls):
+        """提交剩余数据并关闭数据库连接"""
+        with cls._lock:
+            cls.flush()
+            if cls._conn is not None:
+                try:
+                    cls._conn.close()
+                finally:
+                    cls._conn = None
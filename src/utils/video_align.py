@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import os
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+"""设置本项目的入口路径,全局变量BASEPATH"""
+# 手动找寻上级目录，获取项目入口路径
+BASEPATH = Path(__file__).parent.parent.parent
+
+"""
+[提示] 多视频帧对齐模块
+1. 每个视频只顺序解码一次, 每帧缩小为SIGNATURE_SIZE x SIGNATURE_SIZE的灰度图作为帧特征(签名), 不再逐帧seek
+2. 帧签名以(完整路径, 修改时间)为键缓存在内存以及cache/video_signatures目录下, 重复设置基准时无需再解码
+3. 匹配采用由粗到精的策略: 先用8x8的粗签名在所有帧中筛选候选帧, 再在候选帧附近用完整签名精确比较
+"""
+
+SIGNATURE_SIZE = 32      # 帧签名边长
+COARSE_SIZE = 8          # 粗匹配签名边长
+
+
+def _frame_signature(frame):
+    """将BGR视频帧转换为帧签名(SIGNATURE_SIZE x SIGNATURE_SIZE的灰度图, uint8)"""
+    # 先按步长抽取像素缩小到约4倍签名尺寸, 再区域平均; 直接对4K帧做INTER_AREA缩放比解码还慢
+    step = max(1, min(frame.shape[:2]) // (SIGNATURE_SIZE * 4))
+    small = cv2.resize(frame[::step, ::step], (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def _coarse(signatures):
+    """由完整签名得到粗签名(区域平均), 支持单帧(H, W)或多帧(N, H, W)"""
+    factor = SIGNATURE_SIZE // COARSE_SIZE
+    shape = signatures.shape[:-2] + (COARSE_SIZE, factor, COARSE_SIZE, factor)
+    return signatures.reshape(shape).astype(np.float32).mean(axis=(-3, -1))
+
+
+class VideoSignatureCache:
+    """视频帧签名缓存类, 以(完整路径, 修改时间)为键, 内存中按LRU保留最近使用的视频, 同时持久化为npy文件"""
+    _cache_dir = BASEPATH / "cache" / "video_signatures"
+    _max_videos = 32
+    _lock = threading.Lock()
+    _signatures = OrderedDict()      # {(path, mtime): np.ndarray(N, SIGNATURE_SIZE, SIGNATURE_SIZE)}
+
+    @staticmethod
+    def _key(video_path):
+        return Path(video_path).resolve().as_posix(), os.stat(video_path).st_mtime_ns
+
+    @classmethod
+    def _file(cls, key):
+        digest = hashlib.md5(f"{key[0]}|{key[1]}|{SIGNATURE_SIZE}".encode("utf-8")).hexdigest()
+        return cls._cache_dir / f"{digest}.npy"
+
+    @classmethod
+    def get(cls, video_path):
+        """读取视频帧签名, 不存在返回None"""
+        try:
+            key = cls._key(video_path)
+            with cls._lock:
+                if (signatures := cls._signatures.get(key)) is not None:
+                    cls._signatures.move_to_end(key)
+                    return signatures
+            if (sig_file := cls._file(key)).exists():
+                signatures = np.load(sig_file)
+                cls._remember(key, signatures)
+                return signatures
+        except Exception as e:
+            print(f"[VideoSignatureCache.get]-->读取视频帧签名缓存失败: {e}")
+        return None
+
+    @classmethod
+    def put(cls, video_path, signatures):
+        """写入视频帧签名"""
+        try:
+            key = cls._key(video_path)
+            cls._remember(key, signatures)
+            cls._cache_dir.mkdir(parents=True, exist_ok=True)
+            np.save(cls._file(key), signatures)
+        except Exception as e:
+            print(f"[VideoSignatureCache.put]-->写入视频帧签名缓存失败: {e}")
+
+    @classmethod
+    def _remember(cls, key, signatures):
+        with cls._lock:
+            cls._signatures[key] = signatures
+            cls._signatures.move_to_end(key)
+            while len(cls._signatures) > cls._max_videos:
+                cls._signatures.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        """清空内存以及磁盘上的帧签名缓存"""
+        with cls._lock:
+            cls._signatures.clear()
+        if cls._cache_dir.exists():
+            for sig_file in cls._cache_dir.glob("*.npy"):
+                sig_file.unlink(missing_ok=True)
+
+
+def compute_video_signatures(video_path, stop_event=None):
+    """顺序解码视频一次, 计算每一帧的签名; 优先读取缓存
+
+    Args:
+        video_path: 视频路径
+        stop_event: threading.Event, 置位时中断解码并返回None
+
+    Returns:
+        np.ndarray | None: (帧数, SIGNATURE_SIZE, SIGNATURE_SIZE)的uint8数组
+    """
+    if (signatures := VideoSignatureCache.get(video_path)) is not None:
+        return signatures
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"无法打开视频: {video_path}")
+        return None
+    try:
+        frames = []
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(_frame_signature(frame))
+    finally:
+        cap.release()
+
+    if not frames:
+        return None
+    signatures = np.stack(frames)
+    VideoSignatureCache.put(video_path, signatures)
+    return signatures
+
+
+def read_frame_signature(video_path, frame_index):
+    """读取视频指定帧的签名, 已缓存整段签名时直接取出, 否则只seek读取该帧"""
+    if (signatures := VideoSignatureCache.get(video_path)) is not None:
+        return signatures[frame_index] if frame_index < len(signatures) else None
+    cap = cv2.VideoCapture(video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ret, frame = cap.read()
+        return _frame_signature(frame) if ret else None
+    finally:
+        cap.release()
+
+
+def match_frame(signatures, baseline_signature, top_k=8, radius=3):
+    """由粗到精在视频帧签名中查找与基准帧签名最相似的帧
+
+    Args:
+        signatures: 目标视频所有帧的签名
+        baseline_signature: 基准帧签名
+        top_k: 粗匹配保留的候选帧数量
+        radius: 精确匹配时在候选帧前后搜索的帧数
+
+    Returns:
+        tuple: (最佳匹配帧号, 平均绝对差异), 越小越相似
+    """
+    # 1. 粗匹配: 8x8签名上计算所有帧的平均绝对差异, 取差异最小的top_k帧
+    coarse_scores = np.abs(_coarse(signatures) - _coarse(baseline_signature)).mean(axis=(1, 2))
+    top_k = min(top_k, len(coarse_scores))
+    candidates = np.argpartition(coarse_scores, top_k - 1)[:top_k]
+
+    # 2. 精确匹配: 在候选帧附近用完整签名计算平均绝对差异
+    indexes = np.unique(np.clip(
+        (candidates[:, None] + np.arange(-radius, radius + 1)[None, :]).ravel(), 0, len(signatures) - 1))
+    baseline = baseline_signature.astype(np.int16)
+    fine_scores = np.abs(signatures[indexes].astype(np.int16) - baseline).mean(axis=(1, 2))
+    best = int(np.argmin(fine_scores))
+    return int(indexes[best]), float(fine_scores[best])
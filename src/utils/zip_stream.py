@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import zlib
+import struct
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+"""
+[提示] 流式并行压缩ZIP写入模块
+1. 每个文件按扩展名以及开头数据的压缩率采样决定存储(STORED)还是压缩(DEFLATED), jpg/mp4等已压缩格式直接存储
+2. 压缩的文件按固定大小分块, 多个线程并行deflate(zlib压缩时释放GIL), 每块以前一块末尾32KB为预设字典,
+   非最后一块以Z_SYNC_FLUSH结束, 各块按顺序拼接即为一个完整的deflate数据流(与pigz相同的做法)
+3. 同一时间在途的分块数量有上限, 内存占用与文件大小无关; 数据顺序写入输出文件, 写完一个文件后回填本地文件头中的CRC与大小
+4. 每写入一块即回调已处理的原始字节数, 便于显示字节级进度; 大于4GB的文件以及偏移量自动使用zip64扩展
+"""
+
+# 已压缩格式的扩展名, 直接存储不再压缩
+STORE_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif', '.avif', '.jp2',
+    '.mp4', '.mov', '.mkv', '.avi', '.webm', '.m4v', '.3gp', '.hevc', '.h264', '.h265',
+    '.mp3', '.aac', '.m4a', '.flac', '.ogg', '.opus',
+    '.zip', '.7z', '.rar', '.gz', '.bz2', '.xz', '.zst', '.apk', '.jar', '.docx', '.xlsx', '.pptx',
+}
+
+SAMPLE_SIZE = 64 * 1024         # 压缩率采样的字节数
+STORE_RATIO = 0.95              # 采样压缩后大小/原始大小超过该值时直接存储
+CHUNK_SIZE = 1024 * 1024        # 并行压缩的分块大小
+WINDOW_SIZE = 32 * 1024         # deflate窗口大小, 即预设字典长度
+ZIP64_LIMIT = 0xFFFFFFFF
+
+
+def choose_compression(file_path, file_size=None):
+    """按扩展名以及开头数据的压缩率采样选择压缩方式
+
+    Returns:
+        int: zipfile.ZIP_STORED 或 zipfile.ZIP_DEFLATED
+    """
+    if os.path.splitext(file_path)[1].lower() in STORE_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    if file_size is None:
+        file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return zipfile.ZIP_STORED
+    with open(file_path, 'rb') as f:
+        sample = f.read(SAMPLE_SIZE)
+    if len(zlib.compress(sample, 1)) / len(sample) > STORE_RATIO:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _deflate_block(data, zdict, is_last, level):
+    """压缩一个分块, 以前一块末尾数据为预设字典; 非最后一块以Z_SYNC_FLUSH结束, 保证按字节对齐拼接"""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if is_last else zlib.Z_SYNC_FLUSH)
+
+
+def _dos_datetime(timestamp):
+    """时间戳转换为zip使用的DOS日期时间, 1980年以前按1980年处理"""
+    t = time.localtime(timestamp)
+    year = max(t.tm_year, 1980)
+    return (((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday,
+            (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2))
+
+
+class StreamingZipWriter:
+    """流式并行压缩ZIP写入类, 用法与zipfile.ZipFile相近:
+
+        with StreamingZipWriter(zip_path, progress_callback=callback) as writer:
+            writer.write(file_path, arcname)
+    """
+
+    def __init__(self, zip_path, workers=None, level=zlib.Z_DEFAULT_COMPRESSION,
+                 chunk_size=CHUNK_SIZE, progress_callback=None):
+        """
+        Args:
+            zip_path: 输出的zip文件路径
+            workers: 并行压缩线程数, 默认为CPU核数
+            level: zlib压缩等级
+            chunk_size: 并行压缩的分块大小
+            progress_callback: 每写入一块时调用progress_callback(累计已处理的原始字节数)
+        """
+        self.zip_path = zip_path
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.level = level
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.bytes_done = 0
+        self._entries = []              # 中央目录记录 [(文件名bytes, flags, 压缩方式, 时间, 日期, crc, 压缩大小, 原始大小, 偏移, 外部属性)]
+        self._max_inflight = self.workers * 2
+        self._executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self._fp = open(zip_path, 'wb')
+        self._stop = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cancel(self):
+        """取消写入, 当前文件写完当前分块后停止并丢弃该文件; 关闭时仍写入已完成文件的中央目录, 生成的zip文件可以正常打开"""
+        self._stop = True
+
+    def write(self, file_path, arcname=None):
+        """写入一个文件
+
+        Returns:
+            bool: 是否完整写入, 取消时返回False
+        """
+        if self._stop:
+            return False
+        st = os.stat(file_path)
+        arcname = str(arcname or os.path.basename(file_path)).replace(os.sep, '/').lstrip('/')
+        method = choose_compression(file_path, st.st_size)
+        # 无法确定压缩后大小, 原始大小接近4GB时本地文件头预留zip64扩展
+        zip64 = st.st_size + st.st_size // 100 + 65536 >= ZIP64_LIMIT
+
+        name, flags = arcname.encode('ascii', 'ignore'), 0
+        if name.decode('ascii') != arcname:
+            name, flags = arcname.encode('utf-8'), 0x800
+        date, dostime = _dos_datetime(st.st_mtime)
+        extra = struct.pack('<HHQQ', 1, 16, 0, 0) if zip64 else b''
+
+        # 先打开源文件再写本地文件头; 读取或压缩出错时截断到文件头之前, 不留下不完整的记录
+        with open(file_path, 'rb') as f:
+            header_offset = self._fp.tell()
+            try:
+                self._fp.write(struct.pack(
+                    zipfile.structFileHeader, zipfile.stringFileHeader, 45 if zip64 else 20, 0, flags, method,
+                    dostime, date, 0, ZIP64_LIMIT if zip64 else 0, ZIP64_LIMIT if zip64 else 0, len(name), len(extra)))
+                self._fp.write(name)
+                self._fp.write(extra)
+                if method == zipfile.ZIP_DEFLATED:
+                    crc, file_size, compress_size = self._write_deflated(f)
+                else:
+                    crc, file_size, compress_size = self._write_stored(f)
+                if not zip64 and (file_size >= ZIP64_LIMIT or compress_size >= ZIP64_LIMIT):
+                    raise zipfile.LargeZipFile(f"文件写入过程中变大, 超过zip64限制: {file_path}")
+            except BaseException:
+                self._discard(header_offset)
+                raise
+        if self._stop:
+            self._discard(header_offset)
+            return False
+
+        # 回填本地文件头中的CRC与大小
+        end = self._fp.tell()
+        self._fp.seek(header_offset + 14)
+        if zip64:
+            self._fp.write(struct.pack('<L', crc))
+            self._fp.seek(header_offset + 30 + len(name) + 4)
+            self._fp.write(struct.pack('<QQ', file_size, compress_size))
+        else:
+            self._fp.write(struct.pack('<LLL', crc, compress_size, file_size))
+        self._fp.seek(end)
+
+        self._entries.append((name, flags, method, dostime, date, crc, compress_size, file_size,
+                              header_offset, (st.st_mode & 0xFFFF) << 16))
+        return True
+
+    def _discard(self, header_offset):
+        """丢弃从header_offset开始未写完的文件记录"""
+        self._fp.seek(header_offset)
+        self._fp.truncate()
+
+    def _advance(self, nbytes):
+        self.bytes_done += nbytes
+        if self.progress_callback:
+            self.progress_callback(self.bytes_done)
+
+    def _write_stored(self, f):
+        crc = file_size = 0
+        while not self._stop and (data := f.read(self.chunk_size)):
+            crc = zlib.crc32(data, crc)
+            file_size += len(data)
+            self._fp.write(data)
+            self._advance(len(data))
+        return crc, file_size, file_size
+
+    def _write_deflated(self, f):
+        """分块压缩, 在途分块数量不超过_max_inflight; 单线程时在当前线程顺序压缩"""
+        crc = file_size = compress_size = 0
+        inflight = deque()      # [(Future或压缩结果, 原始字节数)]
+
+        def drain(limit):
+            nonlocal compress_size
+            while len(inflight) > limit:
+                result, nbytes = inflight.popleft()
+                data = result.result() if self._executor else result
+                compress_size += len(data)
+                self._fp.write(data)
+                self._advance(nbytes)
+
+        data, zdict = f.read(self.chunk_size), b''
+        while not self._stop:
+            following = f.read(self.chunk_size) if data else b''
+            is_last = not following
+            crc = zlib.crc32(data, crc)
+            file_size += len(data)
+            if self._executor:
+                inflight.append((self._executor.submit(_deflate_block, data, zdict, is_last, self.level), len(data)))
+            else:
+                inflight.append((_deflate_block(data, zdict, is_last, self.level), len(data)))
+            drain(self._max_inflight - 1)
+            if is_last:
+                break
+            zdict, data = data[-WINDOW_SIZE:], following
+        drain(0)
+        return crc, file_size, compress_size
+
+    def close(self):
+        """写入中央目录并关闭文件(取消时只包含已完成的文件)"""
+        if self._fp is None:
+            return
+        try:
+            self._write_central_directory()
+        finally:
+            if self._executor:
+                self._executor.shutdown(wait=True)
+            self._fp.close()
+            self._fp = None
+
+    def _write_central_directory(self):
+        start = self._fp.tell()
+        for name, flags, method, dostime, date, crc, compress_size, file_size, offset, attr in self._entries:
+            zip64_values = [v for v in (file_size, compress_size, offset) if v >= ZIP64_LIMIT]
+            extra = struct.pack(f'<HH{len(zip64_values)}Q', 1, 8 * len(zip64_values), *zip64_values) \
+                if zip64_values else b''
+            self._fp.write(struct.pack(
+                zipfile.structCentralDir, zipfile.stringCentralDir, 45 if extra else 20, 3,
+                45 if extra else 20, 0, flags, method, dostime, date, crc,
+                min(compress_size, ZIP64_LIMIT), min(file_size, ZIP64_LIMIT),
+                len(name), len(extra), 0, 0, 0, attr, min(offset, ZIP64_LIMIT)))
+            self._fp.write(name)
+            self._fp.write(extra)
+        end = self._fp.tell()
+        count, size = len(self._entries), end - start
+
+        if count >= 0xFFFF or size >= ZIP64_LIMIT or start >= ZIP64_LIMIT:
+            self._fp.write(struct.pack(zipfile.structEndArchive64, zipfile.stringEndArchive64,
+                                       44, 45, 45, 0, 0, count, count, size, start))
+            self._fp.write(struct.pack(zipfile.structEndArchive64Locator, zipfile.stringEndArchive64Locator,
+                                       0, end, 1))
+        self._fp.write(struct.pack(zipfile.structEndArchive, zipfile.stringEndArchive, 0, 0,
+                                   min(count, 0xFFFF), min(count, 0xFFFF),
+                                   min(size, ZIP64_LIMIT), min(start, ZIP64_LIMIT), 0))
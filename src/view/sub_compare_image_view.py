@@ -18,9 +18,10 @@ import time
 import json
 import threading
 from pathlib import Path 
-from collections import Counter
+from collections import Counter, OrderedDict
+from contextlib import nullcontext
 from multiprocessing import cpu_count
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 
 """导入python第三方模块"""
 import cv2
@@ -29,12 +30,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 from lxml import etree as ETT
 from PIL import Image, ImageOps
-from PyQt5.QtGui import QIcon, QColor, QPixmap, QKeySequence, QPainter, QCursor, QTransform, QImage, QPen, QBrush
-from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal, QThreadPool, QRunnable
+from PyQt5.QtGui import QIcon, QColor, QPixmap, QKeySequence, QPainter, QCursor, QTransform, QImage, QPen, QBrush, QPainterPath
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal, QThreadPool, QRunnable, QRect, QRectF, QSize, QSizeF, QObject
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QHeaderView, QShortcut, QGraphicsView, QAction,
     QGraphicsScene, QGraphicsPixmapItem, QMessageBox, QProgressBar, QGraphicsRectItem, QMenu,
-    QGraphicsItem, QDialog)
+    QGraphicsItem, QDialog, QStyleOptionGraphicsItem)
 
 """导入自定义模块"""
 from src.components.ui_sub_image import Ui_MainWindow                   # 看图子界面，导入界面UI
@@ -46,8 +47,10 @@ from src.common.font import JetBrainsMonoLoader                         # 看图
 from src.utils.ai_tips import CustomLLM_Siliconflow                     # 看图子界面，AI提示看图复选框功能模块
 from src.utils.hisnot import WScreenshot                                # 看图子界面，导入自定义截图的类
 from src.utils.aebox_link import check_process_running, get_api_data    # 导入与AEBOX通信的模块函数
-from src.utils.heic import extract_jpg_from_heic                        # 导入heic图片转换为jpg图片的模块
+from src.utils.heic import decode_heic                                  # 导入heic图片内存解码的模块
 from src.utils.p3_converter import ColorSpaceConverter                  # 导入色彩空间转换配置类
+from src.utils.roi_stats import RoiStatsTable                           # 导入ROI统计积分图模块
+from src.utils.sidecar import MTK_SIDECAR, UNISOC_SIDECAR             # 导入3A sidecar文件单次扫描解析模块
 from src.common.decorator import CC_TimeDec                             # 导入自定义装饰器
 from src.common.progress_round import RoundProgress                     # 导入自定义进度条
 
@@ -300,7 +303,7 @@ def load_xml_data(xml_path):
         return '', False
 
 def load_exif_data(exif_path):
-    """(展锐平台)加载txt文件并提取Bv值和EVD值等EXIF信息
+    """(MTK平台)加载.exif文件并提取Bv值和EVD值等EXIF信息
     返回: (汇总字符串, 是否存在EVFrameSA信息)
     """
     try:
@@ -308,57 +311,21 @@ def load_exif_data(exif_path):
         if not exif_path or not os.path.isfile(exif_path):
             return "", False
 
-        # 读取txt文件
-        text_norm = ""
-        with open(exif_path, "r", encoding="utf-8", errors="ignore") as f:
-            text_norm = f.read()
-
-        # 关键字段查找
-        patterns = {
-            "Lux": "AE_TAG_REALBVX1000|AE_TAG_HSV4P0_STS_EVD|AE_TAG_HS_EVD|AE_TAG_FLT_DR",
-            "CWV": "AE_TAG_CWV_FINAL_TARGET",
-        }
+        # 单次扫描文件, 提取关键字表MTK_KEYS中的所有数值
+        v = MTK_SIDECAR.read(exif_path)
 
+        # 查找关键字数值并拼接
+        extracted_values = []
+        evd = v["evd_hsv4p0"] if v["evd_hsv4p0"] else v["evd_hs"]
+        value = f"NULL" if not v["bv"] and not evd and not v["dr"] else f"bv[{v['bv']}] evd[{evd}] dr[{v['dr']}]"
+        extracted_values.append(f"\nLux: {value}")
+        if v["cwv"]:
+            extracted_values.append(f"\nCWV: {v['cwv']}")
 
-        # 定义提取关键字函数
-        def extract_value_pat(pat, text_norm):
-            try:
-                value = 0
-                format = rf'{re.escape(pat)}\s*:\s*([-+]?\d+(?:\.\d+)?)'
-                match = re.search(format, text_norm)
-                if match:
-                    value = float(match.group(1)) if '.' in match.group(1) else int(match.group(1))
-                return value if value else 0
-            except Exception as e:
-                print(f"extract_value_pat解析exif失败{exif_path}:\n报错信息: {e}")
-                return 0
-  
-        # 查找关键字数值并拼接, 先定义基础变量
-        unisoc_exif_info, extracted_values, value = '', [], 0
-        for key,pat in patterns.items():
-            if key == "Lux":
-                bv = extract_value_pat(pat.split("|")[0], text_norm)
-                evd1 = extract_value_pat(pat.split("|")[1], text_norm)
-                evd2 = extract_value_pat(pat.split("|")[2], text_norm)
-                evd = evd1 if evd1 else evd2
-                dr = extract_value_pat(pat.split("|")[3], text_norm)
-
-                # 打印相关信息
-                value = f"NULL" if not bv and not evd and not dr else f"bv[{bv}] evd[{evd}] dr[{dr}]"
-                
-                
-                extracted_values.append(f"\n{key}: {value}")
-                
-            else: # 剩余关键字数值提取
-                if (value := extract_value_pat(pat, text_norm)):
-                    extracted_values.append(f"\n{key}: {value}")
-        
-
-        unisoc_exif_info = ''.join(extracted_values)
-        return unisoc_exif_info, False
+        return ''.join(extracted_values), False
 
     except Exception as e:
-        print(f"解析TXT失败{exif_path}:\n报错信息: {e}")
+        print(f"解析EXIF失败{exif_path}:\n报错信息: {e}")
         return '', False
 
 
@@ -371,136 +338,30 @@ def load_txt_data(txt_path):
         if not txt_path or not os.path.isfile(txt_path):
             return "", False
 
-        # 读取txt文件
-        text_norm = ""
-        with open(txt_path, "r", encoding="utf-8", errors="ignore") as f:
-            text_norm = f.read()
-
-        # 关键字段查找
-        patterns = {
-            "Lux": "AE-cur_bv|AE-hm-hm_evd|AE-face-calc_fd_param-calc_face_luma-face_backlight|AE-ae_stable",
-            "Mulaes":"AE-mulae_target|AE-mulae-mulae_thd|AE-mulae-mulae_y|AE-mulae-cur_lum",
-            "HM":("AE-short_hm_target|AE-safe_hm_target|"
-                  "AE-hm-short_hm-hm_final_target_min|AE-hm-short_hm-hm_final_target_max|"
-                  "AE-hm-safe_hm-hm_final_target_min|AE-hm-safe_hm-hm_final_target_max|"
-                  "AE-hm-short_hm-hm_bt_target|AE-hm-short_hm-hm_aftaoe_target|AE-hm-short_hm-hm_aftcoe_target|AE-hm-short_hm-hm_dt_target|"
-                  "AE-hm-short_hm-hm_dt_target_min|AE-hm-short_hm-hm_dt_target_max|"
-                  "AE-hm-safe_hm-hm_bt_target|AE-hm-safe_hm-hm_aftaoe_target|AE-hm-safe_hm-hm_aftcoe_target|AE-hm-safe_hm-hm_dt_target|"
-                  "AE-hm-safe_hm-hm_dt_target_min|AE-hm-safe_hm-hm_dt_target_max"
-                 ),
-            "Face":("AE-face-face_num|AE-face-calc_fd_param-face_target-short_face_thd|AE-face-calc_fd_param-face_target-safe_face_thd|"
-                    "AE-face-calc_fd_param-face_target-short_final_face_luma|AE-face-calc_fd_param-face_target-safe_final_face_luma|"
-                    "AE-face-cur_lum|AE-short_face_target|AE-safe_face_target|AE-face-calc_fd_param-face_target-min_facelum_protection_target|"
-                    "AE-face-calc_fd_param-face_target-short_down_limit|AE-face-calc_fd_param-face_target-safe_down_limit|"
-                    "AE-face-calc_fd_param-face_target-short_up_limit|AE-face-calc_fd_param-face_target-safe_up_limit|"
-                    "AE-face-calc_fd_param-face_target-short_face_target_before_mflumtype1|AE-face-calc_fd_param-face_target-safe_face_target_before_mflumtype2"
-                 ),
-            "LCG": "AE-safe_final_target_lum|AE-short_final_target_lum|AE-ae_lcg|AE-ae_lcg_down_limit|AE-ae_lcg_up_limit",
-        }
-
+        # 单次扫描文件, 提取关键字表UNISOC_KEYS中的所有数值
+        v = UNISOC_SIDECAR.read(txt_path)
+        i = {name: int(value) for name, value in v.items()}
+
+        # 查找关键字数值并拼接
+        extracted_values = [
+            f"\nLux: bv[{i['bv']}] evd[{i['evd']}] bl[{v['face_backlight']}] stb[{v['stable']}]",
+            f"\nMulaes: tar[{i['mulae_target']}] calc[{i['mulae_thd']}/{i['mulae_y']}*{i['mulae_cur_lum']}]",
+            (f"\nHM: tar[{i['short_hm_min']}<{i['short_hm_target']}>{i['short_hm_max']},"
+             f"{i['safe_hm_min']}<{i['safe_hm_target']}>{i['safe_hm_max']}] "
+             f"calc[{i['short_hm_bt']}->{i['short_hm_aoe']}->{i['short_hm_coe']}|{i['short_hm_dt']}, "
+             f"{i['safe_hm_bt']}->{i['safe_hm_aoe']}->{i['safe_hm_coe']}|{i['safe_hm_dt']}] "
+             f"dt[{i['short_hm_dt_min']}<{i['short_hm_dt']}>{i['short_hm_dt_max']},"
+             f"{i['safe_hm_dt_min']}<{i['safe_hm_dt']}>{i['safe_hm_dt_max']}]"),
+            (f"\nFace: num[{v['face_num']}] tar[{i['short_face_down']}<{i['short_face_target']}>{i['short_face_up']},"
+             f"{i['safe_face_down']}<{i['safe_face_target']}>{i['safe_face_up']}] "
+             f"mft[{i['mfl_face_target']}] "
+             f"calc[{i['face_cur_lum']}*({i['short_face_thd']}/{i['short_face_luma']})"
+             f"[{i['short_face_before_limit']},{i['safe_face_before_limit']}]"
+             f"({i['safe_face_thd']}/{i['safe_face_luma']})*{i['face_cur_lum']}]"),
+            f"\nLCG: lcg[{v['lcg_down']}<{v['lcg']}>{v['lcg_up']}] tar[{i['short_final_target']},{i['safe_final_target']}]",
+        ]
 
-        # 定义提取关键字函数
-        def extract_value_pat(pat, text_norm):
-            try:
-                value = 0
-                format = rf'{re.escape(pat)}\s*:\s*([-+]?\d+(?:\.\d+)?)'
-                match = re.search(format, text_norm)
-                if match:
-                    value = float(match.group(1)) if '.' in match.group(1) else int(match.group(1))
-                return value if value else 0
-            except Exception as e:
-                print(f"extract_value_pat解析TXT失败{txt_path}:\n报错信息: {e}")
-                return 0
-  
-        # 查找关键字数值并拼接, 先定义基础变量
-        unisoc_exif_info, extracted_values, value = '', [], 0
-        for key,pat in patterns.items():
-            if key == "Lux":
-                bv = extract_value_pat(pat.split("|")[0], text_norm)
-                evd = extract_value_pat(pat.split("|")[1], text_norm)
-                bl = extract_value_pat(pat.split("|")[2], text_norm)
-                stb = extract_value_pat(pat.split("|")[3], text_norm)
-
-                value_ = f"bv[{int(bv)}] evd[{int(evd)}] bl[{bl}] stb[{stb}]"
-                extracted_values.append(f"\n{key}: {value_}")
-
-            elif key == "Mulaes":
-                target = extract_value_pat(pat.split("|")[0], text_norm)
-                thd = extract_value_pat(pat.split("|")[1], text_norm)
-                _y = extract_value_pat(pat.split("|")[2], text_norm)
-                cur_lum = extract_value_pat(pat.split("|")[3], text_norm)
-
-                value_ = f"tar[{int(target)}] calc[{int(thd)}/{int(_y)}*{int(cur_lum)}]"
-                extracted_values.append(f"\n{key}: {value_}")
-     
-
-            elif key == "HM":
-                short_target = extract_value_pat(pat.split("|")[0], text_norm)
-                safe_target = extract_value_pat(pat.split("|")[1], text_norm)
-                short_min = extract_value_pat(pat.split("|")[2], text_norm)
-                short_max = extract_value_pat(pat.split("|")[3], text_norm)
-                safe_min = extract_value_pat(pat.split("|")[4], text_norm)
-                safe_max = extract_value_pat(pat.split("|")[5], text_norm)
-                short_bt = extract_value_pat(pat.split("|")[6], text_norm)
-                short_aoe = extract_value_pat(pat.split("|")[7], text_norm)
-                short_coe = extract_value_pat(pat.split("|")[8], text_norm)
-                short_dt = extract_value_pat(pat.split("|")[9], text_norm)
-                short_dt_min = extract_value_pat(pat.split("|")[10], text_norm)
-                short_dt_max = extract_value_pat(pat.split("|")[11], text_norm)
-                safe_bt = extract_value_pat(pat.split("|")[12], text_norm)
-                safe_aoe = extract_value_pat(pat.split("|")[13], text_norm)
-                safe_coe = extract_value_pat(pat.split("|")[14], text_norm)
-                safe_dt = extract_value_pat(pat.split("|")[15], text_norm)
-                safe_dt_min = extract_value_pat(pat.split("|")[16], text_norm)
-                safe_dt_max = extract_value_pat(pat.split("|")[17], text_norm)
-
-                value_ = (f"tar[{int(short_min)}<{int(short_target)}>{int(short_max)},{int(safe_min)}<{int(safe_target)}>{int(safe_max)}] " 
-                          f"calc[{int(short_bt)}->{int(short_aoe)}->{int(short_coe)}|{int(short_dt)}, {int(safe_bt)}->{int(safe_aoe)}->{int(safe_coe)}|{int(safe_dt)}] "
-                          f"dt[{int(short_dt_min)}<{int(short_dt)}>{int(short_dt_max)},{int(safe_dt_min)}<{int(safe_dt)}>{int(safe_dt_max)}]" 
-                        )
-
-                extracted_values.append(f"\n{key}: {value_}")
-            
-            elif key == "Face":
-                num = extract_value_pat(pat.split("|")[0], text_norm)
-                short_thd = extract_value_pat(pat.split("|")[1], text_norm)
-                safe_thd = extract_value_pat(pat.split("|")[2], text_norm)
-                short_luma = extract_value_pat(pat.split("|")[3], text_norm)
-                safe_luma = extract_value_pat(pat.split("|")[4], text_norm)
-                cur_luma = extract_value_pat(pat.split("|")[5], text_norm)
-                short_target = extract_value_pat(pat.split("|")[6], text_norm)
-                safe_target = extract_value_pat(pat.split("|")[7], text_norm)
-                mfl_target = extract_value_pat(pat.split("|")[8], text_norm)
-                short_down = extract_value_pat(pat.split("|")[9], text_norm)
-                safe_down = extract_value_pat(pat.split("|")[10], text_norm)
-                short_up = extract_value_pat(pat.split("|")[11], text_norm)
-                safe_up = extract_value_pat(pat.split("|")[12], text_norm)
-                short_before_limit = extract_value_pat(pat.split("|")[13], text_norm)
-                safe_before_limit = extract_value_pat(pat.split("|")[14], text_norm)
-
-                value_ = (f"num[{num}] tar[{int(short_down)}<{int(short_target)}>{int(short_up)},{int(safe_down)}<{int(safe_target)}>{int(safe_up)}] " 
-                          f"mft[{int(mfl_target)}] "
-                          f"calc[{int(cur_luma)}*({int(short_thd)}/{int(short_luma)})[{int(short_before_limit)},{int(safe_before_limit)}]({int(safe_thd)}/{int(safe_luma)})*{int(cur_luma)}]" 
-                        )
-
-                extracted_values.append(f"\n{key}: {value_}")
-
-            elif key == "LCG":
-                safe = extract_value_pat(pat.split("|")[0], text_norm)
-                short = extract_value_pat(pat.split("|")[1], text_norm)
-                lcg = extract_value_pat(pat.split("|")[2], text_norm)
-                down = extract_value_pat(pat.split("|")[3], text_norm)
-                up = extract_value_pat(pat.split("|")[4], text_norm)
-
-                value_ = f"lcg[{down}<{lcg}>{up}] tar[{int(short)},{int(safe)}]"
-                extracted_values.append(f"\n{key}: {value_}")
-
-            else: # 剩余关键字数值提取
-                if (value := extract_value_pat(pat, text_norm)):
-                    extracted_values.append(f"\n{key}: {value}")
-
-        unisoc_exif_info = ''.join(extracted_values)
-        return unisoc_exif_info, False
+        return ''.join(extracted_values), False
 
     except Exception as e:
         print(f"解析TXT失败{txt_path}:\n报错信息: {e}")
@@ -539,6 +400,198 @@ def make_unique_dir_names(folder_paths):
 """
 
 
+"""看图子界面色彩空间变体缓存, 按字节数限制容量"""
+class ColorVariantCache:
+    """缓存每张图片按需生成的色彩空间变体(pixmap/TiledImage/cv_img), 键为(图片索引, 模式), 超过字节上限时按LRU淘汰
+
+    变体可以随时由pil_imgs重新生成, 被淘汰后下次使用时重新计算; 当前显示的pixmap由场景图元持有, 淘汰不会影响显示
+    """
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()    # {(index, mode): pixmap或cv_img}
+        self._total_bytes = 0
+
+    @staticmethod
+    def _nbytes(value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, TiledImage):
+            return value.nbytes()
+        return value.width() * value.height() * max(1, value.depth() // 8)
+
+    def get(self, key):
+        with self._lock:
+            if (value := self._items.get(key)) is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if value is None:
+            return
+        with self._lock:
+            if (old := self._items.pop(key, None)) is not None:
+                self._total_bytes -= self._nbytes(old)
+            self._items[key] = value
+            self._total_bytes += self._nbytes(value)
+            # 至少保留刚写入的变体
+            while self._total_bytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._total_bytes -= self._nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._total_bytes = 0
+
+
+"""看图子界面下一组/上一组图片的后台预取"""
+class ImageSetPrefetcher:
+    """在查看当前这一组图片时, 后台解码并准备按下space/B后将要显示的图片组(_process_image的结果)
+
+    1. 以(图片路径, 图片索引, 色彩空间模式)为键缓存整组结果, pil图与pixmap的总字节数超过上限时按LRU淘汰整组
+    2. 每次schedule只保留本次需要的组: 尚未开始的旧任务直接取消, 正在执行的旧任务处理完当前图片后放弃;
+       放弃的任务只要跳过了一张图片就不会写入缓存, 之后再次需要该组时重新提交
+    3. 前台需要的组正在预取时, take会等待其完成, 不会重复解码
+    4. 只缓存全部图片都处理成功的组
+    """
+    def __init__(self, process_func, max_bytes=1536 * 1024 * 1024, image_workers=2):
+        """
+        Args:
+            process_func: 单张图片处理函数, 参数为(index, path, index_text, mode), 返回(index, data)
+            max_bytes: 缓存字节上限
+            image_workers: 组内并行处理图片的线程数
+        """
+        self.process_func = process_func
+        self.max_bytes = max_bytes
+        self.image_workers = max(1, image_workers)
+        self._executor = ThreadPoolExecutor(max_workers=1)   # 按优先级逐组预取
+        self._lock = threading.Lock()
+        self._sets = OrderedDict()     # {key: [(index, data), ...]}
+        self._sizes = {}               # {key: 字节数}
+        self._total_bytes = 0
+        self._pending = {}             # {key: Future}
+        self._runs = {}                # {key: 正在执行的任务状态}, {"abandoned": 是否已放弃(跳过了图片)}
+        self._wanted = set()           # 本次需要预取的组
+
+    @staticmethod
+    def make_key(image_paths, index_list, mode):
+        return tuple(image_paths), tuple(index_list), mode
+
+    @staticmethod
+    def _nbytes(results):
+        total = 0
+        for result in results:
+            if not result or not result[1]:
+                continue
+            img, pixmap = result[1]['pil_image'], result[1]['pixmap']
+            total += img.width * img.height * len(img.getbands())
+            if isinstance(pixmap, TiledImage):
+                total += pixmap.nbytes()
+            elif pixmap is not None:
+                total += pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+        return total
+
+    def put(self, key, results):
+        """写入一组结果(如前台刚显示的组, 便于按B返回), 超过字节上限或有图片未处理成功的组不缓存"""
+        complete = all(result and result[1] for result in results)
+        nbytes = self._nbytes(results) if complete else 0
+        with self._lock:
+            if key in self._sets:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._sets[key]
+            if not complete or nbytes > self.max_bytes:
+                return
+            self._sets[key] = results
+            self._sizes[key] = nbytes
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes and len(self._sets) > 1:
+                evicted, _ = self._sets.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(evicted)
+
+    def take(self, key):
+        """获取一组结果, 该组正在预取时等待完成; 未命中返回None"""
+        with self._lock:
+            if (results := self._sets.get(key)) is not None:
+                self._sets.move_to_end(key)
+                return results
+            future = self._pending.get(key)
+            if future is not None and future.cancel():
+                # 排在其它组之后尚未开始的任务, 直接由前台处理
+                del self._pending[key]
+                self._runs.pop(key, None)
+                future = None
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+
+    def schedule(self, image_sets):
+        """预取多组图片, 取消不再需要的旧任务
+
+        Args:
+            image_sets: [(image_paths, index_list, mode), ...] 按优先级排列
+        """
+        with self._lock:
+            keys = [self.make_key(*image_set) for image_set in image_sets]
+            self._wanted = set(keys)
+            for key, future in list(self._pending.items()):
+                if key not in self._wanted and future.cancel():
+                    del self._pending[key]
+                    self._runs.pop(key, None)
+            for key in keys:
+                if key in self._sets:
+                    continue
+                # 正在执行但已经放弃的任务不会写入缓存, 重新提交
+                if key not in self._pending or self._runs.get(key, {}).get("abandoned"):
+                    run = {"abandoned": False}
+                    self._runs[key] = run
+                    self._pending[key] = self._executor.submit(self._prefetch, key, run)
+
+    def cancel(self):
+        """取消所有预取任务(如跳转到未预取的组时, 避免与前台争抢CPU)"""
+        self.schedule([])
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            self._sets.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def _process(self, key, run, args):
+        if run["abandoned"] or key not in self._wanted:
+            # 跳过任意一张图片后整组放弃
+            run["abandoned"] = True
+            return args[0], None
+        return self.process_func(args)
+
+    def _prefetch(self, key, run):
+        """后台线程执行: 处理一组图片, 全部处理完成且仍然需要时写入缓存"""
+        try:
+            image_paths, index_list, mode = key
+            args = [(index, path, index_list[index], mode) for index, path in enumerate(image_paths)]
+            with ThreadPoolExecutor(max_workers=min(len(args), self.image_workers)) as executor:
+                results = list(executor.map(lambda a: self._process(key, run, a), args))
+            if run["abandoned"] or key not in self._wanted:
+                run["abandoned"] = True
+                return None
+            self.put(key, results)
+            return results
+        except Exception as e:
+            print(f"[ImageSetPrefetcher]-->预取图片失败: {e}")
+            return None
+        finally:
+            with self._lock:
+                # 已被重新提交的组, 由新的任务负责清理
+                if self._runs.get(key) is run:
+                    self._pending.pop(key, None)
+                    del self._runs[key]
+
+
 """"继承 QGraphicsRectItem 并重写 itemChange 方法来实现对矩形框变化的监听"""
 class CustomGraphicsRectItem(QGraphicsRectItem):
     def __init__(self, parent=None):
@@ -576,6 +629,223 @@ class StatsTask(QRunnable):
             self.callback({})
 
 
+""""后台线程为一张图片建立ROI统计积分图, 建立后矩形框移动时直接在主线程查表"""
+class RoiTableTask(QRunnable):
+    class Signals(QObject):
+        finished = pyqtSignal(int, object)   # (图片版本号, RoiStatsTable), 失败时为None
+
+    def __init__(self, cv_img, generation):
+        super().__init__()
+        self.cv_img = cv_img
+        self.generation = generation
+        self.signals = self.Signals()
+
+    def run(self):
+        try:
+            table = RoiStatsTable(self.cv_img)
+        except Exception as e:
+            print(f"建立ROI统计积分图时出错: {e}")
+            table = None
+        self.signals.finished.emit(self.generation, table)
+
+
+"""大图的分块显示源"""
+class TiledImage:
+    """像素数超过threshold的大图的显示源, 代替整张QPixmap, 由TiledPixmapItem分块绘制
+
+    1. 直接引用解码后的PIL图(AUTO色彩空间时与pil_imgs共享同一个对象, 不复制), 不生成整张原始分辨率的QPixmap
+    2. 创建时由PIL图逐级Image.reduce(2)生成第1层及以上的层级并转换为QImage常驻内存(合计约为原图的1/3), 在调用方的工作线程中完成
+    3. 第0层(原始分辨率)的分块只在放大到接近1:1时按需从PIL图裁剪生成, 保存在LRU中, 每次绘制后只保留可见分块加少量余量
+    4. 提供width/height/size/rect等与QPixmap一致的尺寸接口, 调用方无需区分
+    """
+    threshold = 16 * 1024 * 1024        # 使用分块显示的像素数阈值
+    tile_size = 512                     # 第0层分块边长
+    min_level_size = 1024               # 最高层级的长边不小于该值
+
+    def __init__(self, pil_image):
+        source = pil_image
+        # 与pil_to_pixmap一致处理EXIF方向, 不需要旋转时不复制
+        if source.getexif().get(0x0112, 1) not in (0, 1):
+            source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'L'):
+            source = source.convert('RGB')
+        self.image = source
+        self._shared = source is pil_image
+        self.levels = {}                # {level: QImage}, level >= 1
+        self._tiles = OrderedDict()     # 第0层分块LRU {(tx, ty): QImage}
+        image = source
+        while max(image.size) // 2 >= self.min_level_size:
+            image = image.reduce(2)
+            self.levels[len(self.levels) + 1] = self.to_qimage(image)
+
+    @staticmethod
+    def to_qimage(pil_image):
+        """RGB/L模式的PIL图转换为QImage(复制数据, 不引用PIL的内存)"""
+        if pil_image.mode not in ('RGB', 'L'):
+            pil_image = pil_image.convert('RGB')
+        fmt, channels = (QImage.Format_Grayscale8, 1) if pil_image.mode == 'L' else (QImage.Format_RGB888, 3)
+        data = pil_image.tobytes()
+        return QImage(data, pil_image.width, pil_image.height, pil_image.width * channels, fmt).copy()
+
+    @property
+    def max_level(self):
+        return len(self.levels)
+
+    def width(self):
+        return self.image.width
+
+    def height(self):
+        return self.image.height
+
+    def size(self):
+        return QSize(self.image.width, self.image.height)
+
+    def rect(self):
+        return QRect(0, 0, self.image.width, self.image.height)
+
+    def isNull(self):
+        return False
+
+    def nbytes(self):
+        """层级、第0层分块以及独占的PIL图的字节数"""
+        total = sum(image.sizeInBytes() for image in self.levels.values())
+        total += sum(image.sizeInBytes() for image in self._tiles.values())
+        if not self._shared:
+            total += self.image.width * self.image.height * len(self.image.getbands())
+        return total
+
+    def tile(self, tx, ty):
+        """获取第0层的分块, 不在LRU中时从PIL图裁剪生成"""
+        if (image := self._tiles.get((tx, ty))) is not None:
+            self._tiles.move_to_end((tx, ty))
+            return image
+        size = self.tile_size
+        box = (tx * size, ty * size, min((tx + 1) * size, self.image.width), min((ty + 1) * size, self.image.height))
+        image = self.to_qimage(self.image.crop(box))
+        self._tiles[(tx, ty)] = image
+        return image
+
+    def trim_tiles(self, keep):
+        """只保留最近使用的keep个分块"""
+        while len(self._tiles) > keep:
+            self._tiles.popitem(last=False)
+
+
+def pil_to_display(pil_image):
+    """PIL图转换为看图界面的显示源: 大图返回TiledImage(不生成整张pixmap), 其余返回QPixmap"""
+    if pil_image is not None and pil_image.width * pil_image.height > TiledImage.threshold:
+        return TiledImage(pil_image)
+    return pil_to_pixmap(pil_image)
+
+
+"""多分辨率分块绘制的图片项"""
+class TiledPixmapItem(QGraphicsPixmapItem):
+    """看图界面的图片项, 接口与QGraphicsPixmapItem一致, setPixmap可以传入QPixmap或TiledImage
+
+    1. QPixmap(小图)直接使用QGraphicsPixmapItem的绘制
+    2. TiledImage(大图)按当前缩放比例选择层级, 只绘制与可见区域相交的部分; 缩小显示时使用常驻的层级,
+       放大到接近原始分辨率时才使用第0层的分块, 绘制后只保留可见分块加tile_slack个余量
+    3. set_display_size可以将大图绘制为指定尺寸(如覆盖比较时与另一张图片对齐), 不需要生成缩放后的整张图片
+    """
+    tile_slack = 16                          # 第0层分块LRU在可见分块之外保留的数量
+
+    def __init__(self, pixmap=None, parent=None):
+        super(TiledPixmapItem, self).__init__(parent)
+        self._tiled = None                   # 大图的显示源
+        self._display_size = None            # 大图的显示尺寸, None时为原始尺寸
+        # 使用扩展的绘制参数, paint中option.exposedRect为需要重绘的区域
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        if pixmap is not None:
+            self.setPixmap(pixmap)
+
+    def setPixmap(self, pixmap):
+        """设置图片, TiledImage不交给QGraphicsPixmapItem"""
+        self.prepareGeometryChange()
+        if isinstance(pixmap, TiledImage):
+            self._tiled = pixmap
+            super(TiledPixmapItem, self).setPixmap(QPixmap())
+        else:
+            self._tiled = None
+            super(TiledPixmapItem, self).setPixmap(pixmap)
+        self.update()
+
+    def set_display_size(self, size):
+        """设置大图的显示尺寸(QSizeF)"""
+        self.prepareGeometryChange()
+        self._display_size = QSizeF(size)
+        self.update()
+
+    def pixmap(self):
+        return self._tiled if self._tiled is not None else super(TiledPixmapItem, self).pixmap()
+
+    def boundingRect(self):
+        if self._tiled is None:
+            return super(TiledPixmapItem, self).boundingRect()
+        return QRectF(self.offset(), self._display_size or QSizeF(self._tiled.size()))
+
+    def shape(self):
+        if self._tiled is None:
+            return super(TiledPixmapItem, self).shape()
+        path = QPainterPath()
+        path.addRect(self.boundingRect())
+        return path
+
+    def contains(self, point):
+        if self._tiled is None:
+            return super(TiledPixmapItem, self).contains(point)
+        return self.boundingRect().contains(point)
+
+    def paint(self, painter, option, widget=None):
+        if self._tiled is None:
+            super(TiledPixmapItem, self).paint(painter, option, widget)
+            return
+
+        tiled = self._tiled
+        sx = self._display_size.width() / tiled.width() if self._display_size else 1.0
+        sy = self._display_size.height() / tiled.height() if self._display_size else 1.0
+        exposed = option.exposedRect
+        # 重绘区域不超出绘制设备(如QGraphicsView.render时exposedRect为整个图元)
+        inverse, invertible = painter.worldTransform().inverted()
+        if invertible and painter.device() is not None:
+            device = painter.device()
+            exposed = exposed.intersected(inverse.mapRect(QRectF(0, 0, device.width(), device.height())))
+        exposed = exposed.translated(-self.offset())
+        # 以下均为原图像素坐标
+        exposed = QRectF(exposed.x() / sx, exposed.y() / sy, exposed.width() / sx, exposed.height() / sy)
+        exposed = exposed.intersected(QRectF(tiled.rect()))
+        if exposed.isEmpty():
+            return
+        painter.save()
+        painter.translate(self.offset())
+        painter.scale(sx, sy)
+
+        # 根据当前缩放比例选择层级: 屏幕上1个像素对应原图2^level个像素时使用第level层
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = 0
+        while level < tiled.max_level and lod * (1 << (level + 1)) <= 1.0:
+            level += 1
+        painter.setRenderHint(QPainter.SmoothPixmapTransform,
+                              level > 0 or self.transformationMode() == Qt.SmoothTransformation)
+
+        if level:
+            # 常驻层级: 只绘制与重绘区域对应的部分
+            image = tiled.levels[level]
+            fx, fy = tiled.width() / image.width(), tiled.height() / image.height()
+            src = QRectF(exposed.x() / fx, exposed.y() / fy, exposed.width() / fx, exposed.height() / fy)
+            painter.drawImage(exposed, image, src)
+        else:
+            # 第0层: 只生成与重绘区域相交的分块
+            size = tiled.tile_size
+            visible = 0
+            for ty in range(int(exposed.top() // size), int((exposed.bottom() - 1e-6) // size) + 1):
+                for tx in range(int(exposed.left() // size), int((exposed.right() - 1e-6) // size) + 1):
+                    tile = tiled.tile(tx, ty)
+                    painter.drawImage(QRectF(tx * size, ty * size, tile.width(), tile.height()), tile)
+                    visible += 1
+            tiled.trim_tiles(visible + self.tile_slack)
+        painter.restore()
+
+
 """图片视图类"""
 class MyGraphicsView(QGraphicsView):
     def __init__(self, scene, exif_text=None, stats_text=None, *args, **kwargs):
@@ -629,6 +899,10 @@ class MyGraphicsView(QGraphicsView):
         # 添加ROI矩形框相关属性
         self.selection_rect = None
         self.original_image = None  # 存储原始OpenCV图像数据
+        self.cv_image_loader = None # 按需获取OpenCV图像数据的函数, 首次统计ROI时才生成
+        self.roi_table = None       # ROI统计积分图, 首次统计ROI时在后台建立
+        self.roi_table_task = None  # 正在建立积分图的任务
+        self.roi_generation = 0     # 图片版本号, 切换图片后丢弃旧图片的积分图
         self.selection_visible = False
         self.last_pos = None  # 记录鼠标右键拖动的起始位置
         self.move_step = 1.0  # 动态设置矩形框跟随鼠标移动步长
@@ -640,9 +914,62 @@ class MyGraphicsView(QGraphicsView):
         self.update_labels_position()
         
 
+    def set_info_texts(self, exif_text=None, stats_text=None):
+        """复用视图切换图片时, 更新EXIF与亮度统计信息标签的文本, 可见性保持不变"""
+        self.exif_text = exif_text
+        self.stats_text = stats_text
+        self.exif_label.setText(self.exif_text if self.exif_text else "解析不出exif信息!")
+        self.exif_label.adjustSize()
+        self.set_stats_data(self.stats_text if self.stats_text else "不存在亮度统计信息!")
+
+    def clear_selection_rect(self):
+        """移除ROI矩形框以及按需获取的OpenCV图像, 切换图片时调用"""
+        if self.selection_rect:
+            if self.selection_rect.scene():
+                self.selection_rect.scene().removeItem(self.selection_rect)
+            self.selection_rect = None
+        self.selection_visible = False
+        self.original_image = None
+        self.reset_roi_table()
+
+    def reset_roi_table(self):
+        """丢弃当前图片的ROI统计积分图(包括正在建立的)"""
+        self.roi_generation += 1
+        self.roi_table = None
+        self.roi_table_task = None
+
     def set_cv_image(self, cv_img):
         """设置原始OpenCV图像用于统计计算"""
         self.original_image = cv_img
+        self.reset_roi_table()
+
+    def set_cv_image_loader(self, loader):
+        """设置按需获取OpenCV图像的函数, 替代预先生成并持有cv_img"""
+        self.cv_image_loader = loader
+        self.reset_roi_table()
+
+    def build_roi_table(self, cv_img):
+        """在后台为当前图片建立ROI统计积分图, 已建立或正在建立时直接返回"""
+        if self.roi_table is not None or self.roi_table_task is not None:
+            return
+        self.roi_table_task = RoiTableTask(cv_img, self.roi_generation)
+        self.roi_table_task.signals.finished.connect(self._on_roi_table_ready)
+        self.thread_pool.start(self.roi_table_task)
+
+    def _on_roi_table_ready(self, generation, table):
+        """积分图建立完成(主线程), 立即用积分图刷新ROI统计信息"""
+        if generation != self.roi_generation:
+            return
+        self.roi_table_task = None
+        self.roi_table = table
+        if table is not None and self.selection_rect and self.selection_rect.isVisible():
+            self._calculate_roi_stats()
+
+    def get_cv_image(self):
+        """获取用于统计计算的OpenCV图像"""
+        if self.original_image is not None:
+            return self.original_image
+        return self.cv_image_loader() if self.cv_image_loader else None
 
     def toggle_selection_rect(self, visible):
         """切换选择框的显示状态"""
@@ -689,24 +1016,29 @@ class MyGraphicsView(QGraphicsView):
 
     def update_roi_stats(self):
         """更新ROI区域的统计信息"""
-        if not self.selection_rect or self.original_image is None:
+        if not self.selection_rect or self.get_cv_image() is None:
             print("update_roi_stats error!")
             return
-        # 使用 QTimer 延迟调用，避免频繁计算
+        if self.roi_table is not None:
+            # 积分图已建立, 查表只需要毫秒级, 每次移动都直接更新
+            self._calculate_roi_stats()
+            return
+        self.build_roi_table(self.get_cv_image())
+        # 积分图建立之前逐像素计算, 使用 QTimer 延迟调用，避免频繁计算
         QTimer.singleShot(100, self._calculate_roi_stats)
 
 
     def _calculate_roi_stats(self):
         """提取 ROI 区域并启动线程计算统计信息"""
         try:
-            if not self.selection_rect or self.original_image is None:
+            if not self.selection_rect or (cv_img := self.get_cv_image()) is None:
                 return
 
             # 获取选择框在场景中的位置和大小
             scene_rect = self.selection_rect.sceneBoundingRect()
             
             # 获取原始图像尺寸
-            img_h, img_w = self.original_image.shape[:2]
+            img_h, img_w = cv_img.shape[:2]
             
             # 转换场景坐标到图像坐标
             x1 = max(0, min(img_w-1, int(scene_rect.left())))
@@ -715,9 +1047,11 @@ class MyGraphicsView(QGraphicsView):
             y2 = max(0, min(img_h, int(scene_rect.bottom())))
             
             # 确保有效的 ROI 区域
-            if x2 > x1 and y2 > y1:
+            if x2 > x1 and y2 > y1 and self.roi_table is not None:
+                self._update_stats_display(self.roi_table.stats(x1, y1, x2, y2))
+            elif x2 > x1 and y2 > y1:
                 # 提取 ROI 区域
-                roi = self.original_image[y1:y2, x1:x2]
+                roi = cv_img[y1:y2, x1:x2]
                 
                 # 创建并启动新的任务
                 task = StatsTask(roi, self._update_stats_display)
@@ -1130,15 +1464,17 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
         self.histograms = []
         self.original_rotation = []
         self.graphics_views = []
-        self.original_pixmaps = []
-        self.rgb_pixmaps = []
-        self.gray_pixmaps = []
-        self.p3_pixmaps = []
-        self.cv_imgs = []
         self.pil_imgs = []
         self.base_scales = []
         self._scales_min = []
 
+        # 色彩空间变体(AUTO/sRGB/sGray/Display-P3的pixmap以及cv_img)按需生成, 缓存在有字节上限的缓存中
+        self.color_variants = ColorVariantCache()
+        self.display_mode = 0
+
+        # 按下space/B后将要显示的下一组/上一组图片在后台预取
+        self.prefetcher = ImageSetPrefetcher(self._process_image)
+
         # 设置表格的宽高初始大小
         self.table_width_heigth_default = [2534,1376]
 
@@ -1578,27 +1914,39 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
             self.sync_image_index_with_aebox(self.images_path_list, self.index_list) if self.parent_window.statusbar_checkbox.isChecked() else 0
 
             try:
-                # 先禁用表格自动刷新，确保表格可见，然后释放之前的表格显示等资源
+                # 先禁用表格自动刷新，确保表格可见
                 self.tableWidget_medium.setUpdatesEnabled(False) 
                 self.tableWidget_medium.show()
-                self.cleanup()
 
-                # 1. 预先分配数据结构, 发送进度条更新信号
+                # 1. 使用线程池并行处理图片
+                self.progress_updated.emit(50)
+                # 使用并行解析图片的pil格式图、histogram、stats、当前显示色彩空间的pixmap以及exif等信息
+                self.display_mode = self.comboBox_2.currentIndex()
+                set_key = ImageSetPrefetcher.make_key(image_paths, index_list, self.display_mode)
+                if (futures := self.prefetcher.take(set_key)) is None:
+                    # 未命中预取结果(首次打开或跳转), 先取消后台预取避免争抢CPU
+                    self.prefetcher.cancel()
+                    args = [(index, path, index_list[index], self.display_mode) for index, path in enumerate(image_paths)]
+                    with ThreadPoolExecutor(max_workers=max(1, min(len(image_paths), cpu_count() - 2))) as executor:
+                        futures = list(executor.map(self._process_image, args))
+
+                # 2. 图片数量不变且全部处理成功时复用已有的视图, 只替换pixmap和信息标签; 否则释放之前的表格显示等资源后重建
+                reuse_views = (len(self.graphics_views) == num_images
+                               and all(view is not None for view in self.graphics_views)
+                               and all(result and result[1] for result in futures))
+                if reuse_views:
+                    self.color_variants.clear()
+                else:
+                    self.cleanup()
+                    self.graphics_views = [None] * num_images
+                    self.original_rotation = [None] * num_images
+                    self.base_scales = [None] * num_images
+                    self._scales_min = [None] * num_images
                 self.exif_texts = [None] * num_images
                 self.histograms = [None] * num_images
-                self.original_rotation = [None] * num_images
-                self.graphics_views = [None] * num_images
-                self.original_pixmaps = [None] * num_images  
-                self.rgb_pixmaps = [None] * num_images
-                self.gray_pixmaps = [None] * num_images  
-                self.p3_pixmaps = [None] * num_images
-                self.cv_imgs = [None] * num_images 
                 self.pil_imgs = [None] * num_images 
-                self.base_scales = [None] * num_images
-                self._scales_min = [None] * num_images
-
 
-                # 2. 设置表头行列结构以及单元格内容（文件夹名或文件名） 
+                # 3. 设置表头行列结构以及单元格内容（文件夹名或文件名） 
                 self.toggle_title_display(self.is_title_on) # 设置列表头是否显示和隐藏
                 self.tableWidget_medium.setColumnCount(num_images)
                 self.tableWidget_medium.setRowCount(1)
@@ -1607,12 +1955,6 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
                 if folder_names := [os.path.dirname(path) for path in image_paths]:
                     tar_folder_name = make_unique_dir_names(folder_names)
                 self.tableWidget_medium.setHorizontalHeaderLabels(tar_folder_name)
-                
-                # 3. 使用线程池并行处理图片
-                self.progress_updated.emit(50)
-                # 使用并行解析图片的pil格式图、cv_img、histogram、pixmap、gray_pixmap、p3_pixmap以及exif等信息
-                with ThreadPoolExecutor(max_workers=min(len(image_paths), cpu_count() - 2)) as executor:
-                    futures = list(executor.map(self._process_image, enumerate(image_paths)))
 
                 # 4. 计算目标尺寸
                 target_width, target_height, avg_aspect_ratio = self._calculate_target_dimensions(futures)
@@ -1620,73 +1962,84 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
 
                 # 5. 批量更新UI, 更新进度条
                 self.progress_updated.emit(100)
+                qcolor = rgb_str_to_qcolor(self.background_color_table)
                 for index, result in enumerate(futures):
                     if result and result[1]:
                         # 获取图片处理结果
                         data = result[1]
 
-                        # 根据下拉框索引判断pixmap类型(0:原始图、1:RGB色域图、2:gray色域图 3:p3色域图)
+                        # pixmap为下拉框当前色彩空间(0:原始图、1:RGB色域图、2:gray色域图 3:p3色域图)的图, 其余色彩空间切换时再生成
                         pixmap = data['pixmap']
-                        if self.comboBox_2.currentIndex() == 1:
-                            pixmap = data['rgb_pixmap']
-                        if self.comboBox_2.currentIndex() == 2:
-                            pixmap = data['gray_pixmap']
-                        if self.comboBox_2.currentIndex() == 3:
-                            pixmap = data['p3_pixmap']
-
-                        # 创建并设置场景，设置场景颜色为读取的背景色
-                        scene = QGraphicsScene(self)
-                        qcolor = rgb_str_to_qcolor(self.background_color_table)
-                        scene.setBackgroundBrush(QBrush(qcolor)) 
-
-                        # 创建图片项
-                        pixmap_item = QGraphicsPixmapItem(pixmap)
-                        pixmap_item.setTransformOriginPoint(pixmap.rect().center())
-                        scene.addItem(pixmap_item)
-                        
+
                         # 处理EXIF可见性字典和亮度统计信息
                         exif_info = self.process_exif_info(self.dict_exif_info_visibility, data['exif_info'], data['hdr'])
-                        stats_info = data['stats'] if data['cv_img'] is not None else "None"
-                        
-                        # 创建并设置视图
-                        view = MyGraphicsView(scene, exif_info, stats_info, self)
-                        view.pixmap_items = [pixmap_item]
-                        
-                        # 设置视图的缩放，先计算基础缩放比例，再计算最终缩放比例，最后应用缩放
+                        stats_info = data['stats'] if data['stats'] else "None"
+
+                        # 计算基础缩放比例，再计算最终缩放比例
                         w, h = pixmap.width(), pixmap.height()
                         final_scale = min(target_width / w, target_height / h) * self.set_zoom_scale(avg_aspect_ratio, target_width, target_height)
-                        view.scale(final_scale, final_scale)
+
+                        if reuse_views:
+                            # 复用视图: 图片尺寸与上一组相同时保留缩放、平移和旋转, 否则按新尺寸重置
+                            view = self.graphics_views[index]
+                            pixmap_item = view.pixmap_items[0]
+                            same_size = pixmap_item.pixmap().size() == pixmap.size()
+                            view.scene().setBackgroundBrush(QBrush(qcolor))
+                            view.clear_selection_rect()
+                            pixmap_item.setPixmap(pixmap)
+                            view.set_info_texts(exif_info, stats_info)
+                            if not same_size:
+                                pixmap_item.setRotation(0)
+                                pixmap_item.setTransformOriginPoint(pixmap.rect().center())
+                                view.scene().setSceneRect(pixmap_item.sceneBoundingRect())
+                                view.setTransform(QTransform.fromScale(final_scale, final_scale))
+                                view.centerOn(pixmap_item)
+                                self.original_rotation[index] = pixmap_item.rotation()
+                                self.base_scales[index] = final_scale
+                                self._scales_min[index] = final_scale
+                        else:
+                            # 创建并设置场景，设置场景颜色为读取的背景色
+                            scene = QGraphicsScene(self)
+                            scene.setBackgroundBrush(QBrush(qcolor)) 
+
+                            # 创建图片项
+                            pixmap_item = TiledPixmapItem(pixmap)
+                            pixmap_item.setTransformOriginPoint(pixmap.rect().center())
+                            scene.addItem(pixmap_item)
+
+                            # 创建并设置视图, 应用缩放
+                            view = MyGraphicsView(scene, exif_info, stats_info, self)
+                            view.pixmap_items = [pixmap_item]
+                            view.scale(final_scale, final_scale)
+                            self.graphics_views[index] = view
+                            self.original_rotation[index] = pixmap_item.rotation()
+                            self.base_scales[index] = final_scale
+                            self._scales_min[index] = final_scale
                         
                         # 设置直方图、EXIF、亮度统计信息、cv_img
                         view.set_histogram_visibility(self.checkBox_1.isChecked())
                         view.set_exif_visibility(self.checkBox_2.isChecked(), self.font_color_exif)
                         view.set_stats_visibility(self.stats_visible) 
-                        view.set_histogram_data(data['histogram']) if data['histogram'] is not None else ...
-                        view.set_cv_image(data['cv_img']) if data['cv_img'] is not None else ...
+                        if reuse_views or data['histogram'] is not None:
+                            view.set_histogram_data(data['histogram'])
+                        view.set_cv_image_loader(lambda i=index: self.get_color_variant(i, "cv"))
 
                         # 保存数据
-                        self.graphics_views[index] = view
-                        self.original_rotation[index] = pixmap_item.rotation()
-                        self.original_pixmaps[index] = data['pixmap']
-                        self.rgb_pixmaps[index] = data['rgb_pixmap']
-                        self.gray_pixmaps[index] = data['gray_pixmap']
-                        self.p3_pixmaps[index] = data['p3_pixmap']
-                        self.cv_imgs[index] = data['cv_img']
+                        self.color_variants.put((index, self.display_mode), data['pixmap'])
                         self.pil_imgs[index] = data['pil_image']
                         self.exif_texts[index] = data['exif_info']
                         self.histograms[index] = data['histogram']
-                        self.base_scales[index] = final_scale
-                        self._scales_min[index] = final_scale
 
-                        # 更新表格
-                        # self.tableWidget_medium.setCellWidget(0, index, view)
-
-                # 启动表格自动刷新，批量更新表格内容
+                # 启动表格自动刷新，新建的视图批量放入表格, 复用的视图已在表格中
                 self.tableWidget_medium.setUpdatesEnabled(True)
-                for index, view in enumerate(self.graphics_views):
-                    if view is not None:
-                        self.tableWidget_medium.setCellWidget(0, index, view)
-
+                if not reuse_views:
+                    for index, view in enumerate(self.graphics_views):
+                        if view is not None:
+                            self.tableWidget_medium.setCellWidget(0, index, view)
+
+                # 保留当前组的结果(按B返回时直接使用), 界面刷新后开始预取下一组/上一组
+                self.prefetcher.put(set_key, futures)
+                QTimer.singleShot(0, self.schedule_prefetch)
                 return True
             except Exception as e:
                 print(f"更新图片时发生错误: {e}")
@@ -1790,48 +2143,44 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
         """
         该函数主要是实现了图片基础信息提取功能.
         Args:
-            args: 包含 (index, path) 的元组
+            args: 包含 (index, path, index_text, mode) 的元组, index_text为主界面中的图片索引(如"1/100"), mode为色彩空间
         Returns:
             index, {
                 'pil_image': img,            # PIL图像
-                'cv_img': cv_img,            # OpenCV图像
                 'histogram': histogram,      # 直方图信息
-                'pixmap': pixmap,            # 原始pixmap格式图
-                'rgb_pixmap': rgb_pixmap,    # pixmap格式RGB色域图
-                'gray_pixmap': gray_pixmap,  # pixmap格式灰度图
-                'p3_pixmap': p3_pixmap,      # pixmap格式p3色域图
+                'pixmap': pixmap,            # 色彩空间mode的pixmap格式图
                 'exif_info': exif_info,      # exif信息
                 'stats': stats_text,         # 添加亮度/RGB/LAB等信息
             }
         Note:
-            注意事项，列出任何重要的假设、限制或前置条件.
+            其余色彩空间的pixmap以及cv_img不在此处生成, 由get_color_variant在首次使用时生成并缓存.
         """
         # 记录开始时间
         start_time_process_image = time.time()  
-        index, path = args
+        index, path, index_text, mode = args
         try:
-            # 如果图片是heic格式，则转换为jpg格式
-            if path.endswith(".heic"):
-                if new_path := extract_jpg_from_heic(path):
-                    path = new_path
-
             # 如果图片不存在，则抛出异常
             if not os.path.exists(path):
                 raise FileNotFoundError(f"❌ 图片不存在: {path}")
 
-            # 使用PIL获取所需的图像信息
-            with Image.open(path) as img:
-                """1. 获取pil_img的格式,确保函数get_exif_info能正确加载信息; 生成sRGB色域的pil_img和pixmap--------------------------------"""
-                img_format = img.format
-                pixmap = pil_to_pixmap((img := self.p3_converter.get_pilimg_auto(img)))
+            # 如果图片是heic格式，直接在内存中解码(带解码帧缓存)，不再转存为jpg后二次解码
+            heic_img = None
+            if path.lower().endswith(".heic") and (heic_img := decode_heic(path)) is None:
+                raise ValueError(f"❌ HEIC图片解码失败: {path}")
 
-                """2. 使用线程池并行生成，获取histogram, cv_img, stats, gray_pixmap, p3_pixmap等图像信息---------------------------------"""
-                histogram, cv_img, stats, rgb_pixmap, gray_pixmap, p3_pixmap = self._generate_pixmaps_parallel(img)
+            # 使用PIL获取所需的图像信息; 解码帧为缓存共享对象，不能在with结束时关闭
+            with nullcontext(heic_img) if heic_img is not None else Image.open(path) as img:
+                """1. 获取pil_img的格式,确保函数get_exif_info能正确加载信息; 生成自动加载ICC配置的pil_img--------------------------------"""
+                img_format = img.format or "HEIF"
+                img = self.p3_converter.get_pilimg_auto(img)
+
+                """2. 使用线程池并行生成，获取histogram, stats以及当前显示色彩空间的pixmap---------------------------------------------"""
+                histogram, stats, pixmap = self._generate_pixmaps_parallel(img, mode)
                 # print(f"色域转换耗时: {(time.time() - start_time_process_image):.2f} 秒")
 
             """3. EXIF信息提取-------------------------------------------------------------------------------------------------------""" 
             # 提取图片的基础信息
-            basic_info = self.get_pic_basic_info(path, img, pixmap, self.index_list[index])
+            basic_info = self.get_pic_basic_info(path, img, pixmap, index_text)
 
             # piexf解析曝光时间光圈值ISO等复杂的EXIF信息
             exif_info = self.get_exif_info(path, img_format) + basic_info
@@ -1863,16 +2212,12 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
 
             # 拼接亮度统计信息，计算亮度统计信息方法calculate_image_stats放到并行函数_generate_pixmaps_parallel中执行
             stats_text = f"亮度: {stats['avg_brightness']}\n对比度(L值标准差): {stats['contrast']}" \
-            f"\nLAB: {stats['avg_lab']}\nRGB: {stats['avg_rgb']}\nR/G: {stats['R_G']}  B/G: {stats['B_G']}"
+            f"\nLAB: {stats['avg_lab']}\nRGB: {stats['avg_rgb']}\nR/G: {stats['R_G']}  B/G: {stats['B_G']}" if stats else None
 
             return index, {
                 'pil_image': img,            # PIL图像
-                'cv_img': cv_img,            # OpenCV图像
                 'histogram': histogram,      # 直方图信息
-                'pixmap': pixmap,            # 原始pixmap格式图
-                'rgb_pixmap': rgb_pixmap,    # pixmap格式RGB色域图
-                'gray_pixmap': gray_pixmap,  # pixmap格式灰度图
-                'p3_pixmap': p3_pixmap,      # pixmap格式p3色域图
+                'pixmap': pixmap,            # 当前显示色彩空间的pixmap格式图
                 'exif_info': exif_info,      # exif信息
                 'hdr': hdr_flag,             # 添加亮度/RGB/LAB等信息
                 'stats': stats_text,         # 添加亮度/RGB/LAB等信息
@@ -1886,64 +2231,23 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
             print(f"处理图片{index}_{os.path.basename(path)} 耗时: {(time.time() - start_time_process_image):.2f} 秒")
 
 
-    def _generate_pixmaps_parallel(self, img):
+    def _generate_pixmaps_parallel(self, img, mode=0):
         """
-        该函数主要是实现了一个线程池并行生成不同色域的pixmap.
+        该函数主要是实现了一个线程池并行生成直方图、亮度统计信息以及当前显示色彩空间的pixmap.
         Args:
             img (Image.Image): PIL Image.
+            mode (int): 当前显示的色彩空间, 0:AUTO 1:sRGB 2:sGray 3:Display-P3.
         Returns:
-            histogram, cv_img, stats, gray_pixmap, p3_pixmap.
+            histogram, stats, pixmap.
         Note:
-            # 获取cv_img
-            cv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-            # 获取亮度统计信息
-            stats = calculate_image_stats(cv_img, resize_factor=0.1)
-            # 获取直方图
-            histogram = self.calculate_brightness_histogram(img) 
-            # 获取sRGB色域图
-            gray_image = img.convert('L')
-            gray_pixmap = pil_to_pixmap(gray_image)
-            # 获取display-p3色域图
-            p3_image = self.p3_converter.convert_color_space(img, "Display-P3", intent="Relative Colorimetric")
-            p3_pixmap = pil_to_pixmap(p3_image)
+            cv_img只在计算亮度统计信息时临时生成, 不再保留; 其它色彩空间的pixmap切换时由get_color_variant按需生成
         """
-        
-        """并行生成不同色域的pixmap"""
-        def generate_rgb():
+        def generate_stats():
             try:
-                rgb_image = self.p3_converter.get_pilimg_sRGB(img)
-                return pil_to_pixmap(rgb_image)
-            except Exception as e:
-                print(f"sGray转换失败: {str(e)}")
-                return pil_to_pixmap(img)
-
-        def generate_gray():
-            try:
-                # 先转换为灰度区间pil_img，然后转换为pixmap
-                pil_img = img if img.mode == "L" else img.convert('L')
-                gray_pixmap = pil_to_pixmap(pil_img)
-
-                return gray_pixmap
-            except Exception as e:
-                print(f"sGray转换失败: {str(e)}")
-                return pil_to_pixmap(img)
-            
-        def generate_p3():
-            try:
-                p3_image = self.p3_converter.convert_color_space(img, "Display-P3", intent="Relative Colorimetric")
-                return pil_to_pixmap(p3_image)
-            except Exception as e:
-                print(f"display-p3转换失败: {str(e)}")
-                return pil_to_pixmap(img)
-
-        def generate_cv_img():
-            try:
-                cv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                stats = calculate_image_stats(cv_img, resize_factor=0.1)
-                return cv_img, stats
+                return calculate_image_stats(cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR), resize_factor=0.1)
             except Exception as e:
                 print(f"cv_img转换失败: {str(e)}")
-                return None, None
+                return None
 
         def generate_histogram():
             try:
@@ -1952,23 +2256,58 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
                 print(f"cv_img转换失败: {str(e)}")
                 return None
             
-        # 使用线程池并行处理 min(4, cpu_count()) ，设置最大线程数
-        with ThreadPoolExecutor(max_workers=min(5, cpu_count())) as executor:
-            # 提交所有任务
-            rgb_future = executor.submit(generate_rgb)
-            gray_future = executor.submit(generate_gray)
-            p3_future = executor.submit(generate_p3)
-            cv_future = executor.submit(generate_cv_img)
+        # 使用线程池并行处理
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pixmap_future = executor.submit(self._build_color_variant, img, mode)
+            stats_future = executor.submit(generate_stats)
             histogram_future = executor.submit(generate_histogram)
 
-            # 获取结果
-            rgb_pixmap = rgb_future.result()
-            gray_pixmap = gray_future.result()
-            p3_pixmap = p3_future.result()
-            cv_img, stats =  cv_future.result()
-            histogram =  histogram_future.result()
+            pixmap = pixmap_future.result()
+            stats = stats_future.result()
+            histogram = histogram_future.result()
+
+        return histogram, stats, pixmap
+
+    def _build_color_variant(self, img, mode):
+        """
+        该函数主要是实现了由自动加载ICC配置的pil_img生成指定色彩空间变体的功能.
+        Args:
+            img (Image.Image): PIL Image.
+            mode (int|str): 0:AUTO 1:sRGB 2:sGray 3:Display-P3 的pixmap, "cv":用于ROI统计的OpenCV图像.
+        Returns:
+            QPixmap | TiledImage | np.ndarray: 大图返回TiledImage, 不生成整张pixmap; 转换失败时返回原始图的显示源.
+        """
+        try:
+            if mode == "cv":
+                return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+            if mode == 1:
+                return pil_to_display(self.p3_converter.get_pilimg_sRGB(img))
+            if mode == 2:
+                # 先转换为灰度区间pil_img，然后转换为pixmap
+                return pil_to_display(img if img.mode == "L" else img.convert('L'))
+            if mode == 3:
+                return pil_to_display(self.p3_converter.convert_color_space(img, "Display-P3", intent="Relative Colorimetric"))
+            return pil_to_display(img)
+        except Exception as e:
+            print(f"[_build_color_variant]-->色彩空间{mode}转换失败: {str(e)}")
+            return None if mode == "cv" else pil_to_display(img)
 
-        return histogram, cv_img, stats, rgb_pixmap, gray_pixmap, p3_pixmap
+    def get_color_variant(self, index, mode):
+        """
+        该函数主要是实现了获取第index张图片指定色彩空间变体的功能, 首次使用时生成并写入色彩空间变体缓存.
+        Args:
+            index (int): 图片索引.
+            mode (int|str): 同_build_color_variant.
+        Returns:
+            QPixmap | TiledImage | np.ndarray | None.
+        """
+        if (variant := self.color_variants.get((index, mode))) is not None:
+            return variant
+        if index >= len(self.pil_imgs) or (img := self.pil_imgs[index]) is None:
+            return None
+        variant = self._build_color_variant(img, mode)
+        self.color_variants.put((index, mode), variant)
+        return variant
 
     def sync_image_index_with_aebox(self, images_path_list, index_list):
         """同步当前图片索引到aebox应用,与aebox的基础通信协议如下:
@@ -2104,11 +2443,7 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
             self.histograms.clear()
             self.original_rotation.clear()
             self.graphics_views.clear()
-            self.original_pixmaps.clear()
-            self.rgb_pixmaps.clear()
-            self.gray_pixmaps.clear()
-            self.p3_pixmaps.clear()
-            self.cv_imgs.clear()
+            self.color_variants.clear()
             self.pil_imgs.clear()
             self.base_scales.clear()
             self._scales_min.clear()
@@ -2255,59 +2590,36 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
         """图像色彩显示空间下拉框self.comboBox_2内容改变时触发事件
         ["✅AUTO","✅sRGB色域", "✅sGray色域", "✅Display-P3色域"]
         """
+        # 设置当前启用的图像色彩显示空间(0:AUTO档，自动检测加载色域 1:sRGB色域 2:灰度图色域 3:p3色域)
+        self.clean_color_space()
+        setattr(self, ("auto_color_space", "srgb_color_space", "gray_color_space", "p3_color_space")[index], True)
+        self.update_comboBox2()
+        self.display_mode = index
+
+        # 首次切换到该色彩空间时并行生成各图片的pixmap，之后直接从色彩空间变体缓存中读取
+        indexes = [i for i, view in enumerate(self.graphics_views) if view and view.scene()]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(indexes), cpu_count() - 2))) as executor:
+            converted_pixmaps = dict(zip(indexes, executor.map(lambda i: self.get_color_variant(i, index), indexes)))
+
         # 更新所有图形视图的场景视图
-        for i, view in enumerate(self.graphics_views):
-            if view and view.scene() :
-                try:
-                    original_pixmap = self.original_pixmaps[i]
-                    current_rotation = view.pixmap_items[0].rotation() if view.pixmap_items else 0
-
-                    if index == 0 :  # AUTO档，自动检测加载色域
-                        # 设置当前启用的图像色彩显示空间
-                        self.clean_color_space()
-                        self.auto_color_space = True
-                        self.update_comboBox2()
-
-                        # 调用列表self.original_pixmaps[i]中存储的原始图pixmap
-                        converted_pixmap = original_pixmap
-
-                    # 根据选择的色彩空间转换图像
-                    elif index == 1 and self.rgb_pixmaps[i] is not None:  # sRGB色域
-                        # 设置当前启用的图像色彩显示空间
-                        self.clean_color_space()
-                        self.srgb_color_space = True
-                        self.update_comboBox2()
-
-                        # 调用列表self.rgb_pixmaps[i]中存储的sRGB色域图pixmap
-                        converted_pixmap = self.rgb_pixmaps[i]
-                    elif index == 2 and self.gray_pixmaps[i] is not None:  # 灰度图色域
-                        # 设置当前启用的图像色彩显示空间
-                        self.clean_color_space()
-                        self.gray_color_space = True
-                        self.update_comboBox2()
-
-                        # 调用列表self.gray_pixmaps[i]中存储的灰度图pixmap
-                        converted_pixmap = self.gray_pixmaps[i]
-                    elif index == 3 and self.p3_pixmaps[i] is not None:  # p3色域
-                        # 设置当前启用的图像色彩显示空间
-                        self.clean_color_space()
-                        self.p3_color_space = True
-                        self.update_comboBox2()
-
-                        # 调用列表self.p3_pixmaps[i]中存储的p3色域图pixmap
-                        converted_pixmap = self.p3_pixmaps[i]
-
-                    # 更新视图显示
-                    view.pixmap_items[0].setPixmap(converted_pixmap)
-                    view.pixmap_items[0].setRotation(current_rotation)
-                    view.centerOn(view.mapToScene(view.viewport().rect().center()))
-                    
-                    # 更新场景背景色
-                    qcolor = rgb_str_to_qcolor(self.background_color_table)
-                    view.scene().setBackgroundBrush(QBrush(qcolor))
-                    
-                except Exception as e:
-                    print(f"❌ [on_comboBox_2_changed]-->色彩空间转换失败: {str(e)}")
+        for i in indexes:
+            view = self.graphics_views[i]
+            try:
+                if (converted_pixmap := converted_pixmaps[i]) is None:
+                    continue
+                current_rotation = view.pixmap_items[0].rotation() if view.pixmap_items else 0
+
+                # 更新视图显示
+                view.pixmap_items[0].setPixmap(converted_pixmap)
+                view.pixmap_items[0].setRotation(current_rotation)
+                view.centerOn(view.mapToScene(view.viewport().rect().center()))
+                
+                # 更新场景背景色
+                qcolor = rgb_str_to_qcolor(self.background_color_table)
+                view.scene().setBackgroundBrush(QBrush(qcolor))
+                
+            except Exception as e:
+                print(f"❌ [on_comboBox_2_changed]-->色彩空间转换失败: {str(e)}")
         # 更新UI
         self.update()
         QApplication.processEvents() 
@@ -2789,17 +3101,22 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
         
         try:    
             def create_unified_overlay(source_view, target_view):
-                """创建统一尺寸的覆盖图像(以目标项当前pixmap像素尺寸缩放)"""
+                """创建统一尺寸的覆盖图元(以目标项当前pixmap像素尺寸缩放)"""
                 try:
                     source_pixmap_item = source_view.pixmap_items[0]
                     target_item = target_view.pixmap_items[0]
                     source_pixmap = source_pixmap_item.pixmap()
                     target_size_px = target_item.pixmap().size()
-                    return source_pixmap.scaled(
+                    if isinstance(source_pixmap, TiledImage):
+                        # 大图共用源图的层级, 按目标尺寸绘制, 不生成缩放后的整张图片
+                        overlay = TiledPixmapItem(source_pixmap)
+                        overlay.set_display_size(QSizeF(target_size_px))
+                        return overlay
+                    return QGraphicsPixmapItem(source_pixmap.scaled(
                         target_size_px,
                         Qt.IgnoreAspectRatio,
                         Qt.SmoothTransformation
-                    )
+                    ))
                 except Exception as e:
                     print(f"❌ [create_unified_overlay]-->创建统一覆盖图像失败: {str(e)}")
                     return None
@@ -2831,15 +3148,14 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
                     pass
                 self.overlay_items[target_index] = None
 
-            # 创建覆盖pixmap并添加为临时图元
-            scaled = create_unified_overlay(source_view, target_view)
-            if scaled is None:
+            # 创建覆盖图元并添加为临时图元
+            overlay_item = create_unified_overlay(source_view, target_view)
+            if overlay_item is None:
                 return
 
-            overlay_item = QGraphicsPixmapItem(scaled)
             overlay_item.setZValue(9999)
             # 变换中心设为图像中心
-            overlay_item.setTransformOriginPoint(scaled.rect().center())
+            overlay_item.setTransformOriginPoint(overlay_item.boundingRect().center())
 
             # 对齐到目标项位置与旋转
             target_item = target_view.pixmap_items[0]
@@ -3146,6 +3462,20 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
             self.Escape_close()
             
     
+    def schedule_prefetch(self):
+        """后台预取按下space/B后将要显示的下一组/上一组图片, 含视频的组不预取"""
+        try:
+            if not self.parent_window or not hasattr(self.parent_window, "peek_space_or_b_file_list"):
+                return
+            image_sets = []
+            for key_type in ('space', 'b'):
+                paths, indexs = self.parent_window.peek_space_or_b_file_list(key_type)
+                if paths and all(path.lower().endswith(self.parent_window.IMAGE_FORMATS) for path in paths):
+                    image_sets.append((paths, indexs, self.display_mode))
+            self.prefetcher.schedule(image_sets)
+        except Exception as e:
+            print(f"❌ [schedule_prefetch]-->预取下一组/上一组图片时发生错误: {e}")
+
     def get_next_images(self):
         """获取下一组图片"""
         try:
@@ -3187,6 +3517,7 @@ class SubMainWindow(QMainWindow, Ui_MainWindow):
         try:
             self.save_settings()         # 保存设置
             self.setting_window_closed() # 关闭设置子窗口
+            self.prefetcher.shutdown()   # 停止后台预取
             self.cleanup()               # 清理资源
             self.closed.emit()           # 发送关闭信号
             self.closed.disconnect()     # 发送后立即断开连接
@@ -6,13 +6,15 @@ import time
 import json
 import pathlib
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 """导入python第三方模块"""
 import cv2
 from cv2 import VideoCapture
 import numpy as np
 from PyQt5.QtGui import QImage, QPixmap, QCursor, QKeySequence, QIcon, QMovie, QKeySequence
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QRunnable, QThreadPool
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QMenu,
     QHBoxLayout, QVBoxLayout, QSlider, QFileDialog, QAction, QShortcut,
@@ -21,6 +23,7 @@ from PyQt5.QtWidgets import (
 """导入自定义模块"""
 from src.common.font import JetBrainsMonoLoader
 from src.common.manager_color_exif import load_color_settings 
+from src.utils.video_align import compute_video_signatures, read_frame_signature, match_frame
 
 """设置本项目的入口路径, 以及图标根目录"""
 BASEPATH = pathlib.Path(__file__).parent.parent.parent
@@ -29,14 +32,24 @@ ICONPATH = BASEPATH / "resource" / "icons"
 
 """"自定义类"""
 class FrameFinderThread(QThread):
+    """查找各目标视频中与基准视频指定帧最相似的帧
+
+    每个目标视频在线程池中并行处理, 只顺序解码一次并计算帧签名(结果按路径+修改时间缓存), 再由粗到精匹配
+    """
     result_ready = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, baseline_video_path, target_video_paths, frame_num):
+    def __init__(self, baseline_video_path, target_video_paths, frame_num, max_workers=None):
         super().__init__()
         self.baseline_video_path = baseline_video_path
         self.target_video_paths = target_video_paths
         self.frame_num = frame_num
+        self.max_workers = max_workers or max(1, min(len(target_video_paths), (os.cpu_count() or 2) - 1))
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        """中断查找"""
+        self.stop_event.set()
 
     def run(self):
         try:
@@ -48,138 +61,200 @@ class FrameFinderThread(QThread):
 
             # 获取基准视频的总帧数
             total_frames = int(baseline_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            baseline_cap.release()
             if self.frame_num >= total_frames:
                 self.error_occurred.emit(f"指定的帧数 {self.frame_num} 超出视频总帧数 {total_frames}")
-                baseline_cap.release()
                 return
 
-            # 读取基准视频的目标帧
-            baseline_frame = self.safe_read_frame(baseline_cap, self.frame_num)
-            if baseline_frame is None:
+            # 读取基准视频目标帧的签名
+            baseline_signature = read_frame_signature(self.baseline_video_path, self.frame_num)
+            if baseline_signature is None:
                 self.error_occurred.emit(f"无法读取基准视频的帧 {self.frame_num} 帧")
-                baseline_cap.release()
                 return
 
-            # 转换为灰度图，提取特征
-            baseline_gray = cv2.cvtColor(baseline_frame, cv2.COLOR_BGR2GRAY)
-            baseline_cap.release()
-
-            # 为每个目标视频找到最佳匹配帧
+            # 为每个目标视频并行查找最佳匹配帧, 跳过基准视频自身
+            target_paths = [path for path in self.target_video_paths if path != self.baseline_video_path]
             best_frame_indices = {}
-            for target_path in self.target_video_paths:
-                try:
-                    # 跳过基准视频自身
-                    if target_path == self.baseline_video_path:
-                        continue
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.find_best_match, path, baseline_signature): path for path in target_paths}
+                for future in as_completed(futures):
+                    target_path = futures[future]
+                    try:
+                        best_match_index, best_match_score = future.result()
+                        if best_match_index != -1:
+                            best_frame_indices[target_path] = best_match_index
+                    except Exception as e:
+                        print(f"处理视频 {target_path} 时出错: {str(e)}")
 
-                    # 打开目标视频
-                    target_cap = cv2.VideoCapture(target_path)
-                    if not target_cap.isOpened():
-                        print(f"无法打开目标视频: {target_path}")
-                        continue
+            if not self.stop_event.is_set():
+                self.result_ready.emit(best_frame_indices)
 
-                    total_frames = int(target_cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    best_match_index, best_match_score = self.find_best_match(
-                        target_cap, baseline_gray, total_frames
-                    )
+        except Exception as e:
+            self.error_occurred.emit(str(e))
 
-                    target_cap.release()
+    def find_best_match(self, target_path, baseline_signature):
+        """在目标视频中查找与基准帧最相似的帧, 返回(帧号, 平均绝对差异), 失败时帧号为-1"""
+        signatures = compute_video_signatures(target_path, self.stop_event)
+        if signatures is None:
+            return -1, float("inf")
+        return match_frame(signatures, baseline_signature)
+
+def scale_frame(frame, params):
+    """按显示参数旋转并缩放原始BGR帧, 先缩放再旋转, 避免旋转整帧
+
+    Args:
+        frame: 原始BGR帧
+        params: 显示参数(标签宽, 标签高, 缩放因子, 平移x, 平移y, 旋转角度)
+    """
+    label_w, label_h, scale_factor, _, _, angle = params
+    frame_h, frame_w = frame.shape[:2]
+    rotated = angle in (90, 270)
+    view_w, view_h = (frame_h, frame_w) if rotated else (frame_w, frame_h)
+    current_scale = min(label_w / view_w, label_h / view_h) * scale_factor
+    scaled_w = max(1, int(view_w * current_scale))
+    scaled_h = max(1, int(view_h * current_scale))
+    size = (scaled_h, scaled_w) if rotated else (scaled_w, scaled_h)
+
+    # 性能优化：选择最佳的插值方法, 大幅缩小时分两步区域插值
+    if current_scale < 0.25:
+        frame = cv2.resize(frame, (max(1, frame_w // 2), max(1, frame_h // 2)), interpolation=cv2.INTER_AREA)
+        interpolation = cv2.INTER_AREA
+    elif current_scale < 0.5:
+        interpolation = cv2.INTER_AREA
+    elif current_scale > 2.0:
+        interpolation = cv2.INTER_LINEAR
+    else:
+        interpolation = cv2.INTER_CUBIC
+    scaled = cv2.resize(frame, size, interpolation=interpolation)
+
+    if angle == 90:
+        return cv2.rotate(scaled, cv2.ROTATE_90_CLOCKWISE)
+    elif angle == 180:
+        return cv2.rotate(scaled, cv2.ROTATE_180)
+    elif angle == 270:
+        return cv2.rotate(scaled, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return scaled
+
+
+def place_frame(scaled, params, out=None):
+    """将缩放后的帧按平移偏移裁切并居中放入标签大小的BGR缓冲区, out尺寸匹配时复用, 否则重新分配"""
+    label_w, label_h, scale_factor, pan_x, pan_y, _ = params
+    if out is None or out.shape[:2] != (label_h, label_w):
+        out = np.zeros((label_h, label_w, 3), dtype=np.uint8)
+    else:
+        out.fill(0)
+
+    scaled_h, scaled_w = scaled.shape[:2]
+    start_x = start_y = 0
+    if scale_factor > 1.0:  # 仅当放大时才应用平移
+        # 中心对齐 + 用户拖动偏移, 并确保裁切区域不超出缩放后图像的边界
+        start_x = min(int(max(0, max(0, (scaled_w - label_w) // 2) - pan_x)), max(0, scaled_w - label_w))
+        start_y = min(int(max(0, max(0, (scaled_h - label_h) // 2) - pan_y)), max(0, scaled_h - label_h))
+    available_w = min(label_w, scaled_w - start_x)
+    available_h = min(label_h, scaled_h - start_y)
+    if available_w > 0 and available_h > 0:
+        paste_x = (label_w - available_w) // 2
+        paste_y = (label_h - available_h) // 2
+        out[paste_y:paste_y + available_h, paste_x:paste_x + available_w] = \
+            scaled[start_y:start_y + available_h, start_x:start_x + available_w]
+    return out
+
+
+class PlaybackClock:
+    """多视频播放的主时钟, 所有帧读取器按同一时钟调度解码和发送
+
+    时钟时间(毫秒)按播放速度随真实时间推进, 暂停时冻结; 各帧读取器的第k帧在时钟时间(k - 帧偏移) * 每帧时长时到期,
+    帧偏移为整数帧, 相同帧率的视频到期时间落在同一网格上(帧级同步), 不同帧率的视频按时间戳对齐
+    """
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.paused = False
+        self._anchor_ms = 0.0                  # 锚点处的时钟时间
+        self._anchor_wall = time.perf_counter()  # 锚点处的真实时间
+        self._cond = threading.Condition()
 
-                    if best_match_index != -1:
-                        best_frame_indices[target_path] = best_match_index
-                except Exception as e:
-                    print(f"处理视频 {target_path} 时出错: {str(e)}")
-                    continue
+    def now_ms(self):
+        """当前时钟时间(毫秒)"""
+        with self._cond:
+            if self.paused:
+                return self._anchor_ms
+            return self._anchor_ms + (time.perf_counter() - self._anchor_wall) * 1000 * self.speed
 
-            self.result_ready.emit(best_frame_indices)
+    def _reanchor(self):
+        self._anchor_ms = self.now_ms()
+        self._anchor_wall = time.perf_counter()
 
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+    def set_speed(self, speed):
+        with self._cond:
+            self._reanchor()
+            self.speed = speed
+            self._cond.notify_all()
 
-    def safe_read_frame(self, cap, frame_index):
-        """安全读取指定帧，使用多种方法尝试"""
-        try:
-            # 方法1：使用set() + read()
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
-            ret, frame = cap.read()
-            if ret:
-                return frame
-                
-            # 方法2：重新打开视频，逐帧读取
-            cap.release()
-            cap = cv2.VideoCapture(self.baseline_video_path)
-            current_frame = 0
-            while current_frame < frame_index:
-                ret, _ = cap.read()
-                if not ret:
-                    return None
-                current_frame += 1
-            
-            ret, frame = cap.read()
-            return frame if ret else None
-            
-        except Exception as e:
-            print(f"安全读取帧失败: {str(e)}")
-            return None
+    def pause(self):
+        with self._cond:
+            self._reanchor()
+            self.paused = True
+            self._cond.notify_all()
 
-    def find_best_match(self, cap, baseline_gray, total_frames):
-        """在目标视频中查找与基准帧最相似的帧"""
-        best_score = float("inf")  # 较小的差异值表示更好的匹配
-        best_index = -1
-        
-        # 逐帧采样策略，避免处理过多帧
-        sample_step = max(1, total_frames // 100)  # 最多采样100帧
-        
-        for i in range(0, total_frames, sample_step):
-            try:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                ret, frame = cap.read()
-                if not ret:
-                    continue
-                
-                # 转换为灰度并计算差异
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                
-                # 确保尺寸匹配
-                if gray.shape != baseline_gray.shape:
-                    gray = cv2.resize(
-                        gray, (baseline_gray.shape[1], baseline_gray.shape[0])
-                    )
+    def resume(self):
+        with self._cond:
+            self._anchor_wall = time.perf_counter()
+            self.paused = False
+            self._cond.notify_all()
+
+    def frozen(self):
+        """上下文管理器: 暂停时钟, 退出时恢复原来的状态; 用于批量定位多个视频, 保证它们以同一时钟时间重新对齐"""
+        clock = self
+
+        class _Frozen:
+            def __enter__(self):
+                self.was_paused = clock.paused
+                clock.pause()
+
+            def __exit__(self, *args):
+                if not self.was_paused:
+                    clock.resume()
+
+        return _Frozen()
+
+    def wait(self, timeout):
+        """等待时钟状态变化或超时(秒)"""
+        with self._cond:
+            self._cond.wait(timeout)
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
 
-                # 使用平均绝对差异(MAD)来比较相似度
-                diff = cv2.absdiff(gray, baseline_gray)
-                score = np.mean(diff)
-                
-                if score < best_score:
-                    best_score = score
-                    best_index = i
-                    
-            except Exception as e:
-                print(f"比较帧 {i} 时出错: {str(e)}")
-                continue
-                
-        return best_index, best_score
 
 class FrameReader(QThread):
-    frame_ready = pyqtSignal(int, object, int)  # 添加信号: 帧号, 帧数据, 时间戳
+    frame_ready = pyqtSignal(int, object, int, object)  # 添加信号: 帧号, 原始帧, 时间戳, 缩放到标签大小的BGR显示帧(可能为None)
     
-    def __init__(self, video_path, max_queue_size=30):
+    def __init__(self, video_path, max_queue_size=30, clock=None):
         super().__init__()
         self.video_path = video_path
         self.max_queue_size = max_queue_size
         self.running = True
         self.paused = False
         self.lock = threading.Lock()
-        self.last_emit_time = time.time()  # 添加上次发射信号的时间
         self.playback_speed = 1.0  # 添加播放速度变量
-        
-        # 性能优化：添加帧跳过机制
-        self.frame_skip_count = 0
-        self.adaptive_skip = False
-        
-        # 性能优化：缓冲区管理
-        self.frame_buffer_size = 3  # 减少缓冲区大小
-        self.last_decode_time = 0
+
+        # 主时钟, 多视频播放时由VideoWall共享; 帧偏移为整数帧, 定位/暂停时重新计算
+        self.clock = clock if clock is not None else PlaybackClock()
+        self.clock_offset_frames = 0
+        self.paused_at_ms = 0.0
+
+        # 背压: 已发送但播放器尚未显示的帧数达到上限时不再解码新帧
+        self.max_pending_frames = 2
+        self.pending_frames = 0
+        self.pending_lock = threading.Lock()  # seek在主线程中发送信号时会直接调用frame_consumed, 不能使用self.lock
+
+        # 显示参数由播放器设置, 旋转/缩放/平移在读取线程中完成, 结果写入轮换复用的显示缓冲区;
+        # 已发送未显示的帧不超过max_pending_frames, 缓冲区数量多留两个, 保证被复用的缓冲区已经显示完毕
+        self.display_params = None
+        self.display_buffers = [None] * (self.max_pending_frames + 2)
+        self.display_buffer_index = 0
+        self.dropped_frames = 0  # 落后主时钟超过一帧而跳过的帧数
 
         # 尝试不同的后端打开视频
         self.cap = None
@@ -196,6 +271,7 @@ class FrameReader(QThread):
         self.fps = self.cap.get(cv2.CAP_PROP_FPS)
         self.frame_time = 1000 / self.fps if self.fps > 0 else 33.33
         print(f"视频帧率: {self.fps}, 每帧时长: {self.frame_time}ms")
+        self.anchor_to_clock()
         
         # 预读一帧确认格式
         ret, test_frame = self.cap.read()
@@ -238,74 +314,88 @@ class FrameReader(QThread):
             self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
     def set_playback_speed(self, speed):
-        """设置播放速度"""
+        """设置播放速度, 作用于主时钟"""
         self.playback_speed = speed
+        if self.clock.speed != speed:
+            self.clock.set_speed(speed)
         print(f"帧读取器播放速度设置为: {speed}")
+
+    def due_ms(self, frame_index):
+        """第frame_index帧(从0开始)在主时钟上的到期时间(毫秒)"""
+        return (frame_index - self.clock_offset_frames) * self.frame_time
+
+    def anchor_to_clock(self):
+        """以当前位置重新对齐主时钟: 下一帧在时钟的下一个帧网格处到期"""
+        now_ms = self.clock.now_ms()
+        self.clock_offset_frames = self.current_frame_number - int(np.ceil(now_ms / self.frame_time))
+        self.paused_at_ms = now_ms  # 暂停期间重新对齐后, 恢复时无需再顺延
+        self.clock.notify()
+
+    def frame_consumed(self):
+        """播放器显示(或丢弃)了一帧"""
+        with self.pending_lock:
+            self.pending_frames = max(0, self.pending_frames - 1)
+
+    def set_display_params(self, params):
+        """设置显示参数(标签宽, 标签高, 缩放因子, 平移x, 平移y, 旋转角度)"""
+        self.display_params = params
+
+    def compose_display_frame(self, frame):
+        """在读取线程中将原始帧缩放到标签大小, 写入下一个显示缓冲区; 尚未设置显示参数时返回None"""
+        if (params := self.display_params) is None or params[0] <= 0 or params[1] <= 0:
+            return None
+        index = self.display_buffer_index = (self.display_buffer_index + 1) % len(self.display_buffers)
+        self.display_buffers[index] = place_frame(scale_frame(frame, params), params, self.display_buffers[index])
+        return self.display_buffers[index]
+
+    def _emit_frame(self, frame):
+        display = self.compose_display_frame(frame)
+        with self.pending_lock:
+            self.pending_frames += 1
+        self.frame_ready.emit(self.current_frame_number, frame, self.current_time_ms, display)
     
     def run(self):
         while self.running:
-            if self.paused:
-                time.sleep(0.016)  # 暂停时降低CPU使用，约60fps检查频率
+            if self.paused or self.clock.paused:
+                self.clock.wait(0.016)  # 暂停时降低CPU使用，约60fps检查频率
                 continue
-            
-            # 控制帧发送频率，根据视频帧率和播放速度调整
-            current_time = time.time()
-            elapsed = current_time - self.last_emit_time
-            target_frame_time = (
-                (1.0 / self.fps) / self.playback_speed
-                if self.fps > 0
-                else 0.033 / self.playback_speed
-            )  # 秒
-
-            if elapsed < target_frame_time:
-                # 性能优化：更精确的睡眠时间控制，支持极低速度
-                sleep_time = target_frame_time - elapsed
-                if sleep_time > 0.001:  # 只有当睡眠时间大于1ms时才睡眠
-                    # 对于极低速度，限制最大睡眠时间避免界面卡死
-                    max_sleep = 0.1 if self.playback_speed >= 0.1 else 0.5  # 低速时允许更长睡眠
-                    time.sleep(min(sleep_time, max_sleep))
+
+            # 按主时钟调度: 下一帧(索引为current_frame_number)未到期时等待, 超时上限避免停止时卡住
+            with self.lock:
+                due_ms = self.due_ms(self.current_frame_number)
+                behind_ms = self.clock.now_ms() - due_ms
+            backlog = self.pending_frames >= self.max_pending_frames
+            if behind_ms < 0:
+                self.clock.wait(min(-behind_ms / 1000 / max(self.clock.speed, 0.01), 0.05))
+                continue
+            if backlog and behind_ms < self.frame_time:
+                # 背压: 播放器还没有显示完已发送的帧, 暂不解码, 等待显示或者该帧过期
+                self.clock.wait(0.002)
                 continue
 
-            # 性能优化：检测解码性能，自适应跳帧
-            decode_start = time.time()
-            
             with self.lock:
-                ret, frame = self.cap.read()
-                
-                decode_time = time.time() - decode_start
-                
+                if behind_ms >= self.frame_time:
+                    # 落后主时钟超过一帧: 只grab不retrieve, 跳过颜色转换和发送, 以追上时钟
+                    ret = self.cap.grab()
+                    frame = None
+                else:
+                    ret, frame = self.cap.read()
+
                 if ret:
-                    self.current_frame_number = int(
-                        self.cap.get(cv2.CAP_PROP_POS_FRAMES)
-                    )
+                    self.current_frame_number = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
                     self.current_time_ms = int(self.cap.get(cv2.CAP_PROP_POS_MSEC))
-
-                    # 性能优化：如果解码时间过长，启用自适应跳帧
-                    if decode_time > target_frame_time * 1.5:
-                        self.adaptive_skip = True
-                        self.frame_skip_count += 1
-                        if self.frame_skip_count < 3:  # 最多连续跳3帧
-                            continue
-                        else:
-                            self.frame_skip_count = 0
+                    if frame is None:
+                        self.dropped_frames += 1
                     else:
-                        self.adaptive_skip = False
-                        self.frame_skip_count = 0
-
-                    # 记录发送时间
-                    self.last_emit_time = time.time()
-
-                    # 性能优化：避免不必要的帧拷贝，直接传递引用
-                    self.frame_ready.emit(
-                        self.current_frame_number, frame, self.current_time_ms
-                    )
+                        # 性能优化：避免不必要的帧拷贝，直接传递引用
+                        self._emit_frame(frame)
                 else:
                     # 视频结束时重置到开始
                     print(f"视频 {self.video_path} 播放完毕，重置到开始")
                     self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     self.current_time_ms = 0
                     self.current_frame_number = 0
-                    time.sleep(0.1)  # 减少延迟时间
+                    self.anchor_to_clock()
 
     def seek(self, frame_number):
         with self.lock:
@@ -323,11 +413,12 @@ class FrameReader(QThread):
                     self.current_time_ms = int(self.cap.get(cv2.CAP_PROP_POS_MSEC))
                     
                     # 将帧发送给播放器
-                    self.frame_ready.emit(self.current_frame_number, frame, self.current_time_ms)
+                    self._emit_frame(frame)
                 else:
                     # 如果读取失败，尝试重新定位
                     print(f"Seek到帧 {frame_number} 失败，尝试重新定位")
                     self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                self.anchor_to_clock()
 
     def seek_time(self, time_ms):
         """按时间戳定位视频位置"""
@@ -336,20 +427,113 @@ class FrameReader(QThread):
                 self.cap.set(cv2.CAP_PROP_POS_MSEC, time_ms)
                 self.current_time_ms = time_ms
                 self.current_frame_number = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+                self.anchor_to_clock()
             
     def pause(self):
+        if not self.paused:
+            self.paused_at_ms = self.clock.now_ms()
         self.paused = True
         
     def resume(self):
+        """恢复播放, 帧偏移按暂停期间时钟走过的整数帧数顺延, 保持与其他视频的帧网格一致"""
+        if self.paused:
+            with self.lock:
+                self.clock_offset_frames -= int(round((self.clock.now_ms() - self.paused_at_ms) / self.frame_time))
         self.paused = False
+        self.clock.notify()
         
     def stop(self):
         self.running = False
+        self.clock.notify()
         self.wait()
         if self.cap:
             self.cap.release()
 
 
+class FrameRingBuffer:
+    """已解码帧的环形缓冲区, 以帧号为键, 按字节数限制容量, 超过上限时淘汰最早写入的帧(O(1))
+
+    播放时由on_frame_ready写入, 暂停时由FramePredecoder在后台写入当前帧前后的帧, 逐帧前进/后退优先从这里读取
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()   # {帧号: 帧数据}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, frame_number):
+        with self._lock:
+            return self._frames.get(frame_number)
+
+    def __contains__(self, frame_number):
+        with self._lock:
+            return frame_number in self._frames
+
+    def put(self, frame_number, frame):
+        with self._lock:
+            if (old := self._frames.pop(frame_number, None)) is not None:
+                self._total_bytes -= old.nbytes
+            self._frames[frame_number] = frame
+            self._total_bytes += frame.nbytes
+            self._evict()
+
+    def capacity(self, frame_bytes):
+        """按单帧字节数估算缓冲区能容纳的帧数"""
+        return max(1, self.max_bytes // max(1, frame_bytes))
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._frames) > 1:
+            _, frame = self._frames.popitem(last=False)
+            self._total_bytes -= frame.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._total_bytes = 0
+
+
+class FramePredecoder(QRunnable):
+    """暂停时在后台预解码指定帧号区间(GOP)并写入帧环形缓冲区, 使用独立的VideoCapture, 不影响帧读取线程"""
+    def __init__(self, video_path, ring, first_frame, last_frame):
+        super().__init__()
+        self.video_path = video_path
+        self.ring = ring
+        self.first_frame = first_frame     # 帧号与FrameReader一致, 即读取后CAP_PROP_POS_FRAMES的值
+        self.last_frame = last_frame
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if not cap.isOpened():
+                return
+            # 只seek一次到区间起点, 之后顺序解码
+            cap.set(cv2.CAP_PROP_POS_FRAMES, max(0, self.first_frame - 1))
+            while not self.cancelled:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_number = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+                if frame_number > self.last_frame:
+                    break
+                if frame_number not in self.ring:
+                    self.ring.put(frame_number, frame)
+        except Exception as e:
+            print(f"[FramePredecoder]-->预解码视频帧失败: {e}")
+        finally:
+            cap.release()
+            self.done = True
+
+
 class VideoPlayer(QWidget):
     def __init__(self, video_path, parent=None):
         super().__init__(parent)
@@ -362,7 +546,7 @@ class VideoPlayer(QWidget):
         
         try:
             # 初始化帧读取线程，使用信号槽代替队列
-            self.frame_reader = FrameReader(video_path)
+            self.frame_reader = FrameReader(video_path, clock=getattr(parent, "clock", None))
             self.frame_reader.frame_ready.connect(self.on_frame_ready)
             
             # 临时打开视频获取基本信息(总帧数、帧率、尺寸、时长)并检测旋转
@@ -406,7 +590,6 @@ class VideoPlayer(QWidget):
             self.scale_factor = 1.0
             # 性能优化：多级缓存系统
             self.scaled_frame_cache = None
-            self.last_scale_factor = 1.0
             self.last_frame_hash = None  # 用于检测帧是否变化
             # 控制缩放质量的阈值
             self.high_quality_threshold = 2.0
@@ -414,9 +597,9 @@ class VideoPlayer(QWidget):
             self.last_scale_time = 0
             self.scale_throttle_ms = 50  # 减少缩放操作间隔
             
-            # 性能优化：预计算的缩放参数
-            self.cached_scale_params = {}
             self.frame_size_cache = None
+            # GUI线程重绘(暂停、缩放、平移、旋转)使用的显示缓冲区
+            self.display_buffer = None
 
             # 添加缓冲最新帧
             self.latest_frame = None
@@ -425,10 +608,18 @@ class VideoPlayer(QWidget):
             
             # 标记是否处于循环播放的过渡期
             self.is_looping = False
+
+            # 显示时已落后主时钟超过一帧的帧数, 与帧读取器的丢帧数一起显示在信息标签上
+            self.late_frames = 0
             
-            # 添加帧缓存机制，用于逐帧操作
-            self.frame_cache = {}
-            self.max_cache_size = 10  # 最多缓存10帧
+            # 添加帧缓存机制，用于逐帧操作; 按内存预算限制容量, 由VideoWall按播放器数量分配
+            self.frame_cache = FrameRingBuffer()
+            self.frame_predecoder = None
+            # 预解码使用独立线程池: Qt的大图格式转换会占用全局线程池, 共用时GUI线程可能等待被预解码占满的全局线程池
+            self.predecode_pool = QThreadPool(self)
+            self.predecode_pool.setMaxThreadCount(1)
+            self.reader_out_of_sync = False     # 帧读取器位置是否落后于当前显示的帧
+            self.predecode_forward_ratio = 0.25  # 预解码区间中当前帧之后的帧所占比例
 
             # 添加平移相关属性
             self.is_panning = False
@@ -467,11 +658,12 @@ class VideoPlayer(QWidget):
         ms = int((total_seconds - int(total_seconds)) * 1000)
         return f"{minutes:02d}:{seconds:02d}.{ms:03d}"
 
-    def on_frame_ready(self, frame_number, frame, time_ms):
-        """当帧准备好时，显示它并更新状态"""
+    def on_frame_ready(self, frame_number, frame, time_ms, display=None):
+        """当帧准备好时，显示它并更新状态; display为读取线程中已缩放好的显示帧, GUI线程只需绘制"""
         try:
             if frame is None:
                 return
+            self.frame_reader.frame_consumed()
 
             # 性能监控开始
             process_start = time.time()
@@ -493,6 +685,11 @@ class VideoPlayer(QWidget):
             self.current_frame = frame_number
             self.current_time = time_ms
 
+            # 播放时统计显示晚于主时钟一帧以上的帧
+            reader = self.frame_reader
+            if not self.is_paused and reader.clock.now_ms() - reader.due_ms(frame_number - 1) > reader.frame_time:
+                self.late_frames += 1
+
             # 性能优化：自适应UI更新频率
             update_ui = (frame_number % 3 == 0) if self.performance_monitor['adaptive_quality'] else (frame_number % 2 == 0)
             
@@ -501,28 +698,19 @@ class VideoPlayer(QWidget):
                     progress = (time_ms / self.duration_ms) * 100
                     self.slider.setValue(int(progress))
 
-            # 应用旋转（性能优化：只在需要时旋转）
-            processed_frame = frame
-            if self.rotation_angle != 0:
-                processed_frame = self.rotate_image(frame, self.rotation_angle)
-
-            # 性能优化：只有当帧真正变化时才清除缓存
-            # 旋转后帧尺寸可能变化，需要清除缓存
-            if self.scaled_frame_cache is not None:
-                self.scaled_frame_cache = None
-            
-            # 显示帧
+            # 显示帧: 读取线程按当前显示参数缩放好的帧直接绘制, 参数已变化(如窗口缩放)时在GUI线程重新缩放
             display_start = time.time()
-            self.display_frame(processed_frame)
+            params = self.display_params()
+            if display is not None and display.shape[:2] == (params[1], params[0]):
+                self.blit(display)
+            else:
+                self.display_frame(frame)
             display_time = time.time() - display_start
 
             # 性能优化：自适应信息更新
             info_update_freq = 5 if self.performance_monitor['adaptive_quality'] else 3
             if frame_number % info_update_freq == 0:
-                current_time_str = self.format_time(time_ms)
-                total_time_str = self.format_time(self.duration_ms)
-                info_text = f"帧: {frame_number}/{self.total_frames} 时间: {current_time_str}/{total_time_str}"
-                self.info_label.setText(info_text)
+                self.info_label.setText(self.info_text(frame_number, time_ms))
 
             # 性能监控
             process_time = time.time() - process_start
@@ -564,8 +752,12 @@ class VideoPlayer(QWidget):
     def cleanup(self):
         """清理资源"""
         self.is_cleaning_up = True  # 设置清理标志
+        if getattr(self, "frame_predecoder", None) is not None:
+            self.frame_predecoder.cancel()
         if hasattr(self, "frame_reader"):
             self.frame_reader.stop()
+        if hasattr(self, "frame_finder_thread"):
+            self.frame_finder_thread.stop()
         if hasattr(self, "frame_cache"):
             self.clear_frame_cache()
 
@@ -834,178 +1026,68 @@ class VideoPlayer(QWidget):
     def update_ui(self):
         """确保UI定期更新，即使没有新帧到达"""
         # 更新帧数和时间信息
-        current_frame = self.current_frame
-        total_frames = self.total_frames
-        
-        current_time_ms = self.current_time
-        total_time_ms = self.duration_ms
-        
-        # 格式化时间
-        current_time_str = self.format_time(current_time_ms)
-        total_time_str = self.format_time(total_time_ms)
-        
-        # 更新信息标签
-        info_text = f"帧: {current_frame}/{total_frames} 时间: {current_time_str}/{total_time_str}"
-        self.info_label.setText(info_text)
+        self.info_label.setText(self.info_text(self.current_frame, self.current_time))
+
+    def frame_stats(self):
+        """获取丢帧/延迟帧统计: (帧读取器跳过的帧数, 显示时落后主时钟的帧数)"""
+        return self.frame_reader.dropped_frames, self.late_frames
+
+    def info_text(self, frame_number, time_ms):
+        """生成信息标签文本: 帧数、时间以及丢帧/延迟帧统计"""
+        current_time_str = self.format_time(time_ms)
+        total_time_str = self.format_time(self.duration_ms)
+        dropped, late = self.frame_stats()
+        return (f"帧: {frame_number}/{self.total_frames} 时间: {current_time_str}/{total_time_str} "
+                f"丢帧: {dropped} 延迟: {late}")
+
+    def display_params(self):
+        """当前显示参数(标签宽, 标签高, 缩放因子, 平移x, 平移y, 旋转角度), 同步给帧读取器"""
+        if self.scale_factor <= 1.0:
+            # 如果没有放大，或者缩小了，则居中显示
+            self.pan_offset = np.array([0, 0])
+        params = (self.video_label.width(), self.video_label.height(), self.scale_factor,
+                  int(self.pan_offset[0]), int(self.pan_offset[1]), self.rotation_angle)
+        if hasattr(self, "frame_reader"):
+            self.frame_reader.set_display_params(params)
+        return params
+
+    def blit(self, display):
+        """将标签大小的BGR显示帧直接包装为QImage并绘制, 不做颜色转换"""
+        height, width = display.shape[:2]
+        q_img = QImage(display.data, width, height, display.strides[0], QImage.Format_BGR888)
+        self.video_label.setPixmap(QPixmap.fromImage(q_img))
 
     def display_frame(self, frame):
+        """在GUI线程中旋转、缩放并显示原始帧, 用于暂停时的逐帧、缩放、平移、旋转等重绘"""
         if frame is None:
             return
             
         try:
-            # 获取视频标签的当前大小
-            label_w = self.video_label.width()
-            label_h = self.video_label.height()
-            
-            # 修复旋转问题：使用当前帧的实际尺寸而不是缓存
-            frame_h_orig, frame_w_orig = frame.shape[:2]
-            
-            # 性能优化：缓存缩放参数，但要考虑旋转角度
-            scale_key = (label_w, label_h, self.scale_factor, self.rotation_angle)
-            if scale_key not in self.cached_scale_params:
-                base_scale = min(label_w / frame_w_orig, label_h / frame_h_orig)
-                current_scale = base_scale * self.scale_factor
-                scaled_w = max(1, int(frame_w_orig * current_scale))
-                scaled_h = max(1, int(frame_h_orig * current_scale))
-                self.cached_scale_params[scale_key] = (current_scale, scaled_w, scaled_h)
-            
-            current_scale, scaled_w, scaled_h = self.cached_scale_params[scale_key]
-
-            # 检查是否需要重新缩放
-            needs_rescale = (self.scaled_frame_cache is None or 
-                            abs(self.last_scale_factor - self.scale_factor) > 0.01)
-            
-            if needs_rescale:
-                # 记录当前使用的缩放因子
-                self.last_scale_factor = self.scale_factor
-                
-                # 性能优化：选择最佳的插值方法
-                if current_scale > 2.0:
-                    # 大幅放大时使用双线性插值
-                    interpolation = cv2.INTER_LINEAR
-                elif current_scale < 0.5:
-                    # 大幅缩小时使用区域插值
-                    interpolation = cv2.INTER_AREA
-                else:
-                    # 中等缩放使用立方插值
-                    interpolation = cv2.INTER_CUBIC
-                
-                # 性能优化：对于大幅缩放，使用分步缩放
-                if current_scale < 0.25:
-                    # 分两步缩放，先缩放到0.5，再缩放到目标大小
-                    intermediate_w = max(1, int(frame_w_orig * 0.5))
-                    intermediate_h = max(1, int(frame_h_orig * 0.5))
-                    intermediate = cv2.resize(
-                        frame, (intermediate_w, intermediate_h), 
-                        interpolation=cv2.INTER_AREA
-                    )
-                    self.scaled_frame_cache = cv2.resize(
-                        intermediate, (scaled_w, scaled_h),
-                        interpolation=cv2.INTER_AREA
-                    )
-                else:
-                    self.scaled_frame_cache = cv2.resize(
-                        frame, (scaled_w, scaled_h),
-                        interpolation=interpolation
-                    )
-            
-            # 使用缓存的缩放帧
-            current_scaled_frame = self.scaled_frame_cache
-            scaled_h, scaled_w = current_scaled_frame.shape[:2]
-
-            # 应用平移
-            display_frame = current_scaled_frame
-            if self.scale_factor > 1.0: # 仅当放大时才应用平移
-                # 创建一个和标签一样大的黑色背景
-                output_frame = np.zeros((label_h, label_w, 3), dtype=np.uint8)
-                
-                # 计算实际用于裁切的偏移量 (中心对齐 + 用户拖动偏移)
-                center_offset_x = max(0, (scaled_w - label_w) // 2)
-                center_offset_y = max(0, (scaled_h - label_h) // 2)
-
-                # 实际裁切的起点，考虑用户拖动
-                start_x = int(max(0, center_offset_x - self.pan_offset[0]))
-                start_y = int(max(0, center_offset_y - self.pan_offset[1]))
+            params = self.display_params()
+            if params[0] <= 0 or params[1] <= 0:
+                return
 
-                # 确保裁切区域不超出缩放后图像的边界
-                start_x = min(start_x, max(0, scaled_w - label_w))
-                start_y = min(start_y, max(0, scaled_h - label_h))
-                
-                # 计算实际可用的宽度和高度
-                available_w = min(label_w, scaled_w - start_x)
-                available_h = min(label_h, scaled_h - start_y)
-                
-                if available_w > 0 and available_h > 0:
-                    # 从缩放后的图像中裁切出要显示的部分
-                    cropped = current_scaled_frame[start_y:start_y+available_h, start_x:start_x+available_w]
-                    
-                    # 计算在输出帧中的位置（居中）
-                    paste_x = (label_w - available_w) // 2
-                    paste_y = (label_h - available_h) // 2
-                    
-                    # 将裁切的部分粘贴到输出帧上
-                    output_frame[paste_y:paste_y+available_h, paste_x:paste_x+available_w] = cropped
-                
-                display_frame = output_frame
-            else:
-                # 如果没有放大，或者缩小了，则居中显示
-                self.pan_offset = np.array([0,0])
-                
-                # 创建一个和标签一样大的黑色背景
-                output_frame = np.zeros((label_h, label_w, 3), dtype=np.uint8)
-                
-                # 计算粘贴位置，使其居中
-                paste_x = max(0, (label_w - scaled_w) // 2)
-                paste_y = max(0, (label_h - scaled_h) // 2)
-                
-                # 确保不会越界
-                paste_w = min(scaled_w, label_w - paste_x)
-                paste_h = min(scaled_h, label_h - paste_y)
-                
-                if paste_w > 0 and paste_h > 0:
-                    output_frame[paste_y:paste_y+paste_h, paste_x:paste_x+paste_w] = \
-                        current_scaled_frame[0:paste_h, 0:paste_w]
-                
-                display_frame = output_frame
-
-            # 性能优化：使用更高效的图像格式转换
-            if len(display_frame.shape) == 3:
-                # 检查是否已经是RGB格式
-                if display_frame.shape[2] == 3:
-                    # BGR to RGB 转换
-                    rgb_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-                else:
-                    rgb_frame = display_frame
-                    
-                height, width, channel = rgb_frame.shape
-                bytes_per_line = 3 * width
-                
-                # 性能优化：确保数据连续性
-                if not rgb_frame.flags['C_CONTIGUOUS']:
-                    rgb_frame = np.ascontiguousarray(rgb_frame)
-                
-                q_img = QImage(
-                    rgb_frame.data, width, height, bytes_per_line, QImage.Format_RGB888
-                )
+            # 平移时只有偏移变化, 复用上次缩放的结果
+            scale_key = (params[0], params[1], params[2], params[5])
+            cache = self.scaled_frame_cache
+            if cache is not None and cache[0] is frame and cache[1] == scale_key:
+                scaled = cache[2]
             else:
-                height, width = display_frame.shape
-                
-                # 性能优化：确保数据连续性
-                if not display_frame.flags['C_CONTIGUOUS']:
-                    display_frame = np.ascontiguousarray(display_frame)
-                    
-                q_img = QImage(
-                    display_frame.data, width, height, width, QImage.Format_Grayscale8
-                )
+                scaled = scale_frame(frame, params)
+                self.scaled_frame_cache = (frame, scale_key, scaled)
 
-            pixmap = QPixmap.fromImage(q_img)
-            self.video_label.setPixmap(pixmap)
+            self.display_buffer = place_frame(scaled, params, self.display_buffer)
+            self.blit(self.display_buffer)
         except Exception as e:
             print(f"显示帧时出错: {str(e)}")
 
     def play_pause(self):
         if self.is_paused:
             self.is_paused = False
+            # 逐帧操作命中帧缓存时帧读取器的位置没有变化, 恢复播放前先定位到当前帧
+            if self.reader_out_of_sync:
+                self.reader_out_of_sync = False
+                self.frame_reader.seek(max(0, self.current_frame - 1))
             self.frame_reader.resume()
             self.last_update_time = time.time()  # 重置时间基准
             play_icon_path = (ICONPATH / "play.ico").as_posix()
@@ -1015,6 +1097,8 @@ class VideoPlayer(QWidget):
             self.frame_reader.pause()
             pause_icon_path = (ICONPATH / "pause.ico").as_posix()
             self.play_button.setIcon(QIcon(pause_icon_path))
+            # 暂停时后台预解码当前帧前后的帧, 逐帧操作不再经过解码器
+            self.predecode_around(self.current_frame)
 
     def replay(self):
         self.current_time = 0
@@ -1033,6 +1117,16 @@ class VideoPlayer(QWidget):
         # 将播放速度传递给帧读取器
         if hasattr(self, "frame_reader"):
             self.frame_reader.set_playback_speed(value)
+
+        # 多视频共享主时钟, 速度对所有视频生效, 同步其他播放器的速度显示
+        if hasattr(self.video_wall, "players"):
+            for player in self.video_wall.players:
+                if player is not self and player.playback_speed != value:
+                    player.playback_speed = value
+                    player.frame_reader.playback_speed = value
+                    player.speed_spinbox.blockSignals(True)
+                    player.speed_spinbox.setValue(value)
+                    player.speed_spinbox.blockSignals(False)
             
         print(f"播放速度从 {old_speed} 更改为 {value}")
 
@@ -1247,35 +1341,80 @@ class VideoPlayer(QWidget):
         """清除旋转相关的缓存"""
         self.frame_size_cache = None
         self.scaled_frame_cache = None
-        self.cached_scale_params.clear()
         # 重置平移偏移
         self.pan_offset = np.array([0, 0])
         
         # 立即重新显示当前帧以应用旋转
         if hasattr(self, 'latest_frame') and self.latest_frame is not None:
-            processed_frame = self.latest_frame
-            if self.rotation_angle != 0:
-                processed_frame = self.rotate_image(self.latest_frame, self.rotation_angle)
-            self.display_frame(processed_frame)
+            self.display_frame(self.latest_frame)
 
     def get_cached_frame(self, frame_number):
         """获取缓存的帧，如果没有则返回None"""
         return self.frame_cache.get(frame_number)
     
     def cache_frame(self, frame_number, frame):
-        """缓存帧"""
-        # 如果缓存已满，移除最旧的帧
-        if len(self.frame_cache) >= self.max_cache_size:
-            oldest_frame = min(self.frame_cache.keys())
-            del self.frame_cache[oldest_frame]
-        
-        # 缓存当前帧
-        self.frame_cache[frame_number] = frame.copy()
+        """缓存帧, cap.read()每次返回新的数组, 直接保存引用"""
+        self.frame_cache.put(frame_number, frame)
     
     def clear_frame_cache(self):
         """清空帧缓存"""
+        if self.frame_predecoder is not None:
+            self.frame_predecoder.cancel()
         self.frame_cache.clear()
 
+    def predecode_around(self, frame_number):
+        """暂停时在后台预解码frame_number前后的帧, 使逐帧前进/后退命中帧缓存; 区间已全部缓存时不做任何事"""
+        if self.latest_frame is None or self.is_cleaning_up:
+            return
+        capacity = self.frame_cache.capacity(self.latest_frame.nbytes)
+        forward = max(1, int(capacity * self.predecode_forward_ratio))
+        first = max(1, frame_number - (capacity - forward) + 1)
+        last = min(self.total_frames, frame_number + forward)
+        if all(n in self.frame_cache for n in range(first, last + 1)):
+            return
+        if self.frame_predecoder is not None:
+            if not self.frame_predecoder.done and self.frame_predecoder.first_frame <= frame_number <= self.frame_predecoder.last_frame:
+                return
+            self.frame_predecoder.cancel()
+        self.frame_predecoder = FramePredecoder(self.video_path, self.frame_cache, first, last)
+        self.frame_predecoder.setAutoDelete(False)
+        self.predecode_pool.start(self.frame_predecoder)
+
+    def step_frame(self, delta):
+        """逐帧前进(delta=1)/后退(delta=-1), 优先使用帧缓存, 未命中时才通过帧读取器seek"""
+        target_frame = min(self.total_frames - 1, max(0, self.current_frame + delta))
+
+        # 暂停视频（如果正在播放）
+        if not self.is_paused:
+            self.play_pause()
+
+        # 检查是否有缓存的帧
+        cached_frame = self.get_cached_frame(target_frame)
+        if cached_frame is not None:
+            # 使用缓存的帧，避免重新读取; 记录最新帧, 保证旋转等操作重绘的是当前帧
+            self.latest_frame = cached_frame
+            self.latest_frame_number = target_frame
+            self.last_frame_number = target_frame
+            self.reader_out_of_sync = True
+
+            # 显示帧
+            self.display_frame(cached_frame)
+        else:
+            # 如果没有缓存，使用帧读取器跳转; seek(n)读取第n帧(从0开始), 对应的帧号为n+1
+            self.frame_reader.seek(max(0, target_frame - 1))
+
+        # 更新播放器状态
+        self.current_frame = target_frame
+        self.current_time = int(target_frame * (1000 / self.fps))
+
+        # 更新进度条
+        if self.duration_ms > 0:
+            progress = (self.current_time / self.duration_ms) * 100
+            self.slider.setValue(int(progress))
+
+        # 后台预解码当前帧前后的帧
+        self.predecode_around(target_frame)
+
     # 添加鼠标滚轮事件处理函数
     def wheelEvent(self, event):
         # 获取当前时间，用于节流
@@ -1309,11 +1448,7 @@ class VideoPlayer(QWidget):
                 self.pan_offset = np.array([0, 0])
                 # 需要刷新一下显示以移除平移
                 if self.latest_frame is not None:
-                    if self.rotation_angle != 0:
-                        rotated_frame = self.rotate_image(self.latest_frame, self.rotation_angle)
-                        self.display_frame(rotated_frame)
-                    else:
-                        self.display_frame(self.latest_frame)
+                    self.display_frame(self.latest_frame)
             event.accept() # 仍然接受事件，因为VideoWall可能需要处理
             return
             
@@ -1324,11 +1459,7 @@ class VideoPlayer(QWidget):
 
         # 如果有最新帧，重新显示应用缩放效果
         if self.latest_frame is not None:
-            if self.rotation_angle != 0:
-                rotated_frame = self.rotate_image(self.latest_frame, self.rotation_angle)
-                self.display_frame(rotated_frame)
-            else:
-                self.display_frame(self.latest_frame)
+            self.display_frame(self.latest_frame)
         
         # 将事件传递给父组件，以便VideoWall可以处理所有视频的缩放
         if self.video_wall:
@@ -1353,11 +1484,7 @@ class VideoPlayer(QWidget):
 
             # 重新显示帧以应用平移
             if self.latest_frame is not None:
-                if self.rotation_angle != 0:
-                    rotated_frame = self.rotate_image(self.latest_frame, self.rotation_angle)
-                    self.display_frame(rotated_frame)
-                else:
-                    self.display_frame(self.latest_frame)
+                self.display_frame(self.latest_frame)
             event.accept()
         else:
             event.ignore()
@@ -1384,6 +1511,12 @@ class VideoWall(QWidget):
         self.init_ui()
         self.players = []
         
+        # 所有播放器共享的主时钟
+        self.clock = PlaybackClock()
+
+        # 所有播放器帧缓存的总内存预算, 按播放器数量平均分配
+        self.frame_cache_budget = 1536 * 1024 * 1024
+
         # 添加全局缩放因子
         self.global_scale_factor = 1.0
         # 添加节流变量，防止频繁缩放
@@ -1396,12 +1529,14 @@ class VideoWall(QWidget):
         # 初始化视频列表
         self.video_list = video_list
         if self.video_list:
-            for video_path in self.video_list:
-                if os.path.exists(video_path):
-                    # 路径后缀转换为小写
-                    video_path = video_path.lower()
-                    player = VideoPlayer(video_path, parent=self)
-                    self.players.append(player)
+            # 创建期间冻结主时钟, 所有视频从同一时钟时间开始播放
+            with self.clock.frozen():
+                for video_path in self.video_list:
+                    if os.path.exists(video_path):
+                        # 路径后缀转换为小写
+                        video_path = video_path.lower()
+                        player = VideoPlayer(video_path, parent=self)
+                        self.players.append(player)
             self.refresh_layout()
 
         # 将窗口移动到鼠标所在的屏幕
@@ -1499,11 +1634,7 @@ class VideoWall(QWidget):
                 
                 # 重新显示当前帧以应用新的缩放
                 if player.latest_frame is not None:
-                    if player.rotation_angle != 0:
-                        rotated_frame = player.rotate_image(player.latest_frame, player.rotation_angle)
-                        player.display_frame(rotated_frame)
-                    else:
-                        player.display_frame(player.latest_frame)
+                    player.display_frame(player.latest_frame)
 
     def init_ui(self):
         self.scroll_area = QScrollArea(self)
@@ -1558,6 +1689,10 @@ class VideoWall(QWidget):
             row = index // columns
             col = index % columns
             self.grid_layout.addWidget(player, row, col)
+
+            # 按播放器数量重新分配帧缓存的内存预算
+            if hasattr(player, "frame_cache"):
+                player.frame_cache.set_max_bytes(self.frame_cache_budget // len(self.players))
             
             # 移除播放器内部的边距
             if hasattr(player, "layout"):
@@ -1607,12 +1742,15 @@ class VideoWall(QWidget):
             print(f"清空视频时发生错误: {str(e)}")
 
     def play_pause_all_videos(self):
-        for player in self.players:
-            player.play_pause()
+        # 暂停主时钟后再逐个切换, 恢复时各视频的帧偏移不变, 保持同步
+        with self.clock.frozen():
+            for player in self.players:
+                player.play_pause()
 
     def replay_all_videos(self):
-        for player in self.players:
-            player.replay()
+        with self.clock.frozen():
+            for player in self.players:
+                player.replay()
 
     def speed_up_all_videos(self):
         for player in self.players:
@@ -1642,6 +1780,10 @@ class VideoWall(QWidget):
 
     def jump_to_frame_all_videos(self):
         """从每个视频的跳帧数开始播放所有视频"""
+        with self.clock.frozen():
+            self._jump_to_frame_all_videos()
+
+    def _jump_to_frame_all_videos(self):
         for player in self.players:
             try:
                 # 获取跳帧数
@@ -1686,44 +1828,7 @@ class VideoWall(QWidget):
         for player in self.players:
             try:
                 if hasattr(player, "frame_reader"):
-                    # 计算下一帧的时间
-                    next_frame = min(player.total_frames - 1, player.current_frame + 1)
-                    
-                    # 暂停视频（如果正在播放）
-                    if not player.is_paused:
-                        player.play_pause()
-
-                    # 检查是否有缓存的帧
-                    cached_frame = player.get_cached_frame(next_frame)
-                    if cached_frame is not None:
-                        # 使用缓存的帧，避免重新读取
-                        player.current_frame = next_frame
-                        player.current_time = int(next_frame * (1000 / player.fps))
-                        
-                        # 应用旋转（如果有）
-                        if player.rotation_angle != 0:
-                            cached_frame = player.rotate_image(cached_frame, player.rotation_angle)
-                        
-                        # 显示帧
-                        player.display_frame(cached_frame)
-                        
-                        # 更新进度条
-                        if player.duration_ms > 0:
-                            progress = (player.current_time / player.duration_ms) * 100
-                            player.slider.setValue(int(progress))
-                    else:
-                        # 如果没有缓存，使用帧读取器跳转
-                        player.frame_reader.seek(next_frame)
-                        
-                        # 更新播放器状态
-                        player.current_frame = next_frame
-                        player.current_time = int(next_frame * (1000 / player.fps))
-                        
-                        # 更新进度条
-                        if player.duration_ms > 0:
-                            progress = (player.current_time / player.duration_ms) * 100
-                            player.slider.setValue(int(progress))
-
+                    player.step_frame(1)
             except Exception as e:
                 print(f"前进一帧时出错: {str(e)}")
 
@@ -1732,44 +1837,7 @@ class VideoWall(QWidget):
         for player in self.players:
             try:
                 if hasattr(player, "frame_reader"):
-                    # 计算上一帧的时间
-                    prev_frame = max(0, player.current_frame - 1)
-                    
-                    # 暂停视频（如果正在播放）
-                    if not player.is_paused:
-                        player.play_pause()
-
-                    # 检查是否有缓存的帧
-                    cached_frame = player.get_cached_frame(prev_frame)
-                    if cached_frame is not None:
-                        # 使用缓存的帧，避免重新读取
-                        player.current_frame = prev_frame
-                        player.current_time = int(prev_frame * (1000 / player.fps))
-                        
-                        # 应用旋转（如果有）
-                        if player.rotation_angle != 0:
-                            cached_frame = player.rotate_image(cached_frame, player.rotation_angle)
-                        
-                        # 显示帧
-                        player.display_frame(cached_frame)
-                        
-                        # 更新进度条
-                        if player.duration_ms > 0:
-                            progress = (player.current_time / player.duration_ms) * 100
-                            player.slider.setValue(int(progress))
-                    else:
-                        # 如果没有缓存，使用帧读取器跳转
-                        player.frame_reader.seek(prev_frame)
-                        
-                        # 更新播放器状态
-                        player.current_frame = prev_frame
-                        player.current_time = int(prev_frame * (1000 / player.fps))
-                        
-                        # 更新进度条
-                        if player.duration_ms > 0:
-                            progress = (player.current_time / player.duration_ms) * 100
-                            player.slider.setValue(int(progress))
-
+                    player.step_frame(-1)
             except Exception as e:
                 print(f"后退一帧时出错: {str(e)}")
 
@@ -28,32 +28,9 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import QStyle
 from PIL import Image, ImageDraw, ImageFont
-# 支持的图片格式 (PIL/Pillow)
-SUPPORTED_FORMATS = {
-    'JPEG': ['.jpg', '.jpeg'],
-    'PNG': ['.png'],
-    'WEBP': ['.webp'],
-    'TIFF': ['.tiff', '.tif'],
-    'BMP': ['.bmp'],
-    'GIF': ['.gif'],
-    'ICO': ['.ico'],
-    'TGA': ['.tga'],
-    'PSD': ['.psd'],
-    'PCX': ['.pcx'],
-    'XBM': ['.xbm'],
-    'XPM': ['.xpm'],
-    'PPM': ['.ppm', '.pgm', '.pbm'],
-    'DDS': ['.dds'],
-    'DIB': ['.dib'],
-    'EPS': ['.eps'],
-    'FLI': ['.fli', '.flc'],
-    'HEIC': ['.heic', '.heif'],  # 需要 pillow-heif
-    'AVIF': ['.avif'],  # 需要 pillow-avif
-    'JP2': ['.jp2', '.j2k', '.jpc'],  # JPEG 2000
-    'SPIDER': ['.spi'],
-    'SUN': ['.ras'],
-    'WAL': ['.wal']
-}
+
+from src.utils.image_batch import ImageTaskPool, SUPPORTED_FORMATS
+
 
 
 """设置本项目的入口路径,全局变量BASEPATH,设置图标路径ICONPATH"""
@@ -136,180 +113,45 @@ class CompressionRatioDelegate(QStyledItemDelegate):
         return QSize(120, 20)
 
 
-class MultiThreadFormatConvertWorker(QThread):
-    """多线程图片格式转换处理线程"""
+class ProcessPoolImageWorker(QThread):
+    """进程池图片压缩/格式转换处理线程
+
+    文件按大小切分为任务块放入共享队列, 由多个工作进程领取处理(见src.utils.image_batch), 绕过GIL且不会因某个分片全是大文件而拖慢整体;
+    进程池由窗口持有并在多次任务之间复用, 本线程只负责接收每个文件的结果并转换为与单线程版本一致的逐行信号
+    """
     progress_updated = pyqtSignal(int, str)  # 进度, 状态信息
     file_processed = pyqtSignal(int, str, str)  # 行号, 状态, 消息
-    file_stats_updated = pyqtSignal(bool, int)  # 是否成功, 转换后文件大小
+    file_stats_updated = pyqtSignal(bool, int)  # 是否成功, 压缩/转换后文件大小
     file_info_updated = pyqtSignal(int, dict)  # 行号, 文件信息更新
-    thread_finished = pyqtSignal()  # 单个线程完成信号
-    finished = pyqtSignal()  # 所有线程完成信号
-    
-    def __init__(self, files_info, settings, thread_id, total_threads):
+    thread_finished = pyqtSignal()  # 进程池处理完成信号
+
+    def __init__(self, pool, files_info, settings, kind, worker_count):
         super().__init__()
+        self.pool = pool
         self.files_info = files_info
         self.settings = settings
-        self.thread_id = thread_id
-        self.total_threads = total_threads
-        self.is_running = True
-    
+        self.kind = kind  # 'compress' 或 'convert'
+        self.worker_count = worker_count
+
     def stop(self):
-        self.is_running = False
-    
+        self.pool.stop()
+
     def run(self):
         try:
-            # 顺序处理文件（从上到下），但只处理分配给当前线程的文件
-            total_files = len(self.files_info)
-            files_per_thread = total_files // self.total_threads
-            remainder = total_files % self.total_threads
-            
-            # 计算当前线程需要处理的文件范围
-            start_idx = self.thread_id * files_per_thread
-            if self.thread_id < remainder:
-                start_idx += self.thread_id
-                end_idx = start_idx + files_per_thread + 1
-            else:
-                start_idx += remainder
-                end_idx = start_idx + files_per_thread
-            
-            # 顺序处理分配给当前线程的文件（从上到下）
-            for i in range(start_idx, end_idx):
-                if not self.is_running:
-                    break
-                
-                if i < len(self.files_info):
-                    try:
-                        self.process_single_image(i, self.files_info[i])
-                    except Exception as e:
-                        self.file_processed.emit(i, "错误", str(e))
-            
+            self.pool.run(self.kind, self.files_info, self.settings, self.on_result, self.worker_count)
         except Exception as e:
-            print(f"线程 {self.thread_id} 出错: {str(e)}")
+            print(f"进程池处理出错: {str(e)}")
         finally:
             self.thread_finished.emit()
-    
-    def process_single_image(self, row_index, file_info):
-        """处理单个图片文件转换"""
-        input_path = file_info['path']
-        
-        try:
-            # 获取设置
-            target_format = self.settings.get('target_format', 'JPEG')
-            quality = self.settings.get('quality', 85)
-            keep_exif = self.settings.get('keep_exif', True)
-            output_dir = self.settings.get('output_dir') or os.path.dirname(input_path)
-            naming_mode = self.settings.get('naming_mode', '保持原名')
-            prefix = self.settings.get('prefix', '')
-            
-            # 生成输出文件名
-            original_name = os.path.basename(input_path)
-            name_without_ext = os.path.splitext(original_name)[0]
-            target_ext = SUPPORTED_FORMATS.get(target_format, ['.jpg'])[0]
-            
-            if naming_mode == "保持原名":
-                output_filename = name_without_ext + target_ext
-            elif naming_mode == "添加格式后缀":
-                output_filename = f"{name_without_ext}_{target_format.lower()}{target_ext}"
-            else:  # 自定义前缀
-                output_filename = prefix + name_without_ext + target_ext
-            
-            output_path = os.path.join(output_dir, output_filename)
-            
-            # 检查是否需要转换（相同格式直接复制）
-            original_ext = os.path.splitext(original_name)[1].lower()
-            if original_ext == target_ext.lower() and output_path == input_path:
-                # 格式相同且路径相同，跳过转换
-                self.file_processed.emit(row_index, "跳过", "格式相同，无需转换")
-                # 发送统计信息，将跳过的文件计入成功数
-                self.file_stats_updated.emit(True, 0)
-                return
-            
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 读取图片
-            with Image.open(input_path) as image:
-                # 保留原始EXIF信息
-                exif_dict = image.info.get('exif') if keep_exif else None
-                
-                # 优化：只在需要时复制图片
-                if target_format == 'JPEG' and image.mode in ['RGBA', 'P']:
-                    # 转换为RGB模式（JPEG需要）
-                    if image.mode == 'P':
-                        image = image.convert('RGBA')
-                    # 创建白色背景
-                    rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                    rgb_image.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                    processed_image = rgb_image
-                elif target_format == 'GIF' and image.mode != 'P':
-                    # GIF格式转换
-                    processed_image = image.convert('P', palette=Image.ADAPTIVE)
-                else:
-                    # 其他格式直接使用原图
-                    processed_image = image
-                
-                # 准备保存参数（优化：减少不必要的参数）
-                save_kwargs = {}
-                
-                if target_format == 'JPEG':
-                    save_kwargs['quality'] = quality
-                    # 质量100%时跳过压缩优化
-                    if quality < 100:
-                        save_kwargs['optimize'] = True
-                    if exif_dict:
-                        save_kwargs['exif'] = exif_dict
-                elif target_format == 'PNG':
-                    # 优化：使用更快的压缩级别
-                    compress_level = min(6, int((100 - quality) / 16))  # 降低压缩级别以提高速度
-                    save_kwargs['compress_level'] = compress_level
-                    save_kwargs['optimize'] = False  # 关闭优化以提高速度
-                elif target_format == 'WEBP':
-                    save_kwargs['quality'] = quality
-                    # 质量100%时使用最高质量压缩方法
-                    if quality < 100:
-                        save_kwargs['method'] = 4  # 使用更快的压缩方法
-                    else:
-                        save_kwargs['method'] = 6  # 最高质量
-                elif target_format == 'TIFF':
-                    save_kwargs['compression'] = 'tiff_lzw'
-                # 其他格式不需要额外参数
-                
-                # 保存图片
-                processed_image.save(output_path, format=target_format, **save_kwargs)
-                
-                # 计算文件大小变化
-                original_size = os.path.getsize(input_path)
-                converted_size = os.path.getsize(output_path)
-                size_change = converted_size - original_size
-                size_change_percent = (size_change / original_size) * 100 if original_size > 0 else 0
-                
-                # 更新文件信息
-                if row_index < len(self.files_info):
-                    self.files_info[row_index]['converted_size'] = converted_size
-                    self.files_info[row_index]['size_change'] = size_change
-                    self.files_info[row_index]['size_change_percent'] = size_change_percent
-                    self.files_info[row_index]['output_filename'] = output_filename
-                    
-                    # 发送文件信息更新信号
-                    self.file_info_updated.emit(row_index, {
-                        'converted_size': converted_size,
-                        'size_change': size_change,
-                        'size_change_percent': size_change_percent,
-                        'output_filename': output_filename
-                    })
-                
-                # 发送统计信息
-                self.file_stats_updated.emit(True, converted_size)
-                
-                self.file_processed.emit(
-                    row_index, 
-                    "完成", 
-                    f"转换完成 | 输出: {output_filename}"
-                )
-            
-        except Exception as e:
-            self.file_stats_updated.emit(False, 0)
-            self.file_processed.emit(row_index, "错误", f"转换失败: {str(e)}")
+
+    def on_result(self, row_index, result):
+        """将单个文件的处理结果转换为逐行信号, 先更新文件信息再更新状态"""
+        if result['info'] is not None and row_index < len(self.files_info):
+            self.files_info[row_index].update(result['info'])
+            self.file_info_updated.emit(row_index, result['info'])
+        if result['success'] is not None:
+            self.file_stats_updated.emit(result['success'], result['size'])
+        self.file_processed.emit(row_index, result['status'], result['message'])
 
 
 class ImageFormatConvertWorker(QThread):
@@ -491,243 +333,6 @@ class ImageFormatConvertWorker(QThread):
             self.file_processed.emit(row_index, "错误", f"转换失败: {str(e)}")
 
 
-class MultiThreadImageCompressionWorker(QThread):
-    """多线程图片压缩处理线程"""
-    progress_updated = pyqtSignal(int, str)  # 进度, 状态信息
-    file_processed = pyqtSignal(int, str, str)  # 行号, 状态, 消息
-    file_stats_updated = pyqtSignal(bool, int)  # 是否成功, 压缩后文件大小
-    file_info_updated = pyqtSignal(int, dict)  # 行号, 文件信息更新
-    thread_finished = pyqtSignal()  # 单个线程完成信号
-    finished = pyqtSignal()  # 所有线程完成信号
-    
-    def __init__(self, files_info, settings, thread_id, total_threads):
-        super().__init__()
-        self.files_info = files_info
-        self.settings = settings
-        self.thread_id = thread_id
-        self.total_threads = total_threads
-        self.is_running = True
-    
-    def stop(self):
-        self.is_running = False
-    
-    def run(self):
-        try:
-            # 顺序处理文件（从上到下），但只处理分配给当前线程的文件
-            total_files = len(self.files_info)
-            files_per_thread = total_files // self.total_threads
-            remainder = total_files % self.total_threads
-            
-            # 计算当前线程需要处理的文件范围
-            # 前remainder个线程每个处理(files_per_thread + 1)个文件
-            # 后面的线程每个处理files_per_thread个文件
-            if self.thread_id < remainder:
-                start_idx = self.thread_id * (files_per_thread + 1)
-                end_idx = start_idx + files_per_thread + 1
-            else:
-                start_idx = remainder * (files_per_thread + 1) + (self.thread_id - remainder) * files_per_thread
-                end_idx = start_idx + files_per_thread
-            
-            print(f"线程 {self.thread_id}: 处理文件范围 [{start_idx}, {end_idx}), 共 {end_idx - start_idx} 个文件")
-            
-            # 顺序处理分配给当前线程的文件（从上到下）
-            for i in range(start_idx, end_idx):
-                if not self.is_running:
-                    break
-                
-                if i < len(self.files_info):
-                    try:
-                        self.process_single_image(i, self.files_info[i])
-                    except Exception as e:
-                        self.file_processed.emit(i, "错误", str(e))
-            
-        except Exception as e:
-            print(f"压缩线程 {self.thread_id} 出错: {str(e)}")
-        finally:
-            self.thread_finished.emit()
-    
-    def process_single_image(self, row_index, file_info):
-        """处理单个图片文件压缩"""
-        try:
-            # 获取文件信息
-            input_path = file_info['path']
-            file_name = file_info['name']
-            
-            # 生成输出路径
-            output_path = self.generate_output_path(input_path, file_name)
-            
-            # 检查是否需要处理
-            if not self.should_process_file(input_path, output_path):
-                self.file_processed.emit(row_index, "跳过", "文件已存在或格式相同")
-                # 发送统计信息，将跳过的文件计入成功数
-                self.file_stats_updated.emit(True, 0)
-                return
-            
-            # 执行压缩
-            success, compressed_size = self.compress_image(input_path, output_path)
-            
-            if success:
-                # 计算原始文件大小
-                original_size = os.path.getsize(input_path)
-                saved_space = original_size - compressed_size
-                compression_ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
-                
-                # 更新文件信息
-                file_info['compressed_size'] = compressed_size
-                file_info['output_path'] = output_path
-                file_info['saved_space'] = saved_space
-                file_info['compression_ratio'] = compression_ratio
-                
-                # 发送成功信号
-                self.file_processed.emit(row_index, "完成", f"压缩完成: {os.path.basename(output_path)}")
-                self.file_stats_updated.emit(True, compressed_size)
-                
-                # 更新文件信息
-                self.file_info_updated.emit(row_index, {
-                    'compressed_size': compressed_size,
-                    'output_path': output_path,
-                    'saved_space': saved_space,
-                    'compression_ratio': compression_ratio
-                })
-            else:
-                self.file_processed.emit(row_index, "错误", "压缩失败")
-                self.file_stats_updated.emit(False, 0)
-                
-        except Exception as e:
-            self.file_processed.emit(row_index, "错误", f"压缩失败: {str(e)}")
-    
-    def generate_output_path(self, input_path, file_name):
-        """生成输出路径"""
-        # 获取输出目录
-        output_dir = self.settings.get('output_dir')
-        if not output_dir:
-            output_dir = os.path.dirname(input_path)
-        
-        # 确保输出目录存在
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # 生成输出文件名
-        name, ext = os.path.splitext(file_name)
-        output_format = self.settings.get('output_format', 'JPEG')
-        
-        # 根据格式确定扩展名
-        format_extensions = {
-            'JPEG': '.jpg',
-            'PNG': '.png',
-            'WEBP': '.webp'
-        }
-        output_ext = format_extensions.get(output_format, '.jpg')
-        
-        # 如果格式相同且输出目录相同，添加后缀
-        if ext.lower() == output_ext.lower() and output_dir == os.path.dirname(input_path):
-            output_name = f"{name}_compressed{output_ext}"
-        else:
-            output_name = f"{name}{output_ext}"
-        
-        return os.path.join(output_dir, output_name)
-    
-    def should_process_file(self, input_path, output_path):
-        """检查是否需要处理文件"""
-        # 如果输出文件已存在，跳过
-        if os.path.exists(output_path):
-            return False
-        
-        # 如果输入和输出路径相同，跳过
-        if input_path == output_path:
-            return False
-        
-        return True
-    
-    def compress_image(self, input_path, output_path):
-        """压缩图片"""
-        try:
-            from PIL import Image
-            
-            print(f"开始压缩图片: {input_path} -> {output_path}")
-            
-            # 打开图片
-            with Image.open(input_path) as img:
-                print(f"原始图片模式: {img.mode}, 尺寸: {img.size}")
-                
-                # 转换为RGB模式（JPEG需要）
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    print("转换图片模式为RGB")
-                    # 创建白色背景
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    print(f"转换图片模式从 {img.mode} 到 RGB")
-                    img = img.convert('RGB')
-                
-                # 应用尺寸调整
-                if self.settings.get('resize_enabled', False):
-                    print("应用尺寸调整")
-                    img = self.apply_resize(img)
-                
-                # 应用水印
-                if self.settings.get('watermark', {}).get('enabled', False):
-                    print("应用水印")
-                    img = self.apply_watermark(img)
-                
-                # 保存图片
-                output_format = self.settings.get('output_format', 'JPEG')
-                quality = self.settings.get('quality', 85)
-                
-                print(f"输出格式: {output_format}, 质量: {quality}")
-                
-                save_kwargs = {'format': output_format}
-                if output_format == 'JPEG':
-                    save_kwargs['quality'] = quality
-                    save_kwargs['optimize'] = True
-                elif output_format == 'WEBP':
-                    save_kwargs['quality'] = quality
-                    save_kwargs['method'] = 6  # 最佳压缩
-                
-                # 暂时跳过EXIF信息处理
-                print(f"保存参数: {save_kwargs}")
-                print(f"保存图片到: {output_path}")
-                
-                img.save(output_path, **save_kwargs)
-                
-                # 返回压缩后文件大小
-                compressed_size = os.path.getsize(output_path)
-                print(f"压缩完成，文件大小: {compressed_size} bytes")
-                return True, compressed_size
-                
-        except Exception as e:
-            print(f"压缩图片失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return False, 0
-    
-    def apply_resize(self, img):
-        """应用尺寸调整"""
-        resize_mode = self.settings.get('resize_mode', 'percentage')
-        
-        if resize_mode == 'percentage':
-            percentage = self.settings.get('resize_percentage', 80)
-            new_size = (int(img.width * percentage / 100), int(img.height * percentage / 100))
-        else:  # pixel
-            new_width = self.settings.get('resize_width', 800)
-            new_height = self.settings.get('resize_height', 600)
-            new_size = (new_width, new_height)
-        
-        return img.resize(new_size, Image.Resampling.LANCZOS)
-    
-    def apply_watermark(self, img):
-        """应用水印"""
-        watermark_settings = self.settings.get('watermark', {})
-        if not watermark_settings.get('enabled', False):
-            return img
-        
-        # 这里可以添加水印逻辑
-        # 暂时返回原图
-        return img
-
-
 class ImageCompressionWorker(QThread):
     """图片压缩处理线程（单线程版本，保持兼容性）"""
     progress_updated = pyqtSignal(int, str)  # 进度, 状态信息
@@ -1689,6 +1294,9 @@ class PicZipMainWindow(QMainWindow):
         self.conversion_workers = []  # 多线程转换
         self.conversion_thread_count = 0  # 当前运行的转换线程数
         self.active_thread_count = 0  # 当前活跃的线程数
+
+        # 多进程压缩/转换使用的进程池, 工作进程在第一次使用时启动, 窗口关闭前一直复用
+        self.task_pool = ImageTaskPool()
         
         # 文件列表
         self.file_list = []
@@ -2457,28 +2065,22 @@ class PicZipMainWindow(QMainWindow):
             self.update_thread_count_display()
             self.update_status_display("压缩中...")
         else:
-            # 多线程模式
-            self.compression_workers = []
-            self.compression_thread_count = thread_count
+            # 多进程模式: 一个调度线程 + thread_count个工作进程
+            self.compression_thread_count = 1
             self.finished_thread_count = 0
             
-            # 创建多个工作线程
-            for i in range(thread_count):
-                worker = MultiThreadImageCompressionWorker(
-                    self.file_list.copy(), settings, i, thread_count
-                )
-                worker.file_processed.connect(self.update_file_status)
-                worker.file_stats_updated.connect(self.update_processing_stats)
-                worker.file_info_updated.connect(self.update_file_info)
-                worker.thread_finished.connect(self.on_compression_thread_finished)
-                
-                self.compression_workers.append(worker)
-                worker.start()
+            worker = ProcessPoolImageWorker(self.task_pool, self.file_list.copy(), settings, 'compress', thread_count)
+            worker.file_processed.connect(self.update_file_status)
+            worker.file_stats_updated.connect(self.update_processing_stats)
+            worker.file_info_updated.connect(self.update_file_info)
+            worker.thread_finished.connect(self.on_compression_thread_finished)
+            self.compression_workers = [worker]
+            worker.start()
             
             # 更新线程数和状态显示
             self.active_thread_count = thread_count
             self.update_thread_count_display()
-            self.update_status_display(f"压缩中... ({thread_count}个线程)")
+            self.update_status_display(f"压缩中... ({thread_count}个进程)")
             
             # 启动进度更新定时器
             self.start_compression_progress_timer()
@@ -2876,28 +2478,22 @@ class PicZipMainWindow(QMainWindow):
             self.update_thread_count_display()
             self.update_status_display("转换中...")
         else:
-            # 多线程模式
-            self.conversion_workers = []
-            self.conversion_thread_count = thread_count
+            # 多进程模式: 一个调度线程 + thread_count个工作进程
+            self.conversion_thread_count = 1
             self.finished_thread_count = 0
             
-            # 创建多个工作线程
-            for i in range(thread_count):
-                worker = MultiThreadFormatConvertWorker(
-                    self.file_list.copy(), settings, i, thread_count
-                )
-                worker.file_processed.connect(self.update_file_status)
-                worker.file_stats_updated.connect(self.update_processing_stats)
-                worker.file_info_updated.connect(self.update_file_info)
-                worker.thread_finished.connect(self.on_conversion_thread_finished)
-                
-                self.conversion_workers.append(worker)
-                worker.start()
+            worker = ProcessPoolImageWorker(self.task_pool, self.file_list.copy(), settings, 'convert', thread_count)
+            worker.file_processed.connect(self.update_file_status)
+            worker.file_stats_updated.connect(self.update_processing_stats)
+            worker.file_info_updated.connect(self.update_file_info)
+            worker.thread_finished.connect(self.on_conversion_thread_finished)
+            self.conversion_workers = [worker]
+            worker.start()
             
             # 更新线程数和状态显示
             self.active_thread_count = thread_count
             self.update_thread_count_display()
-            self.update_status_display(f"转换中... ({thread_count}个线程)")
+            self.update_status_display(f"转换中... ({thread_count}个进程)")
             
             # 启动进度更新定时器
             self.start_progress_timer()
@@ -3348,6 +2944,7 @@ class PicZipMainWindow(QMainWindow):
                 worker.stop()
             for worker in self.conversion_workers:
                 worker.wait()
+        self.task_pool.shutdown()
         # 停止进度定时器
         if hasattr(self, 'progress_timer'):
             self.progress_timer.stop()
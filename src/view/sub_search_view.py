@@ -14,27 +14,120 @@
 3、支持模糊搜索，支持大小写，支持中文
 4、支持按esc键关闭搜索界面
 5、点击搜索到的项，可以返回该项在多维列表中的位置
+6、打开时在后台线程建立三元组索引(文件名+已解析的exif信息), 输入防抖后查询, 继续输入时在上一次结果中收窄
+7、结果列表为虚拟模型, 只按滚动需要分批加载行, 不为每个结果创建列表项
 """
 import sys
-from PyQt5.QtWidgets import QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QShortcut, QMainWindow, QWidget, QApplication, QFrame
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QLineEdit, QListView, QVBoxLayout, QShortcut, QMainWindow, QWidget, QApplication, QFrame
+from PyQt5.QtCore import (Qt, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer,
+                          QAbstractListModel, QModelIndex, QVariant)
 from PyQt5.QtGui import QKeySequence, QPalette, QColor
 
+from src.utils.search_index import SearchIndex
+from src.components.custom_qTableView_model import format_file_info_text
+
+
+class SearchIndexWorker(QRunnable):
+    """后台线程建立搜索索引"""
+    class Signals(QObject):
+        finished = pyqtSignal(object)   # 建立完成信号, 传递SearchIndex
+
+    def __init__(self, data_list, info_list=None):
+        """
+        Args:
+            data_list: 多维列表, data_list[col][row]为显示文本
+            info_list: 与data_list结构相同的文件信息列表(主界面的files_list), 其中的exif信息参与搜索
+        """
+        super().__init__()
+        self.data_list = data_list
+        self.info_list = info_list or []
+        self.signals = self.Signals()
+
+    def run(self):
+        index = SearchIndex()
+        try:
+            for i, col in enumerate(self.data_list):
+                infos = self.info_list[i] if i < len(self.info_list) else []
+                for j, item in enumerate(col):
+                    extra = ""
+                    if j < len(infos):
+                        text, has_exif = format_file_info_text(infos[j])
+                        extra = text.split("\n", 1)[1] if has_exif else ""
+                    index.add(f"{item}    {extra}" if extra else item, (j, i))  # 存储位置信息
+        except Exception as e:
+            print(f"[SearchIndexWorker]-->建立搜索索引失败: {e}")
+        self.signals.finished.emit(index)
+
+
+class SearchResultModel(QAbstractListModel):
+    """搜索结果的虚拟列表模型, 只保存结果编号, 行数随滚动分批增加"""
+    batch_size = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index_data = None     # SearchIndex
+        self.results = []          # 匹配的条目编号
+        self.loaded = 0            # 已提供给视图的行数
+
+    def set_results(self, index_data, results):
+        self.beginResetModel()
+        self.index_data = index_data
+        self.results = results
+        self.loaded = min(self.batch_size, len(results))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.results)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.batch_size, len(self.results) - self.loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self.loaded:
+            return QVariant()
+        entry_id = self.results[index.row()]
+        if role == Qt.DisplayRole:
+            return self.index_data.displays[entry_id]
+        if role == Qt.UserRole:
+            return self.index_data.positions[entry_id]
+        return QVariant()
+
 
 class SearchOverlay(QMainWindow):
     # 修改信号，当项从搜索结果中被选中时发出，传递项的位置
     item_selected_from_search = pyqtSignal(tuple)
-    def __init__(self, main_window, data_list):
+    debounce_ms = 150   # 输入防抖间隔(毫秒)
+
+    def __init__(self, main_window, data_list, info_list=None):
         super().__init__()
         self.main_window = main_window
         self.data_list = data_list  # 保存多维列表数据
+        self.search_index = None    # 后台建立完成前为None
         
         # 初始化ui
         self.init_ui()
 
+        # 输入防抖定时器, 停止输入一段时间后再查询
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(lambda: self.update_search_results(self.search_input.text()))
+
         # 连接信号和槽
-        self.search_input.textChanged.connect(self.update_search_results)
-        self.search_results_list.itemClicked.connect(self.select_item_from_search)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start(self.debounce_ms))
+        self.search_results_list.clicked.connect(self.select_item_from_search)
+
+        # 后台建立搜索索引
+        self.index_worker = SearchIndexWorker(data_list, info_list)
+        self.index_worker.signals.finished.connect(self.on_index_ready)
+        QThreadPool.globalInstance().start(self.index_worker)
         
         # 添加Esc键快捷键
         self.shortcut_escape = QShortcut(QKeySequence("Esc"), self)
@@ -75,7 +168,11 @@ class SearchOverlay(QMainWindow):
         self.search_layout.addWidget(self.search_input)
         
         # 创建搜索结果列表
-        self.search_results_list = QListWidget()
+        self.search_results_model = SearchResultModel(self)
+        self.search_results_list = QListView()
+        self.search_results_list.setModel(self.search_results_model)
+        self.search_results_list.setUniformItemSizes(True)
+        self.search_results_list.setEditTriggers(QListView.NoEditTriggers)
         self.search_layout.addWidget(self.search_results_list)
 
         """设置搜索框和结果列表的样式
@@ -102,21 +199,21 @@ class SearchOverlay(QMainWindow):
             }
         """)
         self.search_results_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: rgba(240, 240, 240, 0.9);
                 color: #333333;
                 border: 1px solid rgba(187, 187, 187, 0.3);
                 border-radius: 3px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
                 border-bottom: 1px solid rgba(0, 0, 0, 0.05);
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: rgba(187, 187, 187, 0.2);
                 color: #000000;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: rgba(173,216,230, 0.5);
             }
         """)
@@ -174,38 +271,22 @@ class SearchOverlay(QMainWindow):
     def hide_search_overlay(self):
         self.close()
         
+    def on_index_ready(self, search_index):
+        """搜索索引建立完成, 执行当前输入的查询"""
+        self.search_index = search_index
+        self.update_search_results(self.search_input.text())
+
     def update_search_results(self, query):
-        """根据搜索查询更新结果列表"""
-        self.search_results_list.clear()
-        # 如果查询为空，显示所有项
-        if not query:
-            self._add_all_items_to_list()
+        """根据搜索查询更新结果列表, 空查询显示所有项; 索引建立完成前不查询"""
+        self.search_timer.stop()
+        if self.search_index is None:
             return
-            
-        # 执行模糊搜索
-        self._search_items(query.lower())
-        
-    def _add_all_items_to_list(self):
-        """添加所有项到结果列表"""
-        for i, col in enumerate(self.data_list):
-            for j, item in enumerate(col):
-                list_item = QListWidgetItem(str(item))
-                list_item.setData(Qt.UserRole, (j, i))  # 存储位置信息
-                self.search_results_list.addItem(list_item)
-                
-    def _search_items(self, query):
-        """搜索匹配的项"""
-        for i, col in enumerate(self.data_list):
-            for j, item in enumerate(col):
-                if query in str(item).lower():
-                    list_item = QListWidgetItem(str(item))
-                    list_item.setData(Qt.UserRole, (j, i))  # 存储位置信息
-                    self.search_results_list.addItem(list_item)
+        self.search_results_model.set_results(self.search_index, self.search_index.search(query))
                     
-    def select_item_from_search(self, item):
+    def select_item_from_search(self, index):
         """从搜索结果中选择项并发出位置信号"""
-        # 直接从item的data中获取位置信息
-        position = item.data(Qt.UserRole)
+        # 直接从模型的data中获取位置信息
+        position = index.data(Qt.UserRole)
         self.item_selected_from_search.emit(position)
         self.hide_search_overlay()
 
@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+'''
+@File         :test_icon_benchmark.py
+@Description  :对比IconCache._generate_image_icon优化前后的缩略图生成速度(张/秒)
+
+运行方式(在项目根目录下):
+    python test/test_icon_benchmark.py [大尺寸相机JPEG所在文件夹]
+不传入文件夹时, 会在临时目录中生成一批带EXIF内嵌缩略图的50MP测试图片
+'''
+import os
+import io
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import piexif
+from PIL import Image
+from PyQt5 import QtCore
+from PyQt5.QtGui import QIcon, QPixmap, QImageReader
+from PyQt5.QtWidgets import QApplication
+
+
+def generate_camera_jpegs(folder, count=8, size=(8192, 6144)):
+    """生成带EXIF IFD1内嵌缩略图的大尺寸JPEG"""
+    thumbnail = io.BytesIO()
+    Image.new("RGB", (160, 120), (90, 120, 150)).save(thumbnail, "JPEG")
+    exif = piexif.dump({"0th": {piexif.ImageIFD.Orientation: 1}, "Exif": {}, "1st": {}, "thumbnail": thumbnail.getvalue()})
+    # 使用噪声图模拟相机图片的熵, 避免纯色图片解码过快
+    image = Image.effect_noise(size, 64).convert("RGB")
+    paths = []
+    for i in range(count):
+        path = Path(folder) / f"IMG_{i:04d}.jpg"
+        image.save(path, "JPEG", quality=95, exif=exif)
+        paths.append(str(path))
+    return paths
+
+
+def icon_before(file_path):
+    """优化前的方案: QImageReader完整解码后缩放到48x48"""
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    reader.setQuality(100)
+    if (original_size := reader.size()).isValid():
+        scale = min(48 / original_size.width(), 48 / original_size.height())
+        reader.setScaledSize(QtCore.QSize(int(original_size.width() * scale), int(original_size.height() * scale)))
+    return QIcon(QPixmap.fromImage(reader.read()))
+
+
+def benchmark(name, func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32s}: {len(paths) / elapsed:8.2f} 张/秒  ({elapsed:.2f} 秒 / {len(paths)} 张)")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    from src.utils.Icon import IconCache
+    from src.utils.image import load_jpeg_draft
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            paths = [str(p) for p in Path(sys.argv[1]).iterdir() if p.suffix.lower() in (".jpg", ".jpeg")]
+        else:
+            print("未传入文件夹, 生成测试图片中...")
+            paths = generate_camera_jpegs(tmp)
+
+        benchmark("优化前(QImageReader完整解码)", icon_before, paths)
+        benchmark("JPEG draft模式缩小解码", load_jpeg_draft, paths)
+        benchmark("优化后(_generate_image_icon)", IconCache._generate_image_icon, paths)
@@ -0,0 +1,91 @@
+# -*- encoding: utf-8 -*-
+'''
+@File         :test_image_batch_benchmark.py
+@Description  :对比图片批量压缩在1/2/4/8个工作进程下的吞吐量(张/秒, MB/秒), 以及优化前固定连续分片的多线程方案
+               进程池与窗口中的用法一致: 创建一次并复用, 第一次任务包含启动工作进程的开销, 单独统计
+
+运行方式(在项目根目录下):
+    python test/test_image_batch_benchmark.py [混合图片所在文件夹]
+不传入文件夹时, 会在临时目录中生成一批混合测试图片(少量大尺寸PNG + 大量小JPEG, 大文件集中在列表开头)
+'''
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+
+from src.utils.image_batch import ImageTaskPool, compress_image_file, SUPPORTED_FORMATS
+
+
+def generate_mixed_folder(folder, large_count=4, small_count=48):
+    """生成混合测试图片: 大尺寸PNG排在前面, 模拟固定分片时某个分片全是大文件的情况"""
+    noise = Image.effect_noise((6000, 4000), 48).convert("RGB")
+    for i in range(large_count):
+        noise.save(Path(folder) / f"A_{i:03d}.png", compress_level=1)
+    small = noise.crop((0, 0, 1600, 1200))
+    for i in range(small_count):
+        small.save(Path(folder) / f"B_{i:03d}.jpg", quality=95)
+
+
+def list_images(folder):
+    extensions = tuple(ext for exts in SUPPORTED_FORMATS.values() for ext in exts)
+    return [{'path': str(p), 'name': p.name} for p in sorted(Path(folder).iterdir())
+            if p.suffix.lower() in extensions]
+
+
+def static_slice_threads(files_info, settings, workers):
+    """优化前的方案: 按线程数把文件列表切成固定的连续分片, 每个线程顺序处理自己的分片"""
+    per_thread, remainder = divmod(len(files_info), workers)
+    slices, start = [], 0
+    for i in range(workers):
+        end = start + per_thread + (1 if i < remainder else 0)
+        slices.append(files_info[start:end])
+        start = end
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda items: [compress_image_file(info, settings) for info in items], slices))
+
+
+POOL = None
+
+
+def process_pool(files_info, settings, workers):
+    POOL.run('compress', files_info, settings, lambda row, result: None, workers)
+
+
+def benchmark(name, func, files_info, settings, workers, output_dir):
+    for f in Path(output_dir).iterdir():
+        f.unlink()
+    total_mb = sum(os.path.getsize(info['path']) for info in files_info) / 1024 / 1024
+    start = time.perf_counter()
+    func(files_info, settings, workers)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16s} workers={workers}: {len(files_info) / elapsed:7.2f} 张/秒  "
+          f"{total_mb / elapsed:7.2f} MB/秒  ({elapsed:.2f} 秒)")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as out:
+        if len(sys.argv) > 1:
+            folder = sys.argv[1]
+        else:
+            print("未传入文件夹, 生成混合测试图片中...")
+            folder = tmp
+            generate_mixed_folder(folder)
+
+        files_info = list_images(folder)
+        settings = {'quality': 80, 'output_format': 'JPEG', 'output_dir': out}
+        print(f"共 {len(files_info)} 张图片, CPU核数: {os.cpu_count()}")
+        POOL = ImageTaskPool()
+        try:
+            for workers in (1, 2, 4, 8):
+                benchmark("固定分片多线程", static_slice_threads, files_info, settings, workers, out)
+                # 进程数增加时先启动新的工作进程(首次任务), 再统计复用进程池时的吞吐量
+                benchmark("进程池(首次)", process_pool, files_info[:workers], settings, workers, out)
+                benchmark("进程池任务队列", process_pool, files_info, settings, workers, out)
+        finally:
+            POOL.shutdown()
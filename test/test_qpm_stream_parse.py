@@ -0,0 +1,175 @@
+# -*- encoding: utf-8 -*-
+'''
+@File         :test_qpm_stream_parse.py
+@Description  :高通3A XML流式解析(iterparse)与完整树解析的等价性测试, 同时对比单文件耗时和解析时的峰值内存
+
+运行方式(在项目根目录下):
+    python test/test_qpm_stream_parse.py [高通XML样本所在文件夹]
+不传入文件夹时, 会在临时目录中生成一批模拟的高通3A dump文件(包含大量无关的统计网格、注释、重名SA等情况)
+'''
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psutil
+
+from src.qpm.parse import process_file, parse_xml, parse_xml_stream, load_sa_config
+
+
+SA_NAMES = ["FrameSA", "SatPrevSA", "DarkPrevSA", "BrightenImgSA", "FaceSA", "ExtremeColorSA", "TouchSA",
+            "YHistSA", "SafeAggSA", "ShortAggSA", "LongAggSA", "UnknownSA", "DebugOnlySA"]
+METHODS = ["Division(3)", "Multiplication(2)", "Addition(0)", "Min(5)", "Max(4)", "CondSmaller(13)", "Largest(8)"]
+
+
+def grid(rng, count):
+    return "".join(f"<Value_Grid>{rng.uniform(0, 4):.4f}</Value_Grid>" for _ in range(count))
+
+
+def general_sa(rng, name, extra=""):
+    operators = "".join(
+        f"<Arithmetic_Operators><Output_DB><dataName>{rng.choice(['1st', 'gain', 'ratio'])}_{i}</dataName></Output_DB>"
+        + "".join(f"<Operands>{rng.uniform(0, 2):.3f}</Operands>" for _ in range(4))
+        + f"<Operation_Method>{rng.choice(METHODS)}</Operation_Method>"
+        f"<Output_Value>{rng.uniform(0, 2):.3f}</Output_Value></Arithmetic_Operators>"
+        for i in range(rng.randint(0, 4)))
+    return (f"<General_SAs><Analyzer_Name>{name}</Analyzer_Name><Analyzer_ID>{rng.randint(0, 99)}</Analyzer_ID>"
+            f"<Luma_Component><Aggregated_Value><start>{rng.uniform(0, 255):.2f}</start></Aggregated_Value></Luma_Component>"
+            f"<Target_Component><Aggregated_Value><start>{rng.uniform(0, 255):.2f}</start>"
+            f"<end>{rng.uniform(0, 255):.2f}</end></Aggregated_Value></Target_Component>"
+            f"<Confidence_Component><Aggregated_Value><start>{rng.choice([0, 0.5, 1.0])}</start></Aggregated_Value></Confidence_Component>"
+            f"<Adjustment_Ratio><start>{rng.uniform(0.5, 4):.4f}</start><end>{rng.uniform(0.5, 4):.4f}</end></Adjustment_Ratio>"
+            f"<SA_Description>not_awb</SA_Description>{extra}{operators}</General_SAs>")
+
+
+def generate_dump(path, rng, grid_size=256):
+    """生成一个模拟的高通3A dump文件"""
+    parts = ["<?xml version='1.0' encoding='utf-8'?>\n<Dump_Root>\n  <!-- AEC -->\n  <AEC_Data>"]
+    parts.append(f"<Frame_Info><Current_Frame><Lux_Index>{rng.uniform(100, 500):.2f}</Lux_Index>"
+                 f"<Average_Luma>{rng.randint(0, 255)}</Average_Luma><FPS>30</FPS></Current_Frame></Frame_Info>")
+    parts.append(f"<AECX_Metering><Sat_Ratio>{rng.random():.3f}</Sat_Ratio><Dark_Ratio>{rng.random():.3f}</Dark_Ratio>"
+                 f"<Luma_Grid>{grid(rng, grid_size * 4)}</Luma_Grid></AECX_Metering>")
+    for index in range(3):
+        parts.append(f'<Exposure_Information Index="{index}"><Gain>{rng.uniform(1, 16):.3f}</Gain>'
+                     f'<Exposure_Time>{rng.randint(1, 33333)}</Exposure_Time></Exposure_Information>')
+    parts.append(f"<AEC_Settled>{rng.randint(0, 1)}</AEC_Settled>")
+    parts.append("<AECX_CoreStats>" + "".join(
+        f'<Channels_List Index="{index}">' + "".join(
+            f'<Channel_Data ID="{cid}">{grid(rng, grid_size)}</Channel_Data>' for cid in range(8)) + "</Channels_List>"
+        for index in range(4)) + "</AECX_CoreStats>")
+
+    names = SA_NAMES[:]
+    rng.shuffle(names)
+    names.append(rng.choice(SA_NAMES))    # 重名SA, 以最后一个为准
+    sa_list = []
+    for name in names:
+        extra = ""
+        if name in ("UnknownSA", "TouchSA"):
+            # 未配置/已配置的SA内部出现的标量节点
+            extra = f'<Exposure_Information Index="1"><Gain>{rng.uniform(1, 16):.3f}</Gain></Exposure_Information>'
+        sa_list.append(general_sa(rng, name, extra))
+    parts.append("<SA_List>" + "".join(sa_list) + "</SA_List></AEC_Data>\n  <!-- AWB -->\n  <AWB_Data>")
+
+    for index in range(2):
+        parts.append(f'<AWB_CurFrameDecision Index="{index}"><CCT>{rng.randint(2300, 7500)}</CCT></AWB_CurFrameDecision>')
+    for did in range(6):
+        parts.append(f'<AWB_Decision_Data ID="{did}">' + "".join(
+            f'<Point ID="{pid}"><R_G_Ratio>{rng.random():.4f}</R_G_Ratio><B_G_Ratio>{rng.random():.4f}</B_G_Ratio></Point>'
+            for pid in range(3)) + "</AWB_Decision_Data>")
+    parts.append("<Tuning_AWB_Data>" + "".join(
+        f'<AWB_Gains Index="{index}">{rng.uniform(1, 3):.4f}</AWB_Gains>' for index in range(3)) + "</Tuning_AWB_Data>")
+    parts.append(f"<AWB_TriangleGainAdjust><Triangle_Index>{rng.randint(0, 9)}</Triangle_Index></AWB_TriangleGainAdjust>")
+    for desc in rng.sample(["Daylight", "Cloudy", "", "Fluorescent", "  ", "Shade"], 4):
+        parts.append(f"<AWB_SAGen1Data><SA_Description>{desc}</SA_Description></AWB_SAGen1Data>")
+    if rng.random() < 0.7:
+        parts.append(f"<AWB_SA_Face_Assist><Face_Assist_Confidence>{rng.choice([0, 0.8])}"
+                     f"</Face_Assist_Confidence></AWB_SA_Face_Assist>")
+    parts.append(f"<AWB_Stats>{grid(rng, grid_size * 16)}</AWB_Stats>\n  </AWB_Data>\n</Dump_Root>\n")
+    Path(path).write_text("\n".join(parts), encoding="utf-8")
+
+
+def run(folder, file_names, full_parse, streaming):
+    """处理所有文件, 返回({文件名: _new.xml内容}, 总耗时)"""
+    outputs, elapsed = {}, 0.0
+    for name in file_names:
+        xml_path = os.path.join(folder, name)
+        new_path = os.path.join(folder, f"{os.path.splitext(name)[0]}_new.xml")
+        if os.path.exists(new_path):
+            os.remove(new_path)
+        start = time.perf_counter()
+        process_file(xml_path, folder, full_parse, streaming)
+        elapsed += time.perf_counter() - start
+        outputs[name] = Path(new_path).read_bytes() if os.path.exists(new_path) else None
+    return outputs, elapsed
+
+
+def peak_rss_mb():
+    """当前进程的峰值内存(MB): Windows使用peak_wset, Linux读取VmHWM(ru_maxrss会继承父进程的峰值)"""
+    info = psutil.Process().memory_info()
+    if hasattr(info, "peak_wset"):
+        return info.peak_wset / 1024 / 1024
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def parse_peak_delta(xml_path, streaming):
+    """在独立进程中解析单个文件, 返回解析引起的峰值内存增量(MB)"""
+    required_sas, optional_sas, _, _ = load_sa_config()
+    before = peak_rss_mb()
+    root = parse_xml_stream(xml_path, set(required_sas + optional_sas), True) if streaming else parse_xml(xml_path)
+    delta = peak_rss_mb() - before
+    del root
+    return delta
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            # 复制到临时目录, 避免覆盖样本旁已有的_new.xml
+            for name in os.listdir(sys.argv[1]):
+                if name.endswith(".xml") and not name.endswith("_new.xml"):
+                    shutil.copy(os.path.join(sys.argv[1], name), tmp)
+        else:
+            print("未传入文件夹, 生成模拟的高通3A dump文件中...")
+            rng = random.Random(2025)
+            for i in range(8):
+                generate_dump(os.path.join(tmp, f"IMG_{i:04d}.xml"), rng, grid_size=rng.choice([256, 1024, 2048]))
+
+        file_names = sorted(f for f in os.listdir(tmp) if f.endswith(".xml") and not f.endswith("_new.xml"))
+        size_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in file_names) / 1024 / 1024
+        print(f"共 {len(file_names)} 个XML文件, 合计 {size_mb:.1f} MB")
+
+        failed = 0
+        for full_parse in (False, True):
+            expected, tree_time = run(tmp, file_names, full_parse, streaming=False)
+            actual, stream_time = run(tmp, file_names, full_parse, streaming=True)
+            for name in file_names:
+                if expected[name] != actual[name]:
+                    failed += 1
+                    print(f"[不一致] full_parse={full_parse} {name}")
+            print(f"full_parse={full_parse}: 完整树 {tree_time / len(file_names) * 1000:.1f} ms/文件, "
+                  f"流式 {stream_time / len(file_names) * 1000:.1f} ms/文件, "
+                  f"输出一致 {sum(expected[n] == actual[n] for n in file_names)}/{len(file_names)}")
+
+        largest = max(file_names, key=lambda f: os.path.getsize(os.path.join(tmp, f)))
+        context = multiprocessing.get_context("spawn")
+        peaks = {}
+        for streaming in (False, True):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                peaks[streaming] = executor.submit(parse_peak_delta, os.path.join(tmp, largest), streaming).result()
+        print(f"解析峰值内存增量({largest}): 完整树 {peaks[False]:.1f} MB, 流式 {peaks[True]:.1f} MB")
+
+        print("测试通过" if failed == 0 else f"测试失败: {failed} 个输出不一致")
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,99 @@
+# -*- encoding: utf-8 -*-
+'''
+@File         :test_roi_stats.py
+@Description  :ROI统计积分图(RoiStatsTable)与逐像素计算(calculate_image_stats)的一致性测试, 同时对比单次ROI统计的耗时
+
+运行方式(在项目根目录下):
+    python test/test_roi_stats.py [图片路径]
+不传入图片时, 使用随机生成的多种尺寸(包括宽高不是分块边长整数倍)的图片
+'''
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from src.utils.roi_stats import RoiStatsTable
+from src.view.sub_compare_image_view import calculate_image_stats
+
+
+# 参考实现中对比度使用float32累加, 保留1位小数后允许相差0.1; R/G、B/G保留5位小数后允许相差1e-5
+TOLERANCE = {'avg_brightness': 0.1, 'contrast': 0.1, 'avg_rgb': 0.1, 'avg_lab': 0.1, 'R_G': 1e-5, 'B_G': 1e-5}
+
+
+def generate_image(rng, width, height):
+    """平滑的随机底图叠加噪声, 让ROI之间的统计值有明显差别"""
+    small = rng.integers(0, 256, (max(2, height // 64), max(2, width // 64), 3), dtype=np.uint8)
+    base = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC).astype(np.int16)
+    noise = rng.integers(-20, 21, (height, width, 3), dtype=np.int16)
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def random_rects(rng, width, height, count):
+    """随机ROI, 包括很小的框、贴边的框以及整张图片"""
+    rects = [(0, 0, width, height), (width - 1, height - 1, width, height), (0, 0, 1, height)]
+    for _ in range(count):
+        w = int(rng.integers(1, width + 1)) if rng.random() < 0.7 else int(rng.integers(1, min(16, width) + 1))
+        h = int(rng.integers(1, height + 1)) if rng.random() < 0.7 else int(rng.integers(1, min(16, height) + 1))
+        x1, y1 = int(rng.integers(0, width - w + 1)), int(rng.integers(0, height - h + 1))
+        rects.append((x1, y1, x1 + w, y1 + h))
+    return rects
+
+
+def compare(expected, actual):
+    """返回不一致的字段列表"""
+    diffs = []
+    for key in ('width', 'height'):
+        if expected[key] != actual[key]:
+            diffs.append(key)
+    for key, tol in TOLERANCE.items():
+        a, b = np.atleast_1d(expected[key]), np.atleast_1d(actual[key])
+        if np.any(np.abs(np.asarray(a, dtype=float) - np.asarray(b, dtype=float)) > tol + 1e-9):
+            diffs.append(key)
+    return diffs
+
+
+def check_image(cv_img, rng, count):
+    height, width = cv_img.shape[:2]
+    start = time.perf_counter()
+    table = RoiStatsTable(cv_img)
+    build_time = time.perf_counter() - start
+
+    failed, table_time, direct_time = 0, 0.0, 0.0
+    rects = random_rects(rng, width, height, count)
+    for x1, y1, x2, y2 in rects:
+        start = time.perf_counter()
+        expected = calculate_image_stats(cv_img[y1:y2, x1:x2], resize_factor=1)
+        direct_time += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = table.stats(x1, y1, x2, y2)
+        table_time += time.perf_counter() - start
+        if diffs := compare(expected, actual):
+            failed += 1
+            print(f"[不一致] {width}x{height} roi=({x1},{y1},{x2},{y2}) 字段: {diffs}\n  逐像素: {expected}\n  积分图: {actual}")
+    print(f"{width}x{height}: 建立积分图 {build_time * 1000:.0f} ms, 单次统计 逐像素 {direct_time / len(rects) * 1000:.2f} ms, "
+          f"积分图 {table_time / len(rects) * 1000:.3f} ms, 一致 {len(rects) - failed}/{len(rects)}")
+    return failed
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(2025)
+    failed = 0
+    if len(sys.argv) > 1:
+        cv_img = cv2.imdecode(np.fromfile(sys.argv[1], dtype=np.uint8), cv2.IMREAD_COLOR)
+        failed += check_image(cv_img, rng, 200)
+    else:
+        for width, height in ((1, 1), (7, 5), (37, 29), (640, 480), (1001, 777), (4000, 3000)):
+            failed += check_image(generate_image(rng, width, height), rng, 100 if width < 4000 else 30)
+
+    # 越界的矩形会被裁剪到图片范围内, 完全在图片外时返回None
+    table = RoiStatsTable(generate_image(rng, 64, 48))
+    if table.stats(-10, -10, 20, 20) != table.stats(0, 0, 20, 20) or table.stats(70, 0, 90, 10) is not None:
+        failed += 1
+        print("[不一致] 越界矩形的处理")
+
+    print("测试通过" if failed == 0 else f"测试失败: {failed} 个ROI不一致")
+    sys.exit(1 if failed else 0)
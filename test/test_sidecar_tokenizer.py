@@ -0,0 +1,110 @@
+# -*- encoding: utf-8 -*-
+'''
+@File         :test_sidecar_tokenizer.py
+@Description  :3A sidecar文件(MTK .exif / 展锐 .txt)单次扫描解析与原来逐个关键字re.search查找的等价性测试, 同时对比批量解析的耗时
+
+运行方式(在项目根目录下):
+    python test/test_sidecar_tokenizer.py [sidecar文件所在文件夹]
+不传入文件夹时, 会在临时目录中生成.txt和.exif各1000个模拟的sidecar文件(包含大量无关字段、重复字段、非数值、关键字作为更长名称的后缀等情况)
+'''
+import os
+import re
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.sidecar import MTK_SIDECAR, UNISOC_SIDECAR
+from src.view.sub_compare_image_view import load_exif_data, load_txt_data
+
+
+def legacy_extract(pat, text):
+    """原来的逐个关键字查找, 作为参照"""
+    match = re.search(rf'{re.escape(pat)}\s*:\s*([-+]?\d+(?:\.\d+)?)', text)
+    value = 0
+    if match:
+        value = float(match.group(1)) if '.' in match.group(1) else int(match.group(1))
+    return value if value else 0
+
+
+def legacy_scan(tokenizer, text):
+    return {name: legacy_extract(key, text) for name, key in tokenizer.keys.items()}
+
+
+def random_value(rng):
+    return rng.choice([
+        str(rng.randint(-5000, 5000)), f"{rng.uniform(-100, 100):.3f}", "0", "0.0", f"+{rng.randint(1, 99)}",
+        "N/A", "", f"{rng.randint(1, 9)}abc", "-", "1e5",
+    ])
+
+
+def generate_sidecar(path, rng, keys, noise_lines):
+    """生成一个模拟的sidecar文件: 大量无关字段中穿插关键字, 部分关键字缺失、重复或格式异常"""
+    prefix = "AE_TAG_" if keys[0].startswith("AE_TAG_") else "AE-"
+    lines = [f"{prefix}{rng.choice(['misc', 'stat', 'hist', 'awb', 'af'])}_{i} : {random_value(rng)}" for i in range(noise_lines)]
+    for key in keys:
+        for _ in range(rng.choice([0, 1, 1, 1, 2, 3])):
+            separator = rng.choice([" : ", ":", " :", ":  ", "\t:\t", "\n:", " :\n"])
+            name = rng.choice([key, key, key, f"X{key}", f"{key}_ext", f"{key[:-1]}"])
+            lines.insert(rng.randint(0, len(lines)), f"{name}{separator}{random_value(rng)}")
+    data = "\n".join(lines).encode("utf-8")
+    if rng.random() < 0.2:
+        # 无法解码的字节
+        pos = rng.randint(0, len(data))
+        data = data[:pos] + b"\xff\xfe" + data[pos:]
+    Path(path).write_bytes(data)
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def benchmark(paths, tokenizer):
+    """返回(逐个查找耗时, 单次扫描耗时), 均包含读取文件"""
+    start = time.perf_counter()
+    for path in paths:
+        legacy_scan(tokenizer, read_text(path))
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for path in paths:
+        tokenizer.read(path)
+    return legacy_time, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = random.Random(2025)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = sys.argv[1] if len(sys.argv) > 1 else tmp
+        if len(sys.argv) == 1:
+            print("未传入文件夹, 生成模拟的sidecar文件中...")
+            unisoc_keys, mtk_keys = list(UNISOC_SIDECAR.keys.values()), list(MTK_SIDECAR.keys.values())
+            for i in range(1000):
+                generate_sidecar(os.path.join(tmp, f"IMG_{i:04d}.txt"), rng, unisoc_keys, rng.choice([500, 2000, 5000]))
+                generate_sidecar(os.path.join(tmp, f"IMG_{i:04d}.jpg.exif"), rng, mtk_keys, rng.choice([500, 2000, 5000]))
+
+        failed = 0
+        for suffix, tokenizer, loader in ((".txt", UNISOC_SIDECAR, load_txt_data), (".exif", MTK_SIDECAR, load_exif_data)):
+            paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(suffix))
+            if not paths:
+                continue
+            for path in paths:
+                expected, actual = legacy_scan(tokenizer, read_text(path)), tokenizer.read(path)
+                # 同时比较数值类型(int/float), 类型不同时显示格式会不同
+                if {k: (type(v), v) for k, v in expected.items()} != {k: (type(v), v) for k, v in actual.items()}:
+                    failed += 1
+                    diff = {k: (expected[k], actual[k]) for k in expected if expected[k] != actual[k]}
+                    print(f"[不一致] {os.path.basename(path)}: {diff}")
+                if not loader(path)[0]:
+                    failed += 1
+                    print(f"[解析失败] {os.path.basename(path)}")
+            legacy_time, scan_time = benchmark(paths, tokenizer)
+            size_mb = sum(os.path.getsize(p) for p in paths) / 1024 / 1024
+            print(f"{suffix}: {len(paths)} 个文件({size_mb:.1f} MB), 逐个查找 {legacy_time:.2f} 秒, "
+                  f"单次扫描 {scan_time:.2f} 秒, 加速 {legacy_time / max(scan_time, 1e-9):.1f} 倍")
+
+        print("测试通过" if failed == 0 else f"测试失败: {failed} 个文件不一致")
+        sys.exit(1 if failed else 0)